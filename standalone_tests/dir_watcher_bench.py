@@ -0,0 +1,103 @@
+"""Compare CPU use and change detection latency of the run directory watcher
+with the inotify and polling observers.
+
+python dir_watcher_bench.py --n_files=10000 --n_files=100000
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from wandb.filesync.dir_watcher import DirWatcher
+
+
+class Settings(object):
+    def __init__(self, files_dir):
+        self.files_dir = files_dir
+        self.ignore_globs = []
+
+
+class FilePusher(object):
+    def __init__(self):
+        self.changed = {}
+        self.event = threading.Event()
+
+    def file_changed(self, save_name, path, copy=True):
+        self.changed[save_name] = time.time()
+        self.event.set()
+
+
+def populate(files_dir, n_files):
+    for i in range(n_files):
+        subdir = os.path.join(files_dir, "media", "images", str(i // 1000))
+        if i % 1000 == 0:
+            os.makedirs(subdir)
+        with open(os.path.join(subdir, "img_%d.png" % i), "w") as f:
+            f.write("x")
+
+
+def detection_latency(files_dir, pusher, n_probes, timeout):
+    latencies = []
+    for i in range(n_probes):
+        name = "probe_%d.txt" % i
+        pusher.event.clear()
+        start = time.time()
+        with open(os.path.join(files_dir, name), "w") as f:
+            f.write("probe")
+        if not pusher.event.wait(timeout) or name not in pusher.changed:
+            latencies.append(float("inf"))
+        else:
+            latencies.append(pusher.changed[name] - start)
+    return sum(latencies) / len(latencies)
+
+
+def bench(n_files, force_polling, idle_seconds, n_probes):
+    files_dir = tempfile.mkdtemp()
+    try:
+        populate(files_dir, n_files)
+        pusher = FilePusher()
+        watcher = DirWatcher(Settings(files_dir), None, pusher, force_polling)
+        watcher.update_policy("probe_*", "now")
+
+        cpu_start = time.process_time()
+        time.sleep(idle_seconds)
+        idle_cpu = (time.process_time() - cpu_start) / idle_seconds
+
+        latency = detection_latency(files_dir, pusher, n_probes, timeout=60)
+
+        start = time.time()
+        watcher.finish()
+        finish_time = time.time() - start
+        return type(watcher._file_observer).__name__, idle_cpu, latency, finish_time
+    finally:
+        shutil.rmtree(files_dir)
+
+
+def main(n_files, idle_seconds, n_probes):
+    print("Observer        \tFiles\tIDLE CPU\tLATENCY\tFINISH")
+    for count in n_files or [10000, 100000]:
+        for force_polling in [False, True]:
+            name, idle_cpu, latency, finish_time = bench(
+                count, force_polling, idle_seconds, n_probes
+            )
+            print(
+                "{:16}\t{}\t{}%\t{}\t{}".format(
+                    name,
+                    count,
+                    round(idle_cpu * 100, 1),
+                    round(latency, 3),
+                    round(finish_time, 3),
+                )
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n_files", type=int, action="append")
+    parser.add_argument("--idle_seconds", type=float, default=10)
+    parser.add_argument("--n_probes", type=int, default=5)
+    args = vars(parser.parse_args())
+    main(**args)
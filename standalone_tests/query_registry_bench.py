@@ -0,0 +1,64 @@
+"""Compare the cost of GraphQL documents parsed with gql on every use, as the
+api clients used to do, with the documents of the query registry.
+
+python query_registry_bench.py --n_calls=1000
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+
+from wandb import util
+from wandb.apis import public, query_registry
+
+
+def import_time():
+    start = time.time()
+    subprocess.check_call([sys.executable, "-c", "import wandb.apis.public"])
+    return time.time() - start
+
+
+def eager_parse_time():
+    # what defining the class level queries cost at import before the registry
+    gql = util.vendor_import("gql").gql
+    print_ast = util.vendor_import("graphql.language.printer").print_ast
+    start = time.time()
+    for document in query_registry.documents():
+        print_ast(gql(document.source))
+    return time.time() - start
+
+
+def per_call_time(source, n_calls):
+    gql = util.vendor_import("gql").gql
+    print_ast = util.vendor_import("graphql.language.printer").print_ast
+
+    start = time.time()
+    for _ in range(n_calls):
+        print_ast(gql(source))
+    before = (time.time() - start) / n_calls
+
+    start = time.time()
+    for _ in range(n_calls):
+        query_registry.gql(source).printed
+    after = (time.time() - start) / n_calls
+    return before, after
+
+
+def main(n_calls):
+    print("import wandb.apis.public: {}s".format(round(import_time(), 3)))
+    print(
+        "parsing the {} import time documents: {}s".format(
+            len(query_registry.documents()), round(eager_parse_time(), 3)
+        )
+    )
+    before, after = per_call_time(public.Runs.QUERY.source, n_calls)
+    print("Runs query per call\tBEFORE\tAFTER")
+    print("\t\t\t{}ms\t{}ms".format(round(before * 1e3, 3), round(after * 1e3, 4)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n_calls", type=int, default=1000)
+    args = vars(parser.parse_args())
+    main(**args)
@@ -0,0 +1,87 @@
+"""Compare the JSON and columnar artifact formats of wandb.Table.
+
+Runs fully offline: tables are added to a local artifact and read back from
+the artifact staging directory.
+
+python table_serialization_bench.py --n_rows=1000000
+"""
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import wandb
+
+
+class LocalArtifactSource(object):
+    def __init__(self, artifact):
+        self.artifact = artifact
+
+    def get_path(self, name):
+        entry = self.artifact._manifest.get_entry_by_path(name)
+        entry.download = lambda: entry.local_path
+        return entry
+
+
+def build_table(n_rows, artifact_format):
+    wandb.Table.MAX_ARTIFACT_ROWS = n_rows
+    return wandb.Table(
+        columns=["id", "score", "correct", "label"],
+        data=[
+            [i, float(s), bool(s > 0.5), "class_%d" % (i % 10)]
+            for i, s in enumerate(np.random.rand(n_rows))
+        ],
+        artifact_format=artifact_format,
+    )
+
+
+def main(n_rows):
+    print("Format \tRows\tMBs\tWRITE\tLOAD\tCOLUMN\tALL")
+    for artifact_format in ["json", "numpy", "parquet"]:
+        if artifact_format == "parquet" and wandb.util.get_module("pyarrow") is None:
+            continue
+        table = build_table(n_rows, artifact_format)
+        artifact = wandb.Artifact("bench", "dataset")
+
+        start = time.time()
+        entry = artifact.add(table, "table")
+        write_time = time.time() - start
+
+        json_path = os.path.join(artifact._artifact_dir.name, entry.path)
+        size = os.path.getsize(json_path)
+        if table._path is not None:
+            size += os.path.getsize(table._path)
+
+        start = time.time()
+        with open(json_path) as f:
+            loaded = wandb.Table.from_json(json.load(f), LocalArtifactSource(artifact))
+        load_time = time.time() - start
+
+        start = time.time()
+        loaded.get_column("score")
+        column_time = time.time() - start
+
+        start = time.time()
+        loaded.data
+        all_time = time.time() - start
+
+        print(
+            "{:7}\t{}\t{}\t{}\t{}\t{}\t{}".format(
+                artifact_format,
+                n_rows,
+                round(size / 1e6, 1),
+                round(write_time, 3),
+                round(load_time, 3),
+                round(column_time, 3),
+                round(all_time, 3),
+            )
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n_rows", type=int, default=100000)
+    args = vars(parser.parse_args())
+    main(**args)
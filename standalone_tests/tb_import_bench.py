@@ -0,0 +1,93 @@
+"""Compare converting a tensorboard logdir with the bulk importer against the
+live tensorboard watcher conversion (wandb.tensorboard.log + publish_history).
+
+python tb_import_bench.py --n_steps=100000 --n_tags=10
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from six.moves import queue
+from tensorboard.compat.proto import event_pb2, summary_pb2
+from tensorboard.summary.writer.event_file_writer import EventFileWriter
+import wandb
+from wandb.sdk.interface import interface
+from wandb.sdk.internal import tb_watcher
+from wandb.sync import tb_import
+
+
+def write_logdir(logdir, n_steps, n_tags):
+    writer = EventFileWriter(logdir, max_queue_size=1000)
+    for step in range(n_steps):
+        summary = summary_pb2.Summary(
+            value=[
+                summary_pb2.Summary.Value(tag="tag_%d" % i, simple_value=step * 0.5)
+                for i in range(n_tags)
+            ]
+        )
+        writer.add_event(
+            event_pb2.Event(wall_time=time.time(), step=step, summary=summary)
+        )
+    writer.close()
+
+
+def live_conversion(logdir):
+    """Replays the events the way TBEventConsumer converts them."""
+    sender = interface.BackendSender(record_q=queue.Queue())
+    history = tb_watcher.TBHistory()
+    wandb.tensorboard.reset_state()
+    event_files = tb_import.find_event_files(logdir)
+    rows = 0
+    for namespace, paths in event_files.items():
+        for path in paths:
+            for data in tb_import.read_records(path):
+                event = event_pb2.Event()
+                event.ParseFromString(data)
+                if not event.HasField("summary"):
+                    continue
+                wandb.tensorboard.log(
+                    event, step=event.step, namespace=namespace, history=history
+                )
+                for row in history._get_and_reset():
+                    sender.publish_history(row, run=None, publish_step=False)
+                    rows += 1
+    return rows
+
+
+def main(n_steps, n_tags):
+    tmpdir = tempfile.mkdtemp()
+    try:
+        logdir = os.path.join(tmpdir, "logs")
+        write_logdir(logdir, n_steps, n_tags)
+
+        start = time.time()
+        rows = live_conversion(logdir)
+        live_time = time.time() - start
+
+        start = time.time()
+        importer = tb_import.TBImporter(
+            logdir, wandb_dir=os.path.join(tmpdir, "wandb"), run_id="bench"
+        )
+        importer.run()
+        import_time = time.time() - start
+
+        print("Path  \tEvents\tRows\tSECONDS")
+        print("{:6}\t{}\t{}\t{}".format("live", n_steps, rows, round(live_time, 3)))
+        print(
+            "{:6}\t{}\t{}\t{}".format(
+                "import", importer.events, importer.rows, round(import_time, 3)
+            )
+        )
+    finally:
+        shutil.rmtree(tmpdir)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n_steps", type=int, default=100000)
+    parser.add_argument("--n_tags", type=int, default=10)
+    args = vars(parser.parse_args())
+    main(**args)
@@ -1,5 +1,8 @@
-import pytest
+import subprocess
 import sys
+import threading
+
+import pytest
 
 
 def test_path_is_unchanged():
@@ -10,3 +13,65 @@ def test_path_is_unchanged():
 
     for item in sys.path:
         assert "wandb/vendor" not in item
+
+
+def test_vendor_import_threads():
+    from wandb import util
+
+    path = list(sys.path)
+    modules = ["gql.client", "graphql.language.printer", "gql.transport.requests"]
+    threads = [
+        threading.Thread(target=util.vendor_import, args=(name,))
+        for name in modules * 4
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sys.path == path
+
+    with pytest.raises(ImportError):
+        util.vendor_import("gql.does_not_exist")
+    assert sys.path == path
+
+
+# Heavy dependencies that `import wandb` should only load once they're used
+LAZY_MODULES = [
+    "distutils",
+    "gql",
+    "graphql",
+    "git",
+    "pkg_resources",
+    "wandb.apis.public",
+    "wandb.data_types",
+    "wandb.sdk.internal.sender",
+]
+
+
+@pytest.mark.skipif(sys.version_info < (3, 7), reason="requires -X importtime")
+def test_import_is_lazy():
+    proc = subprocess.Popen(
+        [sys.executable, "-X", "importtime", "-c", "import wandb"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    _, err = proc.communicate()
+    assert proc.returncode == 0, err
+    # import time:  self [us] | cumulative | imported package
+    imported = set()
+    for line in err.decode("utf-8").splitlines():
+        if line.startswith("import time:") and not line.endswith("imported package"):
+            imported.add(line.split("|")[-1].strip())
+    assert "wandb" in imported
+    assert [name for name in LAZY_MODULES if name in imported] == []
+
+
+@pytest.mark.skipif(sys.version_info < (3, 7), reason="lazy attributes need PEP 562")
+def test_lazy_attributes():
+    import wandb
+    from wandb.sdk.data_types import Image
+
+    assert wandb.Image is Image
+    assert wandb.Api is wandb.apis.PublicApi
+    assert "Table" in dir(wandb)
+    assert callable(wandb.plot.line)
@@ -0,0 +1,77 @@
+import os
+
+import numpy
+import pytest
+
+from wandb import util
+
+
+@pytest.mark.parametrize(
+    "arr",
+    [
+        numpy.random.randn(1000),
+        numpy.arange(100).reshape(10, 10),
+        numpy.random.randint(0, 5, size=(33,)),
+    ],
+)
+def test_array_stats_matches_numpy(arr):
+    stats = util.array_stats(arr)
+    assert stats["size"] == arr.size
+    assert numpy.isclose(stats["mean"], numpy.mean(arr))
+    assert numpy.isclose(stats["var"], numpy.var(arr))
+    assert stats["min"] == numpy.amin(arr)
+    assert stats["max"] == numpy.amax(arr)
+    for q in util.SUMMARY_PERCENTILES:
+        assert numpy.isclose(stats[q], numpy.percentile(arr, q))
+
+
+def test_array_stats_nan():
+    arr = numpy.random.randn(100)
+    arr[3] = numpy.nan
+    stats = util.array_stats(arr)
+    assert numpy.isnan(stats["min"]) and numpy.isnan(stats[25])
+
+
+def test_array_stats_chunked():
+    arr = numpy.random.randn(10000)
+    stats = util.array_stats(arr, chunk_size=999)
+    assert stats["size"] == arr.size
+    assert numpy.isclose(stats["mean"], numpy.mean(arr))
+    assert numpy.isclose(stats["var"], numpy.var(arr))
+    assert stats["min"] == numpy.amin(arr)
+    assert stats["max"] == numpy.amax(arr)
+    bin_width = (arr.max() - arr.min()) / util.ARRAY_STATS_PERCENTILE_BINS
+    for q in util.SUMMARY_PERCENTILES:
+        assert abs(stats[q] - numpy.percentile(arr, q)) <= bin_width
+
+
+def test_array_histogram_chunked():
+    arr = numpy.random.randn(10000)
+    counts, edges = util.array_histogram(arr, 32, chunk_size=999)
+    np_counts, np_edges = numpy.histogram(arr, bins=32)
+    assert counts.tolist() == np_counts.tolist()
+    assert numpy.allclose(edges, np_edges)
+
+
+def test_maybe_compress_summary_memmap(tmpdir):
+    path = os.path.join(str(tmpdir), "arr.dat")
+    arr = numpy.memmap(path, dtype=numpy.float32, mode="w+", shape=(100, 10))
+    arr[:] = numpy.random.randn(100, 10)
+    compressed, did_compress = util.maybe_compress_summary(arr, "numpy.ndarray")
+    assert did_compress
+    assert compressed["size"] == 1000
+    assert numpy.isclose(compressed["mean"], numpy.mean(arr), atol=1e-6)
+    assert compressed["min"] <= compressed["10%"] <= compressed["90%"]
+
+
+def test_array_stats_small_int_dtype():
+    # the median sits between -128 and 127, whose difference overflows int8
+    arr = numpy.array([-128, 127] * 20, dtype=numpy.int8)
+    stats = util.array_stats(arr, percentiles=(50,))
+    assert stats["min"] == -128 and stats["max"] == 127
+    assert stats[50] == -0.5
+
+    stats = util.array_stats(arr, percentiles=(50,), chunk_size=7)
+    assert stats["min"] == -128 and stats["max"] == 127
+    assert numpy.isclose(stats["mean"], -0.5)
+    assert numpy.isclose(stats["var"], numpy.var(arr.astype(numpy.float64)))
@@ -6,8 +6,11 @@ import PIL
 import os
 import six
 import sys
+import collections
 import glob
+import json
 import platform
+import time
 import pandas as pd
 from click.testing import CliRunner
 from . import utils
@@ -200,6 +203,49 @@ def test_image_seq_to_json(mocked_run):
     assert utils.subdict(meta, meta_expected) == meta_expected
 
 
+def test_media_files_shared_across_steps(mocked_run):
+    jsons = []
+    for step in range(3):
+        wb_image = wandb.Image(image, masks={"overlay": standard_mask})
+        wb_image.bind_to_run(mocked_run, "reference", step)
+        jsons.append(wb_image.to_json(mocked_run))
+
+    assert jsons[0]["path"] == jsons[1]["path"] == jsons[2]["path"]
+    assert jsons[0]["masks"]["overlay"]["path"] == jsons[2]["masks"]["overlay"]["path"]
+    for path in [jsons[0]["path"], jsons[0]["masks"]["overlay"]["path"]]:
+        media_dir = os.path.dirname(os.path.join(mocked_run.dir, path))
+        files = [f for f in os.listdir(media_dir) if f.endswith(".png")]
+        assert files == [os.path.basename(path)]
+
+    other = wandb.Image(np.ones((28, 28)))
+    other.bind_to_run(mocked_run, "reference", 3)
+    assert other.to_json(mocked_run)["path"] != jsons[0]["path"]
+
+
+def test_media_files_scoped_to_run(mocked_run, test_settings):
+    wb_image = wandb.Image(image)
+    wb_image.bind_to_run(mocked_run, "reference", 0)
+    assert len(mocked_run._media_files) == 1
+
+    # a later run in the same directory writes its own files
+    other_run = wandb.wandb_sdk.wandb_run.Run(settings=test_settings)
+    other_image = wandb.Image(image)
+    other_image.bind_to_run(other_run, "reference", 1)
+    assert (
+        other_image.to_json(other_run)["path"] != wb_image.to_json(mocked_run)["path"]
+    )
+
+
+def test_image_seq_files_not_shared(mocked_run):
+    wb_images = [wandb.Image(image) for _ in range(2)]
+    for i, wb_image in enumerate(wb_images):
+        wb_image.bind_to_run(mocked_run, "test", 0, i)
+    for i in range(2):
+        assert os.path.exists(
+            os.path.join(mocked_run.dir, "media", "images", "test_0_%d.png" % i)
+        )
+
+
 def test_max_images(caplog, mocked_run):
     large_image = np.random.randint(255, size=(10, 10))
     large_list = [wandb.Image(large_image)] * 200
@@ -714,6 +760,218 @@ def test_table_from_pandas():
     assert table.data == table_data
 
 
+def test_table_add_column():
+    table = wandb.Table(data=table_data)
+    table.add_column("D", np.array([1.5, 2.5, 3.5]))
+    assert table.columns == ["Input", "Output", "Expected", "D"]
+    assert [row[3] for row in table.data] == [1.5, 2.5, 3.5]
+
+    with pytest.raises(ValueError):
+        table.add_column("E", [1, 2])
+    with pytest.raises(TypeError):
+        table.add_column("E", [1, "a", 3])
+    with pytest.raises(TypeError):
+        table.add_column("E", [1, None, 3])
+    assert table.columns == ["Input", "Output", "Expected", "D"]
+
+    table.add_column("E", [1, None, 3], optional=True)
+    table.add_data("d", 4, False, 4.5, None)
+    with pytest.raises(TypeError):
+        table.add_data("e", 5, True, "a", None)
+
+    table = wandb.Table(columns=[])
+    table.add_column("A", ["a", "b"])
+    assert table.data == [["a"], ["b"]]
+
+
+def test_table_bulk_type_errors():
+    with pytest.raises(TypeError):
+        wandb.Table(columns=["A"], data=[[1], [2], ["a"]])
+    with pytest.raises(TypeError):
+        wandb.Table(dataframe=pd.DataFrame({"A": [1, 2, "a"]}))
+    with pytest.raises(TypeError):
+        wandb.Table(columns=["A"], data=[[1], ["a"]], dtype="a")
+    with pytest.raises(ValueError):
+        wandb.Table(columns=["A", "B"], data=[[1, 2], [3]])
+
+
+def test_table_write_json_streamed():
+    table = wandb.Table(columns=["a", "b"], data=[[1, np.array([1, 2])], [2, None]])
+    fp = six.StringIO()
+    table._write_table_json(fp)
+    assert json.loads(fp.getvalue()) == {
+        "columns": ["a", "b"],
+        "data": [[1, [1, 2]], [2, None]],
+    }
+
+    fp = six.StringIO()
+    table._write_table_json(fp, max_rows=1)
+    assert json.loads(fp.getvalue())["data"] == [[1, [1, 2]]]
+
+
+class _LocalArtifactSource(object):
+    """Resolves paths of a local artifact the way a downloaded one would"""
+
+    def __init__(self, artifact):
+        self.artifact = artifact
+
+    def get_path(self, name):
+        entry = self.artifact._manifest.get_entry_by_path(name)
+        entry.download = lambda: entry.local_path
+        return entry
+
+
+@pytest.mark.parametrize("artifact_format", ["numpy", "parquet"])
+def test_table_columnar_artifact(artifact_format):
+    if artifact_format == "parquet":
+        pytest.importorskip("pyarrow")
+    rows = [
+        [i, i * 0.5, "label_%d" % i, None if i % 2 else True, [i]] for i in range(10)
+    ]
+    table = wandb.Table(
+        columns=["id", "score", "label", "flag", "nested"],
+        data=rows,
+        artifact_format=artifact_format,
+    )
+    artifact = wandb.Artifact("columnar", "dataset")
+    entry = artifact.add(table, "table")
+    with open(os.path.join(artifact._artifact_dir.name, entry.path)) as f:
+        json_obj = json.load(f)
+    assert json_obj["columnar"] == {
+        "format": artifact_format,
+        "columns": ["id", "score", "label", "flag"],
+    }
+    assert json_obj["data"][3] == [[3]]
+
+    loaded = wandb.Table.from_json(json_obj, _LocalArtifactSource(artifact))
+    assert loaded.get_column("score") == [row[1] for row in rows]
+    assert loaded.get_column("flag") == [row[3] for row in rows]
+    assert loaded._lazy_data is not None
+    assert loaded.data == rows
+    assert loaded == table
+
+
+@pytest.mark.parametrize("artifact_format", ["numpy", "parquet"])
+def test_table_columnar_iterrows_streams(artifact_format, monkeypatch):
+    if artifact_format == "parquet":
+        pytest.importorskip("pyarrow")
+    monkeypatch.setattr(data_types._LazyTableData, "ROW_CHUNK", 3)
+    rows = [[i, None if i % 3 else "s%d" % i] for i in range(10)]
+    table = wandb.Table(columns=["a", "b"], data=rows, artifact_format=artifact_format)
+    artifact = wandb.Artifact("columnar", "dataset")
+    entry = artifact.add(table, "table")
+    with open(os.path.join(artifact._artifact_dir.name, entry.path)) as f:
+        loaded = wandb.Table.from_json(json.load(f), _LocalArtifactSource(artifact))
+
+    assert [(ndx, row) for ndx, row in loaded.iterrows()] == list(enumerate(rows))
+    assert loaded._lazy_data is not None
+    assert loaded._lazy_data.column("a", 4, 6) == [4, 5]
+    assert loaded._lazy_data.column("b", 8) == [None, "s9"]
+    assert loaded._lazy_data.reader._mmap is None
+    assert loaded._lazy_data.reader._parquet is None
+
+
+def test_table_columnar_iterrows_closes_file_when_abandoned():
+    table = wandb.Table(
+        columns=["a"], data=[[i] for i in range(5)], artifact_format="numpy"
+    )
+    artifact = wandb.Artifact("columnar", "dataset")
+    entry = artifact.add(table, "table")
+    with open(os.path.join(artifact._artifact_dir.name, entry.path)) as f:
+        loaded = wandb.Table.from_json(json.load(f), _LocalArtifactSource(artifact))
+
+    rows = loaded.iterrows()
+    assert next(rows) == (0, [0])
+    reader = loaded._lazy_data.reader
+    assert reader._mmap is not None
+    rows.close()
+    assert reader._mmap is None
+
+
+def test_table_columnar_keeps_mixed_columns_and_file():
+    rows = [[1, 0.5, 1], [2.5, 1.5, 2]]
+    table = wandb.Table(columns=["mixed", "f", "i"], data=rows, artifact_format="numpy")
+    artifact = wandb.Artifact("columnar", "dataset")
+    entry = artifact.add(table, "table")
+    with open(os.path.join(artifact._artifact_dir.name, entry.path)) as f:
+        json_obj = json.load(f)
+    # 1 would come back as 1.0 from a float column
+    assert json_obj["columnar"]["columns"] == ["f", "i"]
+    assert json_obj["data"] == [[1], [2.5]]
+    # serializing doesn't change the table's own file
+    assert not table.file_is_set()
+    assert artifact.get_added_local_path_name(json_obj["path"]) is None
+
+
+class _TablePartsSource(object):
+    def __init__(self, parts):
+        self.parts = parts
+        self.loaded = []
+
+    def get(self, name):
+        self.loaded.append(name)
+        return self.parts.get(name)
+
+
+def test_partitioned_table_prefetches_parts():
+    parts = {
+        "parts/%d.table.json" % i: wandb.Table(columns=["a"], data=[[i], [i]])
+        for i in range(3)
+    }
+    source = _TablePartsSource(parts)
+    ptable = wandb.data_types.PartitionedTable(parts_path="parts")
+    for path in sorted(parts):
+        ptable._add_part_entry(collections.namedtuple("Entry", "path")(path), source)
+
+    rows = ptable.iterrows()
+    assert next(rows) == (0, [0])
+    # the second part is loaded while the first one is being read
+    for _ in range(50):
+        if len(source.loaded) == 2:
+            break
+        time.sleep(0.1)
+    assert source.loaded == ["parts/0.table.json", "parts/1.table.json"]
+    assert list(rows) == [(1, [0]), (2, [1]), (3, [1]), (4, [2]), (5, [2])]
+
+
+def test_partitioned_table_iterrows_frees_parts_when_abandoned():
+    parts = {
+        "parts/%d.table.json" % i: wandb.Table(columns=["a"], data=[[i], [i]])
+        for i in range(3)
+    }
+    source = _TablePartsSource(parts)
+    ptable = wandb.data_types.PartitionedTable(parts_path="parts")
+    for path in sorted(parts):
+        ptable._add_part_entry(collections.namedtuple("Entry", "path")(path), source)
+
+    rows = ptable.iterrows()
+    assert next(rows) == (0, [0])
+    rows.close()
+    part_entries = list(ptable._loaded_part_entries.values())
+    assert all(entry._prefetch_thread is None for entry in part_entries)
+    assert all(entry._part is None for entry in part_entries)
+    assert source.loaded == ["parts/0.table.json", "parts/1.table.json"]
+
+
+def test_joined_table_loads_tables_lazily():
+    t1 = wandb.Table(columns=["id"], data=[[1]])
+    t2 = wandb.Table(columns=["id"], data=[[2]])
+    source = _TablePartsSource({"t1.table.json": t1, "t2.table.json": t2})
+    joined = wandb.JoinedTable.from_json(
+        {"table1": "t1.table.json", "table2": "t2.table.json", "join_key": "id"},
+        source,
+    )
+    assert source.loaded == []
+    assert joined._table1 is t1
+    assert source.loaded == ["t1.table.json"]
+    assert joined._table2 is t2
+
+
+def test_table_columnar_format_validated():
+    with pytest.raises(ValueError):
+        wandb.Table(artifact_format="csv")
+
+
 def test_graph():
     graph = wandb.Graph()
     node_a = data_types.Node("a", "Node A", size=(4,))
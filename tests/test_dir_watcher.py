@@ -0,0 +1,204 @@
+import base64
+import os
+import time
+
+import pytest
+from wandb.filesync import dir_watcher
+from wandb.sdk.internal import file_stream
+
+
+class FilePusher(object):
+    def __init__(self):
+        self.changed = []
+
+    def file_changed(self, save_name, path, copy=True):
+        self.changed.append(save_name)
+
+
+class Settings(object):
+    def __init__(self, files_dir):
+        self.files_dir = files_dir
+        self.ignore_globs = []
+
+
+def wait_for(predicate, timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.1)
+    return False
+
+
+@pytest.mark.parametrize("force_polling", [False, True])
+def test_dir_watcher_uploads(tmpdir, force_polling):
+    pusher = FilePusher()
+    watcher = dir_watcher.DirWatcher(
+        Settings(str(tmpdir)), None, pusher, force_polling=force_polling
+    )
+    watcher.update_policy("now.txt", "now")
+    tmpdir.join("now.txt").write("now")
+    tmpdir.mkdir("media").join("img.png").write("img")
+    assert wait_for(lambda: "now.txt" in pusher.changed)
+
+    watcher.update_policy("late.txt", "now")
+    tmpdir.join("late.txt").write("late")
+    watcher.finish()
+    assert sorted(pusher.changed) == ["late.txt", "media/img.png", "now.txt"]
+
+
+def test_dir_watcher_polling_fallback(tmpdir, monkeypatch):
+    monkeypatch.setattr(dir_watcher, "native_observer_module", lambda: None)
+    watcher = dir_watcher.DirWatcher(Settings(str(tmpdir)), None, FilePusher())
+    assert watcher._polling
+    watcher.finish()
+
+
+@pytest.mark.skipif(
+    dir_watcher.native_observer_module() is None, reason="requires inotify"
+)
+def test_dir_watcher_inotify_default(tmpdir):
+    watcher = dir_watcher.DirWatcher(Settings(str(tmpdir)), None, FilePusher())
+    assert not watcher._polling
+    watcher.finish()
+
+
+@pytest.mark.parametrize("force_polling", [False, True])
+def test_dir_watcher_finish_dispatches_queued_events(tmpdir, force_polling):
+    watcher = dir_watcher.DirWatcher(
+        Settings(str(tmpdir)), None, FilePusher(), force_polling=force_polling
+    )
+    dispatched = []
+    watcher._event_handler.dispatch = dispatched.append
+    watcher._file_observer.stop()
+    watcher._file_observer.join()
+    # an event emitted but not yet handed to the handler when the observer stopped
+    event = dir_watcher.wd_events.FileCreatedEvent(str(tmpdir.join("a.txt")))
+    watcher._file_observer.event_queue.put((event, None))
+    watcher.finish()
+    assert event in dispatched
+
+
+@pytest.mark.parametrize(
+    "glob_str,save_name,matched",
+    [
+        ("a.txt", "a.txt", True),
+        ("a.txt", "ba.txt", False),
+        ("*.txt", "ckpt/a.txt", False),
+        ("ckpt/*", "ckpt/a.pt", True),
+        ("ckpt/*", "ckpt/sub/a.pt", False),
+        ("*", ".hidden", False),
+        (".*", ".hidden", True),
+        ("model[!2].h5", "model1.h5", True),
+        ("model[!2].h5", "model2.h5", False),
+        ("run?.log", "run1.log", True),
+    ],
+)
+def test_policy_matcher_glob_semantics(glob_str, save_name, matched):
+    matcher = dir_watcher.PolicyMatcher()
+    matcher.add(glob_str, "live")
+    assert matcher.match(save_name) == ("live" if matched else None)
+
+
+def test_policy_matcher_precedence():
+    matcher = dir_watcher.PolicyMatcher()
+    matcher.add("*.pt", "end")
+    assert matcher.match("a.pt") is None
+    matcher.add("*.pt", "live")
+    assert matcher.match("a.pt") == "live"
+    matcher.add("a.*", "now")
+    assert matcher.match("a.pt") == "now"
+    assert matcher.match("b.pt") == "live"
+
+
+def test_dir_watcher_policies(tmpdir):
+    watcher = dir_watcher.DirWatcher(
+        Settings(str(tmpdir)), None, FilePusher(), force_polling=True
+    )
+    watcher.update_policy("ckpt/*.pt", "live")
+    watcher.update_policy("ckpt/best.pt", "now")
+    handler = watcher._get_file_event_handler
+    assert handler(str(tmpdir.join("ckpt", "a.pt")), "ckpt/a.pt").policy == "live"
+    assert handler(str(tmpdir.join("ckpt", "best.pt")), "ckpt/best.pt").policy == "now"
+    assert handler(str(tmpdir.join("a.pt")), "a.pt").policy == "end"
+    watcher.finish()
+
+
+class FileStream(object):
+    def __init__(self):
+        self.policies = {}
+        self.chunks = []
+
+    def push_appended(self, filename, offset, data):
+        self.policies.setdefault(filename, file_stream.BinaryFilePolicy())
+        self.chunks.append(file_stream.AppendedChunk(filename, data, offset))
+
+
+def test_live_policy_streams_appends(tmpdir):
+    path = tmpdir.join("events.tfevents")
+    path.write_binary(b"a" * dir_watcher.PolicyLive.MIN_APPEND_SIZE)
+    pusher, fs = FilePusher(), FileStream()
+    policy = dir_watcher.PolicyLive(
+        str(path), "events.tfevents", None, pusher, file_stream=fs
+    )
+    policy.save_file()
+    assert pusher.changed == ["events.tfevents"]
+
+    with open(str(path), "ab") as f:
+        f.write(b"bbb")
+    policy.save_file()
+    with open(str(path), "ab") as f:
+        f.write(b"cc")
+    policy.save_file()
+    assert pusher.changed == ["events.tfevents"]
+    processed = fs.policies["events.tfevents"].process_chunks(fs.chunks)
+    assert processed["offset"] == dir_watcher.PolicyLive.MIN_APPEND_SIZE
+    assert base64.b64decode(processed["content"]) == b"bbbcc"
+
+    # the final upload is always a full one
+    policy.finish()
+    assert pusher.changed == ["events.tfevents"] * 2
+
+
+def test_live_policy_appends_after_full_upload(tmpdir, monkeypatch):
+    monkeypatch.setattr(dir_watcher.PolicyLive, "MAX_APPEND_SIZE", 100)
+    min_size = dir_watcher.PolicyLive.MIN_APPEND_SIZE
+    path = tmpdir.join("events.tfevents")
+    path.write_binary(b"a" * min_size)
+    pusher, fs = FilePusher(), FileStream()
+    policy = dir_watcher.PolicyLive(
+        str(path), "events.tfevents", None, pusher, file_stream=fs
+    )
+    policy.save_file()
+
+    with open(str(path), "ab") as f:
+        f.write(b"b" * 10)
+    policy.save_file()
+    # too much was appended to stream it, the file is uploaded in full
+    with open(str(path), "ab") as f:
+        f.write(b"c" * 200)
+    policy.save_file()
+    with open(str(path), "ab") as f:
+        f.write(b"d" * 5)
+    policy.save_file()
+    assert pusher.changed == ["events.tfevents"] * 2
+
+    processed = fs.policies["events.tfevents"].process_chunks(fs.chunks)
+    assert processed["offset"] == min_size + 210
+    assert base64.b64decode(processed["content"]) == b"d" * 5
+
+
+def test_live_policy_rewrite_uploads_full(tmpdir):
+    path = tmpdir.join("log.txt")
+    path.write_binary(b"a" * dir_watcher.PolicyLive.MIN_APPEND_SIZE)
+    pusher, fs = FilePusher(), FileStream()
+    policy = dir_watcher.PolicyLive(str(path), "log.txt", None, pusher, file_stream=fs)
+    policy.save_file()
+
+    path.write_binary(b"b" * (dir_watcher.PolicyLive.MIN_APPEND_SIZE + 10))
+    policy.save_file()
+    with open(str(path), "ab") as f:
+        f.write(b"c")
+    policy.save_file()
+    assert pusher.changed == ["log.txt"] * 3
+    assert fs.chunks == []
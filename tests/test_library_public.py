@@ -51,6 +51,7 @@ SYMBOLS_ROOT_OTHER = {
     "AlertLevel",
     "Api",
     "Artifact",
+    "AsyncApi",
     "CommError",
     "Config",
     "Error",
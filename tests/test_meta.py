@@ -3,6 +3,7 @@ import pytest
 import platform
 import sys
 import threading
+import time
 
 from six.moves import queue
 
@@ -76,3 +77,49 @@ def test_meta_probe(mock_server, meta, sm, record_q, log_debug):
 
 
 # TODO: test actual code saving
+
+
+def test_meta_probe_timeout(test_settings, interface, record_q, monkeypatch):
+    test_settings.update(_meta_probe_timeout=0.1)
+    release = threading.Event()
+    monkeypatch.setattr(Meta, "_save_pip", lambda self: release.wait(10))
+    meta = Meta(settings=test_settings, interface=interface)
+    os.makedirs(test_settings.files_dir)
+
+    start = time.time()
+    meta.probe()
+    assert time.time() - start < 5
+    meta.write()
+    release.set()
+
+    assert "python" in meta.data
+    assert "wandb-metadata.json" in [f.path for f in record_q.get().files.files]
+    assert not os.path.exists(os.path.join(test_settings.files_dir, "requirements.txt"))
+
+
+def test_meta_probe_shared_deadline(test_settings, interface, monkeypatch):
+    test_settings.update(_meta_probe_timeout=0.5, _save_requirements=True)
+    release = threading.Event()
+    save_pip = Meta._save_pip
+
+    def slow_setup_sys(self):
+        release.wait(10)
+        # a late probe doesn't add anything anymore
+        self._commit(lambda: self.data.update(late=True))
+        save_pip(self)
+
+    monkeypatch.setattr(Meta, "_setup_sys", slow_setup_sys)
+    monkeypatch.setattr(Meta, "_save_pip", lambda self: release.wait(10))
+    meta = Meta(settings=test_settings, interface=interface)
+    os.makedirs(test_settings.files_dir)
+
+    start = time.time()
+    meta.probe()
+    # the probes after the one that timed out don't get their own timeout
+    assert time.time() - start < 0.9
+    release.set()
+    for thread in threading.enumerate():
+        if thread.name.startswith("MetaProbe-"):
+            thread.join()
+    assert "late" not in meta.data
+    assert not os.path.exists(os.path.join(test_settings.files_dir, "requirements.txt"))
@@ -0,0 +1,157 @@
+import threading
+
+import pytest
+from wandb import util
+from wandb.apis.query_registry import gql
+from wandb.sdk.internal import mutation_batcher
+
+
+SET_CONFIG = gql(
+    """
+mutation SetConfig($name: String!, $config: String!) {
+    setConfig(name: $name, config: $config) { ...RunFragment }
+}
+fragment RunFragment on Run {
+    name
+    config
+}
+"""
+)
+
+FAIL = gql(
+    """
+mutation Fail($name: String!) {
+    fail(name: $name)
+}
+"""
+)
+
+
+class FakeRun(object):
+    def __init__(self, name, config):
+        self.name = name
+        self.config = config
+
+
+class FakeGraphQLServer(object):
+    """A local GraphQL server with a small mutation schema."""
+
+    def __init__(self):
+        graphql = util.vendor_import("graphql")
+        self._graphql = graphql
+        self._printer = util.vendor_import("graphql.language.printer")
+        self.requests = []
+        self.configs = []
+        self.kwargs = []
+        self.lock = threading.Lock()
+
+        run = graphql.GraphQLObjectType(
+            "Run",
+            fields={
+                "name": graphql.GraphQLField(graphql.GraphQLString),
+                "config": graphql.GraphQLField(graphql.GraphQLString),
+            },
+        )
+        name_arg = graphql.GraphQLArgument(
+            graphql.GraphQLNonNull(graphql.GraphQLString)
+        )
+        self.schema = graphql.GraphQLSchema(
+            query=graphql.GraphQLObjectType(
+                "Query", fields={"ok": graphql.GraphQLField(graphql.GraphQLBoolean)}
+            ),
+            mutation=graphql.GraphQLObjectType(
+                "Mutation",
+                fields={
+                    "setConfig": graphql.GraphQLField(
+                        run,
+                        args={"name": name_arg, "config": name_arg},
+                        resolver=self.set_config,
+                    ),
+                    "fail": graphql.GraphQLField(
+                        graphql.GraphQLString,
+                        args={"name": name_arg},
+                        resolver=self.fail,
+                    ),
+                },
+            ),
+        )
+
+    def set_config(self, root, args, context, info):
+        self.configs.append((args["name"], args["config"]))
+        return FakeRun(args["name"], args["config"])
+
+    def fail(self, root, args, context, info):
+        raise ValueError("%s failed" % args["name"])
+
+    def execute(self, document, variable_values=None, **kwargs):
+        with self.lock:
+            self.kwargs.append(kwargs)
+            query = getattr(document, "printed", None)
+            if query is None:
+                query = self._printer.print_ast(document)
+            self.requests.append(query)
+            result = self._graphql.graphql(
+                self.schema, query, variable_values=variable_values
+            )
+        if result.errors:
+            raise Exception(str(result.errors[0]))
+        return result.data
+
+
+def test_mutations_are_batched():
+    server = FakeGraphQLServer()
+    batcher = mutation_batcher.MutationBatcher(server.execute, window=60)
+    futures = [
+        batcher.queue(SET_CONFIG, {"name": "run", "config": str(i)}) for i in range(3)
+    ]
+    assert not any(f.done() for f in futures)
+    batcher.flush()
+
+    assert len(server.requests) == 1
+    assert server.configs == [("run", "0"), ("run", "1"), ("run", "2")]
+    assert futures[2].result() == {"setConfig": {"name": "run", "config": "2"}}
+
+
+def test_batches_are_sent_after_window():
+    server = FakeGraphQLServer()
+    batcher = mutation_batcher.MutationBatcher(server.execute, window=0.01)
+    futures = [
+        batcher.queue(SET_CONFIG, {"name": "run", "config": str(i)}) for i in range(2)
+    ]
+    assert [f.result()["setConfig"]["config"] for f in futures] == ["0", "1"]
+    assert len(server.requests) == 1
+
+
+def test_failed_batch_is_sent_one_by_one():
+    server = FakeGraphQLServer()
+    batcher = mutation_batcher.MutationBatcher(server.execute, window=60)
+    ok = batcher.queue(SET_CONFIG, {"name": "run", "config": "{}"})
+    failed = batcher.queue(FAIL, {"name": "bad"})
+    batcher.flush()
+
+    assert len(server.requests) == 3
+    assert ok.result() == {"setConfig": {"name": "run", "config": "{}"}}
+    with pytest.raises(Exception, match="bad failed"):
+        failed.result()
+
+
+def test_execute_kwargs_are_passed_on():
+    server = FakeGraphQLServer()
+    batcher = mutation_batcher.MutationBatcher(server.execute, window=60)
+    batcher.queue(SET_CONFIG, {"name": "run", "config": "0"}, num_retries=1)
+    batcher.queue(SET_CONFIG, {"name": "run", "config": "1"}, num_retries=1)
+    batcher.queue(SET_CONFIG, {"name": "run", "config": "2"})
+    batcher.flush()
+
+    assert server.kwargs == [{"num_retries": 1}, {}]
+    assert server.configs == [("run", "0"), ("run", "1"), ("run", "2")]
+
+
+def test_combine_renames_variables():
+    document, variables, aliases = mutation_batcher.combine(
+        [(SET_CONFIG, {"name": "a", "config": "1"}), (FAIL, {"name": "b"})]
+    )
+    assert variables == {"m0_name": "a", "m0_config": "1", "m1_name": "b"}
+    assert aliases == [{"m0_setConfig": "setConfig"}, {"m1_fail": "fail"}]
+    # the registered documents are left untouched
+    assert "$m0_name" not in SET_CONFIG.printed
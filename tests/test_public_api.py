@@ -5,13 +5,20 @@ test_wandb
 Tests for the `wandb.apis.PublicApi` module.
 """
 
+import base64
+import hashlib
 import os
 import json
+import numpy as np
 import pytest
 import platform
+import sys
+import six
+import time
 
 import wandb
 from wandb import Api
+from wandb.apis import public
 
 
 @pytest.fixture
@@ -249,6 +256,501 @@ def test_projects(mock_server, api):
     assert count == 2
 
 
+class FakeProjectsClient(object):
+    """Serves `pages` pages of two projects, optionally failing on one."""
+
+    def __init__(self, pages, fail_page=None):
+        self.pages = pages
+        self.fail_page = fail_page
+        self.cursors = []
+
+    def execute(self, query, variable_values):
+        cursor = variable_values["cursor"]
+        self.cursors.append(cursor)
+        page = 0 if cursor is None else int(cursor) + 1
+        if page == self.fail_page:
+            raise ValueError("page %d failed" % page)
+        edges = [
+            {"node": {"name": "proj-%d-%d" % (page, i)}, "cursor": str(page)}
+            for i in range(2)
+        ]
+        return {
+            "models": {
+                "edges": edges,
+                "pageInfo": {"hasNextPage": page < self.pages - 1},
+            }
+        }
+
+
+def wait_for_fetches(client, count):
+    for _ in range(100):
+        if len(client.cursors) >= count:
+            break
+        time.sleep(0.01)
+    # give a runaway prefetch thread a chance to show up
+    time.sleep(0.05)
+
+
+@pytest.mark.parametrize("prefetch", [0, 1, 3])
+def test_paginator_prefetch(prefetch):
+    client = FakeProjectsClient(pages=10)
+    projects = public.Projects(client, "test", per_page=2)
+    projects.prefetch = prefetch
+
+    it = iter(projects)
+    assert next(it).name == "proj-0-0"
+    # the first page is loaded on demand
+    wait_for_fetches(client, 1)
+    assert len(client.cursors) == 1
+
+    names = ["proj-0-0"] + [next(it).name for _ in range(2)]
+    wait_for_fetches(client, 2 + prefetch)
+    assert len(client.cursors) == 2 + prefetch
+
+    names += [next(it).name for _ in range(17)]
+    with pytest.raises(StopIteration):
+        next(it)
+    assert names == ["proj-%d-%d" % (page, i) for page in range(10) for i in range(2)]
+    assert client.cursors == [None] + [str(page) for page in range(9)]
+
+
+def test_paginator_prefetch_settings(monkeypatch):
+    client = FakeProjectsClient(pages=10)
+    monkeypatch.setenv("WANDB_PREFETCH_PAGES", "0")
+    assert public.Projects(client, "test").prefetch == 0
+    monkeypatch.setenv("WANDB_PREFETCH_PAGES", "2")
+    projects = public.Projects(client, "test", per_page=2)
+    assert projects.prefetch == 2
+
+    # an abandoned iteration doesn't keep the prefetch thread around
+    projects.PREFETCH_IDLE_TIMEOUT = 0.1
+    it = iter(projects)
+    assert [next(it).name for _ in range(3)][-1] == "proj-1-0"
+    wait_for_fetches(client, 4)
+    for _ in range(100):
+        if projects._prefetch_thread is None:
+            break
+        time.sleep(0.01)
+    assert projects._prefetch_thread is None
+    # iterating again picks up where the prefetch thread stopped
+    assert [next(it).name for _ in range(17)][-1] == "proj-9-1"
+    assert client.cursors == [None] + [str(page) for page in range(9)]
+
+
+def test_paginator_prefetch_error():
+    client = FakeProjectsClient(pages=5, fail_page=2)
+    projects = public.Projects(client, "test", per_page=2)
+    projects.prefetch = 2
+
+    it = iter(projects)
+    assert [next(it).name for _ in range(4)] == [
+        "proj-0-0",
+        "proj-0-1",
+        "proj-1-0",
+        "proj-1-1",
+    ]
+    with pytest.raises(ValueError, match="page 2 failed"):
+        next(it)
+
+    # the failed page is fetched again on the next load
+    client.fail_page = None
+    assert [next(it).name for _ in range(6)][-1] == "proj-4-1"
+    assert len(projects.objects) == 10
+
+
+@pytest.mark.skipif(sys.version_info < (3, 5), reason="requires asyncio")
+def test_paginator_async_iteration():
+    import asyncio
+
+    client = FakeProjectsClient(pages=3)
+    projects = public.Projects(client, "test", per_page=2)
+    it = projects.__aiter__()
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    names = []
+    try:
+        while True:
+            names.append(loop.run_until_complete(it.__anext__()).name)
+    except StopAsyncIteration:  # noqa: F821
+        pass
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
+    assert names == ["proj-%d-%d" % (page, i) for page in range(3) for i in range(2)]
+
+
+@pytest.mark.skipif(sys.version_info < (3, 5), reason="requires asyncio")
+def test_paginator_concurrent_async_iterations():
+    import asyncio
+    from concurrent.futures import ThreadPoolExecutor
+
+    class SlowProjectsClient(FakeProjectsClient):
+        def execute(self, query, variable_values):
+            time.sleep(0.01)
+            return super(SlowProjectsClient, self).execute(query, variable_values)
+
+    client = SlowProjectsClient(pages=5)
+    projects = public.Projects(client, "test", per_page=2)
+    projects.prefetch = 0
+    iterators = [projects.__aiter__(), projects.__aiter__()]
+    executor = ThreadPoolExecutor(2)
+    for it in iterators:
+        it._executor = executor
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    names = []
+    try:
+        while True:
+            names.append(
+                [
+                    project.name
+                    for project in loop.run_until_complete(
+                        asyncio.gather(*[it.__anext__() for it in iterators])
+                    )
+                ]
+            )
+    except StopAsyncIteration:  # noqa: F821
+        pass
+    finally:
+        executor.shutdown()
+        asyncio.set_event_loop(None)
+        loop.close()
+    expected = ["proj-%d-%d" % (page, i) for page in range(5) for i in range(2)]
+    assert names == [[name, name] for name in expected]
+    # each page is loaded once
+    assert client.cursors == [None] + [str(page) for page in range(4)]
+
+
+class FakeRunsClient(object):
+    """Serves a page of runs in one sweep, and the sweep."""
+
+    def __init__(self, n_runs):
+        self.n_runs = n_runs
+        self.queries = []
+
+    def execute(self, query, variable_values):
+        self.queries.append(query.loc.source.body)
+        if "withRuns" in variable_values:
+            return {"project": {"sweep": {"name": variable_values["name"]}}}
+        node = {
+            "name": None,
+            "displayName": "run",
+            "sweepName": "sweep",
+            "state": "finished",
+            "config": json.dumps({"lr": {"value": 0.1}, "epochs": {"value": 10}}),
+            "summaryMetrics": json.dumps({"loss": 0.5, "acc": 0.9}),
+        }
+        edges = [
+            {"node": dict(node, name="run-%d" % i), "cursor": str(i)}
+            for i in range(self.n_runs)
+        ]
+        return {
+            "project": {
+                "runCount": self.n_runs,
+                "runs": {"edges": edges, "pageInfo": {"hasNextPage": False}},
+            }
+        }
+
+
+def test_runs_projection():
+    client = FakeRunsClient(n_runs=3)
+    runs = public.Runs(
+        client, "test", "test", fields=["state"], config_keys=["lr"], summary_keys=[]
+    )
+    runs.prefetch = 0
+    assert [run.id for run in runs] == ["run-0", "run-1", "run-2"]
+
+    query = client.queries[0]
+    assert "config" in query
+    assert "summaryMetrics" in query
+    assert "systemMetrics" not in query
+    assert "historyKeys" not in query
+    run = runs[0]
+    assert run.config == {"lr": 0.1}
+    assert run.summary_metrics == {}
+    assert run.state == "finished"
+    with pytest.raises(wandb.CommError, match="projection"):
+        run.update()
+
+
+def test_runs_lazy_decoding():
+    client = FakeRunsClient(n_runs=2)
+    runs = public.Runs(client, "test", "test")
+    runs.prefetch = 0
+    run = list(runs)[0]
+    assert run.name == "run"
+    # nothing is decoded until it's used
+    assert isinstance(run._attrs["config"], six.string_types)
+    assert isinstance(run._attrs["summaryMetrics"], six.string_types)
+
+    assert run.summary_metrics == {"loss": 0.5, "acc": 0.9}
+    assert run.summaryMetrics is run.summary_metrics
+    assert run.rawconfig == {"lr": 0.1, "epochs": 10}
+    assert run.config == {"lr": 0.1, "epochs": 10}
+    assert run.system_metrics == {}
+    run.load()
+    assert run.config == {"lr": 0.1, "epochs": 10}
+
+    runs = public.Runs(client, "test", "test", summary_keys=["loss"])
+    runs.prefetch = 0
+    assert runs[1].summary_metrics == {"loss": 0.5}
+    assert runs[1].config == {"lr": 0.1, "epochs": 10}
+
+
+def test_runs_projection_unknown_field():
+    with pytest.raises(ValueError):
+        public.Runs(FakeRunsClient(n_runs=1), "test", "test", fields=["nope"])
+
+
+def test_runs_lazy_sweep():
+    client = FakeRunsClient(n_runs=3)
+    runs = public.Runs(client, "test", "test")
+    runs.prefetch = 0
+    assert len(list(runs)) == 3
+    assert len(client.queries) == 1
+
+    sweep = runs[1].sweep
+    assert sweep.name == "sweep"
+    assert runs[0].sweep is sweep
+    assert [run.id for run in sweep.runs] == ["run-0", "run-1", "run-2"]
+    assert len(client.queries) == 2
+
+
+class FakeHistoryRun(object):
+    def __init__(self, run_id, rows):
+        self.id = run_id
+        self.rows = rows
+
+    def scan_history(self, keys=None, page_size=1000):
+        return iter(self.rows)
+
+
+def test_export_history(mock_server, api):
+    runs = [
+        FakeHistoryRun("a", [{"_step": 0, "loss": 1.0}, {"_step": 1, "acc": 0.5}]),
+        FakeHistoryRun("b", []),
+        FakeHistoryRun("c", [{"_step": 0, "loss": 2, "tag": "x"}]),
+    ]
+    table = api.export_history(runs, keys=["loss"], max_workers=2, pandas=False)
+    assert list(table) == ["run", "loss", "_step", "acc", "tag"]
+    assert table["run"] == ["a", "a", "c"]
+    assert table["_step"].tolist() == [0, 1, 0]
+    assert table["loss"][0] == 1.0 and table["loss"][2] == 2.0
+    assert np.isnan(table["loss"][1]) and np.isnan(table["acc"][2])
+    assert table["tag"] == [None, None, "x"]
+
+    df = api.export_history(runs)
+    assert df.shape == (3, 5)
+    assert list(df["run"]) == ["a", "a", "c"]
+
+
+class FakeHistoryClient(object):
+    """Serves history rows with a loss every step and an acc every other step."""
+
+    def __init__(self):
+        self.pages = []
+
+    def execute(self, query, variable_values):
+        min_step, max_step = variable_values["minStep"], variable_values["maxStep"]
+        self.pages.append(min_step)
+        rows = []
+        for step in range(min_step, max_step):
+            row = {"_step": step, "loss": step / 10.0}
+            if step % 2 == 0:
+                row["acc"] = step
+            rows.append(json.dumps(row))
+        return {"project": {"run": {"history": rows}}}
+
+
+def test_history_scan_columns():
+    client = FakeHistoryClient()
+    run = FakeHistoryRun("a", [])
+    run.entity, run.project = "test", "test"
+    scan = public.HistoryScan(client, run, min_step=0, max_step=25, page_size=10)
+
+    chunks = list(scan.column_chunks())
+    assert [n_rows for n_rows, _ in chunks] == [10, 10, 5]
+    assert client.pages == [0, 10, 20]
+    assert chunks[0][1]["_step"].dtype == np.int64
+    assert np.isnan(chunks[0][1]["acc"][1])
+
+    columns = scan.to_columns(pandas=False)
+    assert list(columns) == ["_step", "acc", "loss"]
+    assert columns["_step"].tolist() == list(range(25))
+    assert columns["loss"][24] == 2.4
+    assert columns["acc"][24] == 24 and np.isnan(columns["acc"][23])
+    assert [row["_step"] for row in scan] == list(range(25))
+
+    df = scan.to_columns()
+    assert df.shape == (25, 3)
+
+
+def collect_async(loop, iterable):
+    it = iterable.__aiter__()
+    items = []
+    try:
+        while True:
+            items.append(loop.run_until_complete(it.__anext__()))
+    except StopAsyncIteration:  # noqa: F821
+        pass
+    return items
+
+
+@pytest.mark.skipif(sys.version_info < (3, 5), reason="requires asyncio")
+def test_async_api(mock_server, api):
+    import asyncio
+    import threading
+
+    async_api = public.AsyncApi(api=api, max_workers=4)
+    # the loop is looked up when the awaitable is awaited
+    pending_run = async_api.run("test/test/test")
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        run, art = loop.run_until_complete(
+            asyncio.gather(
+                pending_run,
+                async_api.artifact("entity/project/mnist:v0", type="dataset"),
+            )
+        )
+        assert run.summary_metrics == {"acc": 100, "loss": 0}
+        assert art.name == "mnist:v0"
+
+        runs = collect_async(loop, async_api.runs("test/test"))
+        assert len(runs) == 2
+
+        client = FakeHistoryClient()
+        history_run = FakeHistoryRun("a", [])
+        history_run.entity, history_run.project = "test", "test"
+        scan_threads = []
+
+        def scan_history(page_size=1000):
+            scan_threads.append(threading.current_thread())
+            return public.HistoryScan(
+                client, history_run, min_step=0, max_step=25, page_size=page_size
+            )
+
+        history_run.scan_history = scan_history
+        rows = collect_async(loop, async_api.scan_history(history_run, page_size=10))
+        assert [row["_step"] for row in rows] == list(range(25))
+        assert client.pages == [0, 10, 20]
+        assert scan_threads[0] is not threading.main_thread()
+    finally:
+        async_api.close()
+        asyncio.set_event_loop(None)
+        loop.close()
+    assert api._base_client.transport.session is not None
+
+
+class FakeStorage(object):
+    """Stands in for requests.get, serving byte ranges of `contents`."""
+
+    def __init__(self, contents):
+        self.contents = contents
+        self.ranges = []
+
+    def __call__(self, url, headers=None, **kwargs):
+        data = self.contents[url]
+        start = 0
+        status_code = 200
+        if headers and "Range" in headers:
+            start = int(headers["Range"][len("bytes=") : -1])
+            status_code = 206 if start < len(data) else 416
+        self.ranges.append((url, start))
+        return FakeResponse(status_code, data[start:])
+
+
+class FakeResponse(object):
+    def __init__(self, status_code, data):
+        self.status_code = status_code
+        self.data = data
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size):
+        return [self.data]
+
+
+class FakeFilesClient(object):
+    def __init__(self, contents):
+        self.contents = contents
+
+    def execute(self, query, variable_values):
+        edges = [
+            {
+                "node": {
+                    "id": name,
+                    "name": name,
+                    "url": name,
+                    "sizeBytes": len(data),
+                    "md5": base64.b64encode(hashlib.md5(data).digest()).decode(),
+                },
+                "cursor": name,
+            }
+            for name, data in sorted(self.contents.items())
+        ]
+        return {
+            "project": {
+                "run": {
+                    "fileCount": len(edges),
+                    "files": {"edges": edges, "pageInfo": {"hasNextPage": False}},
+                }
+            }
+        }
+
+
+def test_files_download_all(runner, mock_server, api, mocker):
+    contents = {"a.txt": b"a" * 100, "dir/b.txt": b"b" * 50, "c.txt": b"c" * 10}
+    storage = FakeStorage(contents)
+    mocker.patch("wandb.util.requests.get", storage)
+    run = FakeHistoryRun("run", [])
+    run.entity, run.project = "test", "test"
+    progress = []
+    with runner.isolated_filesystem():
+        os.mkdir("out")
+        with open("out/c.txt", "wb") as f:
+            f.write(b"c" * 10)
+        with open("out/a.txt.part", "wb") as f:
+            f.write(b"a" * 40)
+        files = public.Files(FakeFilesClient(contents), run)
+        paths = files.download_all(
+            "out", max_workers=2, callback=lambda done, total: progress.append(done)
+        )
+
+        assert sorted(paths) == sorted(os.path.join("out", n) for n in contents)
+        for name, data in contents.items():
+            with open(os.path.join("out", name), "rb") as f:
+                assert f.read() == data
+        assert not os.path.exists("out/a.txt.part")
+        # identical files are skipped, partial ones resumed
+        assert sorted(storage.ranges) == [("a.txt", 40), ("dir/b.txt", 0)]
+        assert max(progress) == 160
+
+
+def test_files_download_all_stale_part(runner, mock_server, api, mocker):
+    contents = {"a.txt": b"a" * 100, "b.txt": b"b" * 20}
+    storage = FakeStorage(contents)
+    mocker.patch("wandb.util.requests.get", storage)
+    run = FakeHistoryRun("run", [])
+    run.entity, run.project = "test", "test"
+    progress = []
+    with runner.isolated_filesystem():
+        os.mkdir("out")
+        with open("out/a.txt.part", "wb") as f:
+            f.write(b"x" * 40)
+        files = public.Files(FakeFilesClient(contents), run)
+        files.download_all(
+            "out", max_workers=1, callback=lambda done, total: progress.append(done)
+        )
+
+        with open("out/a.txt", "rb") as f:
+            assert f.read() == contents["a.txt"]
+        assert storage.ranges == [("a.txt", 40), ("a.txt", 0), ("b.txt", 0)]
+        # the stale partial file isn't counted, nor the bytes downloaded twice
+        assert progress == [60, 100, 120]
+
+
 def test_delete_file(runner, mock_server, api):
     run = api.run("test/test/test")
     file = run.files()[0]
@@ -0,0 +1,118 @@
+import time
+
+from wandb.apis import public, query_cache
+from wandb.apis.query_cache import QueryCache
+
+
+class FakeExecute(object):
+    def __init__(self, state="finished"):
+        self.state = state
+        self.calls = 0
+
+    def __call__(self, document, variable_values=None):
+        self.calls += 1
+        return {
+            "project": {"run": {"name": variable_values["name"], "state": self.state}}
+        }
+
+
+def run_vars(name="run"):
+    return {"entity": "test", "project": "test", "name": name}
+
+
+def test_cache_hit(tmpdir):
+    cache = QueryCache(str(tmpdir), ttl=60)
+    execute = FakeExecute()
+    query = public.Runs.QUERY
+    first = cache.execute(execute, query, run_vars())
+    assert cache.execute(execute, query, run_vars()) == first
+    assert execute.calls == 1
+    cache.execute(execute, query, run_vars("other"))
+    assert execute.calls == 2
+
+
+def test_cache_cleared_by_mutation(tmpdir):
+    cache = QueryCache(str(tmpdir), ttl=60)
+    execute = FakeExecute()
+    mutation = public.gql(
+        """
+        mutation UpsertBucket($name: String!) {
+            upsertBucket(input: {name: $name}) { bucket { id } }
+        }
+        """
+    )
+    cache.execute(execute, public.Runs.QUERY, run_vars())
+    cache.execute(execute, mutation, run_vars())
+    cache.execute(execute, public.Runs.QUERY, run_vars())
+    assert execute.calls == 3
+
+
+def test_cache_ttl(tmpdir):
+    cache = QueryCache(str(tmpdir), ttl=0.01)
+    execute = FakeExecute()
+    cache.execute(execute, public.Runs.QUERY, run_vars())
+    time.sleep(0.05)
+    cache.execute(execute, public.Runs.QUERY, run_vars())
+    assert execute.calls == 2
+
+
+def test_cache_running_runs(tmpdir):
+    cache = QueryCache(str(tmpdir), ttl=60)
+    execute = FakeExecute(state="running")
+    cache.execute(execute, public.Runs.QUERY, run_vars())
+    cache.execute(execute, public.Runs.QUERY, run_vars())
+    assert execute.calls == 2
+
+    # other queries about the run bypass the cache too
+    history = FakeExecute()
+    cache.execute(history, public.HistoryScan.QUERY, run_vars())
+    cache.execute(history, public.HistoryScan.QUERY, run_vars())
+    assert history.calls == 2
+
+
+def test_cache_invalidate(tmpdir):
+    cache = QueryCache(str(tmpdir), ttl=60)
+    execute = FakeExecute()
+    for name in ["a", "b"]:
+        cache.execute(execute, public.Runs.QUERY, run_vars(name))
+    cache.invalidate("test", "test", "a")
+    for name in ["a", "b"]:
+        cache.execute(execute, public.Runs.QUERY, run_vars(name))
+    assert execute.calls == 3
+
+    cache.invalidate()
+    cache.execute(execute, public.Runs.QUERY, run_vars("b"))
+    assert execute.calls == 4
+
+
+class FakeHistoryExecute(FakeExecute):
+    """Serves history pages, which don't include the state of the run."""
+
+    def __init__(self, state="finished"):
+        super(FakeHistoryExecute, self).__init__(state)
+        self.state_calls = 0
+
+    def __call__(self, document, variable_values=None):
+        if document is query_cache.RUN_STATE_QUERY:
+            self.state_calls += 1
+            run = {"name": variable_values["name"], "state": self.state}
+            return {"project": {"run": run}}
+        self.calls += 1
+        return {"project": {"run": {"history": []}}}
+
+
+def test_cache_looks_up_run_state(tmpdir):
+    cache = QueryCache(str(tmpdir), ttl=60)
+    running = FakeHistoryExecute(state="running")
+    for _ in range(2):
+        cache.execute(running, public.HistoryScan.QUERY, run_vars())
+    assert running.calls == 2
+    assert running.state_calls == 1
+
+    finished = FakeHistoryExecute()
+    for name in ["a", "a", "b"]:
+        cache.execute(finished, public.HistoryScan.QUERY, run_vars(name))
+    cache.execute(finished, public.Files.QUERY, run_vars("a"))
+    assert finished.calls == 3
+    # looked up once per run
+    assert finished.state_calls == 2
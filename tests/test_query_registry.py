@@ -0,0 +1,25 @@
+from wandb.apis import internal_runqueue, public, query_registry  # noqa: F401
+from wandb.old import summary  # noqa: F401
+from wandb.sdk.internal import internal_api  # noqa: F401
+
+
+QUERY = """
+query Viewer {
+    viewer { id }
+}
+"""
+
+
+def test_documents_are_shared():
+    document = query_registry.gql(QUERY)
+    assert query_registry.gql(QUERY) is document
+    assert document._ast is None
+    assert document.definitions[0].operation == "query"
+    assert document.printed == query_registry.gql(QUERY).printed
+    assert "viewer" in document.printed
+
+
+def test_all_documents_parse():
+    # queries are only parsed on first use, make sure they're all valid
+    assert public.Runs.QUERY in query_registry.documents()
+    query_registry.parse_all()
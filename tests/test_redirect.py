@@ -0,0 +1,72 @@
+import time
+
+import pytest
+import wandb
+from wandb.sdk.lib import redirect
+
+
+@pytest.mark.parametrize(
+    "data,expected",
+    [
+        ("plain\n", "plain\n"),
+        ("10%\r50%\r100%\ndone\n", "\r100%\ndone\n"),
+        ("line\r\nnext\r\n", "line\nnext\n"),
+        ("a\nb 1\rb 2\rb 3", "a\nb 3"),
+        (b"\r1/3\r2/3\r3/3", b"\r3/3"),
+    ],
+)
+def test_collapse_carriage_returns(data, expected):
+    assert redirect._collapse_carriage_returns(data) == expected
+
+
+def test_output_coalescer_batches_writes():
+    received = []
+    coalescer = redirect.OutputCoalescer(
+        lambda name, data: received.append((name, data)), max_latency=0.5
+    )
+    for i in range(100):
+        coalescer.write("stdout", "\rprogress {}".format(i))
+    coalescer.write("stderr", "warning\n")
+    time.sleep(1)
+    assert sorted(received) == [("stderr", "warning\n"), ("stdout", "\rprogress 99")]
+
+    coalescer.write("stdout", "\n")
+    coalescer.stop()
+    assert received[-1] == ("stdout", "\n")
+
+    # after stopping writes are passed on directly
+    coalescer.write("stdout", b"late\n")
+    assert received[-1] == ("stdout", b"late\n")
+
+
+def test_output_coalescer_keeps_stream_order():
+    received = []
+    coalescer = redirect.OutputCoalescer(
+        lambda name, data: received.append((name, data)), max_latency=1
+    )
+    coalescer.write("stdout", "a\n")
+    coalescer.write("stdout", "b\n")
+    coalescer.write("stderr", "error\n")
+    coalescer.write("stdout", "c\n")
+    coalescer.flush()
+    assert received == [
+        ("stdout", "a\nb\n"),
+        ("stderr", "error\n"),
+        ("stdout", "c\n"),
+    ]
+    coalescer.stop()
+
+
+def test_output_coalescer_no_latency():
+    received = []
+    coalescer = redirect.OutputCoalescer(
+        lambda name, data: received.append(data), max_latency=0
+    )
+    coalescer.write("stdout", "a\rb\n")
+    assert received == ["\rb\n"]
+
+
+def test_console_max_latency_setting():
+    assert wandb.Settings(_console_max_latency="0.5")._console_max_latency == 0.5
+    with pytest.raises(TypeError):
+        wandb.Settings(_console_max_latency=-1)
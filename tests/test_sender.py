@@ -222,6 +222,22 @@ def test_parallel_requests(
     work_queue.join()
 
 
+def test_run_start_does_not_wait_for_meta(
+    mocked_run, mock_server, sender, start_backend, stop_backend, monkeypatch,
+):
+    meta = sys.modules[HandleManager.__module__].meta
+    release = threading.Event()
+    monkeypatch.setattr(meta.Meta, "probe", lambda self: release.wait(30))
+    start_backend()
+
+    start = time.time()
+    assert sender.communicate_run_start(sender._make_run(mocked_run)) is not None
+    assert time.time() - start < 5
+    release.set()
+    stop_backend()
+    assert len(mock_server.ctx["storage?file=wandb-metadata.json"]) == 1
+
+
 def test_resume_success(
     mocked_run, test_settings, mock_server, sender, start_backend,
 ):
@@ -263,6 +279,18 @@ def test_resume_error_must(
     )
 
 
+def test_config_updates_are_batched(
+    mocked_run, mock_server, sender, start_backend, stop_backend,
+):
+    start_backend()
+    sender.publish_config(key="a", val=1)
+    sender.publish_config(key="b", val=2)
+    stop_backend()
+    # the last update is sent, at the latest when the sender finishes
+    assert mock_server.ctx["config"][-1]["a"] == {"desc": None, "value": 1}
+    assert mock_server.ctx["config"][-1]["b"] == {"desc": None, "value": 2}
+
+
 def test_save_live_existing_file(
     mocked_run, mock_server, sender, start_backend, stop_backend,
 ):
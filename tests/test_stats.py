@@ -0,0 +1,156 @@
+import subprocess
+import sys
+import time
+
+import psutil
+import pytest
+from wandb.sdk.internal import stats
+from wandb.sdk.internal.settings_static import SettingsStatic
+from wandb.sdk.wandb_settings import Settings
+
+
+class Interface(object):
+    def __init__(self):
+        self.published = []
+
+    def publish_stats(self, stats_dict):
+        self.published.append(stats_dict)
+
+
+def make_stats(**settings):
+    interface = Interface()
+    system_stats = stats.SystemStats(
+        pid=1, interface=interface, settings=SettingsStatic(settings)
+    )
+    return system_stats, interface
+
+
+def test_running_stat():
+    running = stats.RunningStat()
+    for value in [3, 1, 2]:
+        running.add(value)
+    assert (running.count, running.mean, running.min, running.max) == (3, 2, 1, 3)
+
+
+def test_system_stats_flush_averages():
+    system_stats, interface = make_stats()
+    values = iter([10.0, 20.0, 60.0])
+    system_stats._group_stats = lambda group, out: out.update(
+        {"cpu": next(values)} if group == "cpu" else {}
+    )
+    system_stats._sample(["cpu"])
+    system_stats._sample(["cpu"])
+    system_stats.flush()
+    assert interface.published == [{"cpu": 15.0}]
+    # a flush without samples takes one
+    system_stats.flush()
+    assert interface.published[-1] == {"cpu": 60.0}
+
+
+def test_system_stats_high_frequency_min_max():
+    system_stats, interface = make_stats(
+        _stats_sample_rate_seconds=1, _stats_sample_rates={"cpu": 0.1}
+    )
+    values = iter([10.0, 20.0, 60.0, 50.0])
+    system_stats._group_stats = lambda group, out: out.update(
+        {"cpu": next(values)} if group == "cpu" else {"disk": 5.0}
+    )
+    system_stats._sample(["cpu", "disk"])
+    system_stats._sample(["cpu"])
+    system_stats._sample(["cpu"])
+    system_stats.flush()
+    assert interface.published == [
+        {"cpu": 30.0, "cpu.min": 10.0, "cpu.max": 60.0, "disk": 5.0}
+    ]
+
+
+def test_system_stats_sample_rates_validated():
+    settings = Settings()
+    settings.update(_stats_sample_rates={"cpu": 0.1, "gpu": 1})
+    with pytest.raises(TypeError, match="gpus"):
+        settings.update(_stats_sample_rates={"gpus": 0.1})
+    with pytest.raises(TypeError, match="not positive"):
+        settings.update(_stats_sample_rates={"cpu": 0})
+    with pytest.raises(TypeError, match="not a number"):
+        settings.update(_stats_sample_rates={"cpu": "fast"})
+    assert settings._stats_sample_rates == {"cpu": 0.1, "gpu": 1}
+
+
+def test_system_stats_thread_publishes():
+    system_stats, interface = make_stats(
+        _stats_sample_rate_seconds=0.05, _stats_samples_to_average=2
+    )
+    system_stats.start()
+    time.sleep(0.5)
+    system_stats.shutdown()
+    assert len(interface.published) >= 3
+    assert "cpu" in interface.published[0]
+    assert "network" in interface.published[-1]
+
+
+def test_gpus_in_use_cached(monkeypatch):
+    system_stats, _ = make_stats(_stats_process_refresh_seconds=60)
+    calls = []
+    monkeypatch.setattr(
+        stats, "user_process_tree", lambda: calls.append(1) or [psutil.Process()]
+    )
+    monkeypatch.setattr(
+        stats, "gpu_in_use_by_this_process", lambda handle, pids: handle == "b"
+    )
+    system_stats._gpu_handles = ["a", "b"]
+    assert system_stats._gpus_in_use_by_us() == {1}
+    assert system_stats._gpus_in_use_by_us() == {1}
+    assert len(calls) == 1
+
+
+def test_process_tree_stats(monkeypatch):
+    children = [
+        subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+        for _ in range(2)
+    ]
+    try:
+        monkeypatch.setattr(
+            stats,
+            "user_process_tree",
+            lambda: [psutil.Process(c.pid) for c in children] + [psutil.Process()],
+        )
+        system_stats, _ = make_stats()
+        first = {}
+        system_stats._group_stats("proc", first)
+        second = {}
+        system_stats._group_stats("proc", second)
+    finally:
+        for child in children:
+            child.kill()
+            child.wait()
+
+    # our own process is not part of the tree
+    assert second["proc.tree.count"] == 2
+    assert second["proc.tree.memory.rssMB"] > 0
+    assert second["proc.tree.memory.ussMB"] > 0
+    assert second["proc.tree.cpu.percent"] >= 0
+    if sys.platform.startswith("linux"):
+        assert second["proc.tree.fds"] > 0
+        assert second["proc.tree.io.readMBps"] >= 0
+
+
+def test_process_tree_stats_uss_access_denied(monkeypatch):
+    def memory_full_info(self):
+        raise psutil.AccessDenied(self.pid)
+
+    monkeypatch.setattr(psutil.Process, "memory_full_info", memory_full_info)
+    child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    try:
+        monkeypatch.setattr(
+            stats, "user_process_tree", lambda: [psutil.Process(child.pid)]
+        )
+        system_stats, _ = make_stats()
+        result = {}
+        system_stats._group_stats("proc", result)
+    finally:
+        child.kill()
+        child.wait()
+
+    # the process still counts, its uss falls back to the rss
+    assert result["proc.tree.count"] == 1
+    assert result["proc.tree.memory.ussMB"] == result["proc.tree.memory.rssMB"] > 0
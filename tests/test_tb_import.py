@@ -0,0 +1,156 @@
+import json
+import os
+
+import pytest
+import wandb
+from wandb.proto import wandb_internal_pb2
+from wandb.sync import tb_import
+
+pytest.importorskip("tensorboard")
+from tensorboard.compat.proto import event_pb2, summary_pb2  # noqa: E402
+from tensorboard.summary.writer.event_file_writer import EventFileWriter  # noqa: E402
+
+
+def write_events(logdir, events):
+    writer = EventFileWriter(logdir)
+    for step, values in events:
+        summary = summary_pb2.Summary(
+            value=[
+                summary_pb2.Summary.Value(tag=tag, simple_value=value)
+                for tag, value in values.items()
+            ]
+        )
+        writer.add_event(
+            event_pb2.Event(wall_time=1600000000 + step, step=step, summary=summary)
+        )
+    writer.close()
+
+
+def read_datastore(path):
+    ds = tb_import.datastore.DataStore(for_import=True)
+    ds.open_for_scan(path)
+    records = []
+    while True:
+        data = ds.scan_data()
+        if data is None:
+            break
+        record = wandb_internal_pb2.Record()
+        record.ParseFromString(data)
+        records.append(record)
+    return records
+
+
+@pytest.fixture
+def internal_process():
+    yield
+    wandb._IS_INTERNAL_PROCESS = False
+
+
+def test_import_groups_by_step(tmpdir, monkeypatch):
+    # the importer doesn't need to run in the internal process
+    monkeypatch.setattr(wandb, "_IS_INTERNAL_PROCESS", False)
+    logdir = str(tmpdir.join("logs"))
+    write_events(
+        os.path.join(logdir, "train"), [(0, {"loss": 1.0}), (2, {"loss": 0.5})]
+    )
+    write_events(
+        os.path.join(logdir, "validation"),
+        [(0, {"loss": 2.0, "acc": 0.1}), (1, {"acc": float("nan")})],
+    )
+
+    importer = tb_import.TBImporter(
+        logdir, wandb_dir=str(tmpdir.join("wandb")), run_id="abc"
+    )
+    sync_file = importer.run()
+    assert os.path.basename(sync_file) == "run-abc.wandb"
+    assert os.path.isdir(os.path.join(os.path.dirname(sync_file), "files"))
+    assert importer.events == 4
+    assert importer.rows == 3
+    assert not wandb._IS_INTERNAL_PROCESS
+
+    records = read_datastore(sync_file)
+    types = [r.WhichOneof("record_type") for r in records]
+    assert types == ["run", "history", "history", "history", "summary", "exit", "final"]
+    assert records[0].run.run_id == "abc"
+    assert records[0].run.start_time.seconds == 1600000000
+
+    rows = [
+        {item.key: json.loads(item.value_json) for item in r.history.item}
+        for r in records[1:4]
+    ]
+    assert [row["global_step"] for row in rows] == [0, 1, 2]
+    assert [row["_step"] for row in rows] == [0, 1, 2]
+    assert rows[0]["train/loss"] == 1.0
+    assert rows[0]["validation/loss"] == 2.0
+    assert rows[0]["validation/acc"] == pytest.approx(0.1)
+    assert rows[1]["validation/acc"] != rows[1]["validation/acc"]
+    assert rows[2] == {
+        "train/loss": 0.5,
+        "global_step": 2,
+        "_timestamp": 1600000002.0,
+        "_runtime": 2,
+        "_step": 2,
+    }
+
+    summary = {u.key: json.loads(u.value_json) for u in records[4].summary.update}
+    assert summary["train/loss"] == 0.5
+    assert summary["validation/loss"] == 2.0
+
+
+def test_import_later_values_win(tmpdir):
+    logdir = str(tmpdir.join("logs"))
+    # a restarted run writes a second event file with the same steps
+    write_events(logdir, [(0, {"loss": 1.0}), (1, {"loss": 0.9})])
+    write_events(logdir, [(1, {"loss": 0.5})])
+    chunks = tb_import._ScalarChunks(chunk_size=1)
+    importer = tb_import.TBImporter(
+        logdir, wandb_dir=str(tmpdir.join("wandb")), run_id="abc"
+    )
+    importer._scalars = chunks
+    records = read_datastore(importer.run())
+    rows = [
+        {item.key: json.loads(item.value_json) for item in r.history.item}
+        for r in records
+        if r.HasField("history")
+    ]
+    assert [row["loss"] for row in rows] == [1.0, 0.5]
+
+
+def test_import_wandb_dir(tmpdir, monkeypatch):
+    logdir = str(tmpdir.join("logs"))
+    write_events(logdir, [(0, {"loss": 1.0})])
+    monkeypatch.delenv("WANDB_DIR", raising=False)
+    sync_file = tb_import.TBImporter(logdir, run_id="abc").run()
+    assert sync_file.startswith(os.path.join(logdir, "wandb", "offline-run-"))
+
+    root_dir = str(tmpdir.mkdir("root"))
+    monkeypatch.setenv("WANDB_DIR", root_dir)
+    sync_file = tb_import.TBImporter(logdir, run_id="def").run()
+    assert sync_file.startswith(os.path.join(root_dir, "wandb", "offline-run-"))
+
+
+def test_read_records_drops_truncated_tail(tmpdir):
+    logdir = str(tmpdir)
+    write_events(logdir, [(0, {"loss": 1.0}), (1, {"loss": 0.5})])
+    (path,) = tb_import.find_event_files(logdir)[""]
+    complete = len(list(tb_import.read_records(path)))
+    with open(path, "ab") as f:
+        f.write(b"\x10\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00partial")
+    assert len(list(tb_import.read_records(path))) == complete
+
+
+def test_sync_tensorboard_logdir(runner, live_mock_server, parse_ctx, internal_process):
+    from wandb.cli import cli
+
+    with runner.isolated_filesystem():
+        write_events("logs", [(0, {"loss": 1.0}), (1, {"loss": 0.5})])
+        result = runner.invoke(cli.sync, ["--id", "tbimport", "logs"])
+        assert result.exit_code == 0, result.output
+        assert "Importing tensorboard events from logs ... 2 rows." in result.output
+        (run_dir,) = os.listdir(os.path.join("logs", "wandb"))
+        assert run_dir.endswith("-tbimport")
+
+    ctx_util = parse_ctx(live_mock_server.get_ctx())
+    history = ctx_util.get_filestream_file_items()["wandb-history.jsonl"]
+    assert [row["loss"] for row in history] == [1.0, 0.5]
+    assert ctx_util.summary["loss"] == 0.5
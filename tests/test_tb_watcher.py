@@ -1,5 +1,8 @@
+import os
 import pytest
 import sys
+import threading
+import time
 
 PY3 = sys.version_info.major == 3 and sys.version_info.minor >= 6
 if PY3:
@@ -66,3 +69,55 @@ class TestIsTfEventsFileCreatedBy:
             tb_watcher.is_tfevents_file_created_by("me.193.tfevents", "me", 193)
             is False
         )
+
+
+class FakeInterface(object):
+    def __init__(self):
+        self.rows = []
+
+    def publish_history(self, data, step=None, run=None, publish_step=True):
+        self.rows.append(data)
+
+    def publish_files(self, files):
+        pass
+
+
+def write_scalars(logdir, tag, values):
+    from tensorboard.compat.proto import event_pb2, summary_pb2
+    from tensorboard.summary.writer.event_file_writer import EventFileWriter
+
+    writer = EventFileWriter(logdir)
+    for step, value in enumerate(values):
+        summary = summary_pb2.Summary(
+            value=[summary_pb2.Summary.Value(tag=tag, simple_value=value)]
+        )
+        writer.add_event(
+            event_pb2.Event(wall_time=time.time(), step=step, summary=summary)
+        )
+    writer.close()
+
+
+@pytest.mark.skipif(not PY3, reason="tensorboard watcher tests need python 3.6+")
+@pytest.mark.parametrize("force_polling", [False, True])
+def test_logdirs_share_one_thread(test_settings, tmpdir, monkeypatch, force_polling):
+    pytest.importorskip("tensorboard")
+    monkeypatch.setattr(tb_watcher, "SHUTDOWN_DELAY", 0)
+    test_settings.update(_start_time=time.time() - 1)
+    interface = FakeInterface()
+    watcher = tb_watcher.TBWatcher(
+        test_settings, None, interface, force_polling=force_polling
+    )
+    threads = len([t for t in threading.enumerate() if not t.daemon])
+    logdirs = [str(tmpdir.join("train")), str(tmpdir.join("validation"))]
+    for logdir in logdirs:
+        os.makedirs(logdir)
+        watcher.add(logdir, False, str(tmpdir))
+    # one watcher thread for all logdirs plus the event consumer
+    assert len([t for t in threading.enumerate() if not t.daemon]) == threads + 2
+    for logdir in logdirs:
+        write_scalars(logdir, "loss", [1.0, 0.5, 0.25])
+    watcher.finish()
+
+    for key in ["train/loss", "validation/loss"]:
+        values = [float(row[key]) for row in interface.rows if key in row]
+        assert values[0] == 1.0 and values[-1] == 0.25
@@ -2,6 +2,7 @@
 
 from flask import Flask, request, g
 import os
+import re
 import sys
 from datetime import datetime, timedelta
 import json
@@ -39,6 +40,8 @@ def mock_server(mocker):
     mock = RequestsMock(app, ctx)
     # We mock out all requests libraries, couldn't find a way to mock the core lib
     sdk_path = "wandb.sdk"
+    # wandb loads the vendored gql lazily, import it so it can be patched
+    wandb.util.vendor_import("gql.transport.requests")
     mocker.patch("gql.transport.requests.requests", mock)
     mocker.patch("wandb.wandb_sdk.internal.file_stream.requests", mock)
     mocker.patch("wandb.wandb_sdk.internal.internal_api.requests", mock)
@@ -277,6 +280,31 @@ def create_app(user_ctx=None):
             param_summary = body["variables"].get("summaryMetrics")
             if param_summary:
                 ctx.setdefault("summary", []).append(json.loads(param_summary))
+        if "mutation Batch(" in body["query"]:
+            # mutations combined by the internal api's MutationBatcher, the
+            # root fields and variables of each are prefixed with m<index>_
+            data = {}
+            for alias, prefix, field in re.findall(r"((m\d+_)(\w+)):", body["query"]):
+                variables = {
+                    k[len(prefix) :]: v
+                    for k, v in body["variables"].items()
+                    if k.startswith(prefix)
+                }
+                if field == "upsertBucket":
+                    if variables.get("config"):
+                        ctx.setdefault("config", []).append(
+                            json.loads(variables["config"])
+                        )
+                    data[alias] = {
+                        "bucket": {
+                            "id": "storageid",
+                            "name": variables.get("name", "abc123"),
+                        },
+                        "inserted": False,
+                    }
+                elif field == "useArtifact":
+                    data[alias] = {"artifact": artifact(ctx)}
+            return json.dumps({"data": data})
         if body["variables"].get("files"):
             requested_file = body["variables"]["files"][0]
             ctx["requested_file"] = requested_file
@@ -829,6 +857,9 @@ class ParseCTX(object):
         for k, v in six.iteritems(fs_file_updates):
             l = []
             for d in v:
+                if d.get("encoding") == "base64":
+                    # appended segments of live files, not json lines
+                    continue
                 offset = d.get("offset")
                 content = d.get("content")
                 assert offset is not None
@@ -236,3 +236,13 @@ def test_preprocess_base_url():
     assert s.base_url == "http://host.com"
     s.update(base_url="//http://host.com//")
     assert s.base_url == "//http://host.com"
+
+
+def test_console_max_latency_env():
+    s = Settings()
+    assert s._console_max_latency == 0.1
+    s._apply_environ({"WANDB_CONSOLE_MAX_LATENCY": "0.5"})
+    assert s._console_max_latency == 0.5
+    for value in ("-1", "abc"):
+        with pytest.raises(TypeError):
+            s._apply_environ({"WANDB_CONSOLE_MAX_LATENCY": value})
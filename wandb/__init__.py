@@ -24,6 +24,7 @@ __version__ = "0.10.20.dev1"
 # Used with pypi checks and other messages related to pip
 _wandb_module = "wandb"
 
+from importlib import import_module as _import_module
 import sys
 
 from wandb.errors import Error
@@ -57,41 +58,72 @@ AlertLevel = wandb_sdk.AlertLevel
 Settings = wandb_sdk.Settings
 Config = wandb_sdk.Config
 
-from wandb.apis import InternalApi, PublicApi
+from wandb.apis import InternalApi
 from wandb.errors.error import CommError, UsageError
 
 _preinit = wandb_lib.preinit
 _lazyloader = wandb_lib.lazyloader
-from wandb import wandb_torch
 from wandb import util
 
-# Move this (keras.__init__ expects it at top level)
-from wandb.data_types import Graph
-from wandb.data_types import Image
-from wandb.data_types import Plotly
-
-# from wandb.data_types import Bokeh # keeping out of top level for now since Bokeh plots have poor UI
-from wandb.data_types import Video
-from wandb.data_types import Audio
-from wandb.data_types import Table
-from wandb.data_types import Html
-from wandb.data_types import Object3D
-from wandb.data_types import Molecule
-from wandb.data_types import Histogram
-from wandb.data_types import Classes
-from wandb.data_types import JoinedTable
-
 from wandb.wandb_agent import agent
 from wandb.wandb_controller import sweep, controller
 
-from wandb import superagent
-
 # from wandb.core import *
 from wandb.viz import visualize
-from wandb import plot
-from wandb import plots  # deprecating this
 from wandb.integration.sagemaker import sagemaker_auth
 
+# Attributes that are only imported when they're first accessed, importing
+# the data types and the public api takes a good part of `import wandb`.
+_LAZY_ATTRS = {
+    "PublicApi": ("wandb.apis", "PublicApi"),
+    "Api": ("wandb.apis", "PublicApi"),
+    "AsyncApi": ("wandb.apis.public", "AsyncApi"),
+    # Move this (keras.__init__ expects it at top level)
+    "Graph": ("wandb.data_types", "Graph"),
+    "Image": ("wandb.data_types", "Image"),
+    "Plotly": ("wandb.data_types", "Plotly"),
+    # "Bokeh": keeping out of top level for now since Bokeh plots have poor UI
+    "Video": ("wandb.data_types", "Video"),
+    "Audio": ("wandb.data_types", "Audio"),
+    "Table": ("wandb.data_types", "Table"),
+    "Html": ("wandb.data_types", "Html"),
+    "Object3D": ("wandb.data_types", "Object3D"),
+    "Molecule": ("wandb.data_types", "Molecule"),
+    "Histogram": ("wandb.data_types", "Histogram"),
+    "Classes": ("wandb.data_types", "Classes"),
+    "JoinedTable": ("wandb.data_types", "JoinedTable"),
+    # modules
+    "plot": ("wandb.plot", None),
+    "plots": ("wandb.plots", None),  # deprecating this
+    "superagent": ("wandb.superagent", None),
+    "wandb_torch": ("wandb.wandb_torch", None),
+}
+
+
+def _load_lazy_attr(name):
+    module_name, attr = _LAZY_ATTRS[name]
+    value = _import_module(module_name)
+    if attr is not None:
+        value = getattr(value, attr)
+    globals()[name] = value
+    return value
+
+
+if sys.version_info >= (3, 7):
+
+    def __getattr__(name):
+        if name in _LAZY_ATTRS:
+            return _load_lazy_attr(name)
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+    def __dir__():
+        return sorted(set(globals()) | set(_LAZY_ATTRS))
+
+
+else:
+    for _name in _LAZY_ATTRS:
+        _load_lazy_attr(_name)
+
 
 # Used to make sure we don't use some code in the incorrect process context
 _IS_INTERNAL_PROCESS = False
@@ -114,7 +146,6 @@ def _is_internal_process():
 # agent()
 
 # globals
-Api = PublicApi
 api = InternalApi()
 run = None
 config = _preinit.PreInitCallable(
@@ -184,6 +215,7 @@ __all__ = [
     "summary",
     "join",
     "Api",
+    "AsyncApi",
     "Graph",
     "Image",
     "Plotly",
@@ -3,11 +3,21 @@
 api.
 """
 
-from wandb import util
-
-reset_path = util.vendor_setup()
+import sys
 
 from .internal import Api as InternalApi
-from .public import Api as PublicApi
 
-reset_path()
+if sys.version_info >= (3, 7):
+
+    def __getattr__(name):
+        # the public api parses all of its queries when it's imported, only
+        # load it once it's used
+        if name == "PublicApi":
+            from .public import Api as PublicApi
+
+            return PublicApi
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+
+else:
+    from .public import Api as PublicApi
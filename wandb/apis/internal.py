@@ -14,7 +14,16 @@ class Api(object):
     should likely be moved to PublicApi"""
 
     def __init__(self, *args, **kwargs):
-        self.api = InternalApi(*args, **kwargs)
+        self._api_args = args
+        self._api_kwargs = kwargs
+        self._api = None
+
+    @property
+    def api(self):
+        # wandb.api is created on import, only build the client once it's used
+        if self._api is None:
+            self._api = InternalApi(*self._api_args, **self._api_kwargs)
+        return self._api
 
     @property
     def api_key(self):
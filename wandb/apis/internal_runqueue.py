@@ -6,10 +6,6 @@ import os
 import re
 import sys
 
-# from wandb.git_repo import GitRepo
-from gql import Client, gql  # type: ignore
-from gql.client import RetryError  # type: ignore
-from gql.transport.requests import RequestsHTTPTransport  # type: ignore
 import requests
 import six
 from six import BytesIO
@@ -17,6 +13,7 @@ import wandb
 from wandb import __version__, env, util
 from wandb import wandb_lib
 from wandb.apis.normalize import normalize_exceptions
+from wandb.apis.query_registry import gql, requests_transport
 from wandb.errors.error import CommError, UsageError
 from wandb.old import retry
 from wandb.old.settings import Settings
@@ -30,6 +27,9 @@ else:
 
 logger = logging.getLogger(__name__)
 
+Client = util.vendor_import("gql.client").Client
+RetryError = util.vendor_import("gql.client").RetryError
+
 
 class Api(object):
     """W&B Internal Api wrapper
@@ -79,7 +79,7 @@ class Api(object):
             "heartbeat_seconds": 30,
         }
         self.client = Client(
-            transport=RequestsHTTPTransport(
+            transport=requests_transport(
                 headers={
                     "User-Agent": self.user_agent,
                     "X-WANDB-USERNAME": env.get_username(env=self._environ),
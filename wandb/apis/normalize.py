@@ -7,13 +7,18 @@ import ast
 from functools import wraps
 import sys
 
-from gql.client import RetryError
 import requests
 import six
-from wandb import env
+from wandb import env, util
 from wandb.errors.error import CommError
 
 
+def _retry_error():
+    # gql is imported lazily by the apis, only look its RetryError up once an
+    # exception needs to be matched
+    return util.vendor_import("gql.client").RetryError
+
+
 def normalize_exceptions(func):
     """Function decorator for catching common errors and re-raising as wandb.Error"""
 
@@ -24,7 +29,7 @@ def normalize_exceptions(func):
             return func(*args, **kwargs)
         except requests.HTTPError as err:
             raise CommError(err.response, err)
-        except RetryError as err:
+        except _retry_error() as err:
             if (
                 "response" in dir(err.last_exception)
                 and err.last_exception.response is not None
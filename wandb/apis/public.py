@@ -1,18 +1,19 @@
+import collections
+import copy
 import datetime
 from functools import partial
 import json
 import logging
+from multiprocessing.pool import ThreadPool
 import os
 import platform
 import re
 import shutil
 import sys
 import tempfile
+import threading
 import time
 
-from gql import Client, gql
-from gql.client import RetryError
-from gql.transport.requests import RequestsHTTPTransport
 import requests
 import six
 from six.moves import urllib
@@ -20,6 +21,8 @@ import wandb
 from wandb import __version__, env, util
 from wandb.apis.internal import Api as InternalApi
 from wandb.apis.normalize import normalize_exceptions
+from wandb.apis.query_cache import QueryCache
+from wandb.apis.query_registry import gql, requests_transport
 from wandb.data_types import WBValue
 from wandb.errors.term import termlog
 from wandb.old.retry import retriable
@@ -36,6 +39,9 @@ else:
 
 logger = logging.getLogger(__name__)
 
+Client = util.vendor_import("gql.client").Client
+RetryError = util.vendor_import("gql.client").RetryError
+
 # Only retry requests for 20 seconds in the public api
 RETRY_TIMEDELTA = datetime.timedelta(seconds=20)
 WANDB_INTERNAL_KEYS = {"_wandb", "wandb_version"}
@@ -71,6 +77,52 @@ RUN_FRAGMENT = """fragment RunFragment on Run {
     historyKeys
 }"""
 
+# Fields of RUN_FRAGMENT that can be selected with `Api.runs(fields=...)`, by
+# name, and the fields every listed run needs
+RUN_FIELDS = {
+    "id": "id",
+    "tags": "tags",
+    "name": "name",
+    "displayName": "displayName",
+    "sweepName": "sweepName",
+    "state": "state",
+    "config": "config",
+    "commit": "commit",
+    "readOnly": "readOnly",
+    "createdAt": "createdAt",
+    "heartbeatAt": "heartbeatAt",
+    "description": "description",
+    "notes": "notes",
+    "systemMetrics": "systemMetrics",
+    "summaryMetrics": "summaryMetrics",
+    "historyLineCount": "historyLineCount",
+    "user": "user {\n        name\n        username\n    }",
+    "historyKeys": "historyKeys",
+}
+REQUIRED_RUN_FIELDS = ("id", "name", "displayName", "sweepName", "state")
+
+
+def run_fragment(fields):
+    """Returns a RunFragment selecting only `fields` (and the required
+    ones), which can be snake_case or camelCase names of RUN_FIELDS."""
+    selected = list(REQUIRED_RUN_FIELDS)
+    for field in fields:
+        key = field if field in RUN_FIELDS else Attrs.snake_to_camel(field)
+        if key == "summary":
+            key = "summaryMetrics"
+        if key not in RUN_FIELDS:
+            raise ValueError(
+                "Unknown run field {}, expected one of {}".format(
+                    field, ", ".join(RUN_FIELDS)
+                )
+            )
+        if key not in selected:
+            selected.append(key)
+    return "fragment RunFragment on Run {\n%s\n}" % "\n".join(
+        "    " + RUN_FIELDS[key] for key in selected
+    )
+
+
 FILE_FRAGMENT = """fragment RunFilesFragment on Run {
     files(names: $fileNames, after: $fileCursor, first: $fileLimit) {
         edges {
@@ -163,19 +215,25 @@ ARTIFACT_FILES_FRAGMENT = """fragment ArtifactFilesFragment on Artifact {
 
 
 class RetryingClient(object):
-    def __init__(self, client):
+    def __init__(self, client, cache=None):
         self._client = client
+        self.cache = cache
 
     @property
     def app_url(self):
         return util.app_url(self._client.transport.url).replace("/graphql", "/")
 
+    def execute(self, *args, **kwargs):
+        if self.cache is not None:
+            return self.cache.execute(self._execute, *args, **kwargs)
+        return self._execute(*args, **kwargs)
+
     @retriable(
         retry_timedelta=RETRY_TIMEDELTA,
         check_retry_fn=util.no_retry_auth,
         retryable_exceptions=(RetryError, requests.RequestException),
     )
-    def execute(self, *args, **kwargs):
+    def _execute(self, *args, **kwargs):
         return self._client.execute(*args, **kwargs)
 
 
@@ -191,6 +249,12 @@ class Api(object):
         overrides: (dict) You can set `base_url` if you are using a wandb server
             other than https://api.wandb.ai.
             You can also set defaults for `entity`, `project`, and `run`.
+        cache_ttl: (float, optional) Cache query results on disk for this many seconds,
+            so repeated queries about finished runs don't hit the server. Queries
+            about runs that are still running are never cached, the state of a run
+            is looked up when a response doesn't include it. The cache is stored
+            in `$WANDB_CACHE_DIR/api` and can be cleared with `invalidate_cache`.
+            Defaults to `$WANDB_API_CACHE_TTL`, caching is disabled when neither is set.
     """
 
     _HTTP_TIMEOUT = env.get_http_timeout(9)
@@ -213,7 +277,7 @@ class Api(object):
     """
     )
 
-    def __init__(self, overrides={}):
+    def __init__(self, overrides={}, cache_ttl=None):
         self.settings = InternalApi().settings()
         if self.api_key is None:
             wandb.login()
@@ -229,7 +293,7 @@ class Api(object):
         self._reports = {}
         self._default_entity = None
         self._base_client = Client(
-            transport=RequestsHTTPTransport(
+            transport=requests_transport(
                 headers={"User-Agent": self.user_agent, "Use-Admin-Privileges": "true"},
                 use_json=True,
                 # this timeout won't apply when the DNS lookup fails. in that case, it will be 60s
@@ -239,7 +303,16 @@ class Api(object):
                 url="%s/graphql" % self.settings["base_url"],
             )
         )
-        self._client = RetryingClient(self._base_client)
+        if cache_ttl is None:
+            cache_ttl = env.get_api_cache_ttl()
+        cache = None
+        if cache_ttl:
+            cache = QueryCache(
+                os.path.join(env.get_cache_dir(), "api"),
+                float(cache_ttl),
+                namespace="%s %s" % (self.settings["base_url"], self.api_key),
+            )
+        self._client = RetryingClient(self._base_client, cache)
 
     def create_run(self, **kwargs):
         if kwargs.get("entity") is None:
@@ -280,6 +353,22 @@ class Api(object):
         """
         self._runs = {}
 
+    def invalidate_cache(self, path=None):
+        """
+        Removes cached query results when caching is enabled with `cache_ttl`.
+
+        Arguments:
+            path: (str, optional) only remove the results of the queries about
+                this entity, `entity/project` or `entity/project/run_id`. All
+                results are removed by default.
+        """
+        if self._client.cache is None:
+            return
+        if path is None:
+            self._client.cache.invalidate()
+        else:
+            self._client.cache.invalidate(*path.strip("/").split("/")[:3])
+
     def _parse_project_path(self, path):
         """Returns project and entity for project specified by path"""
         project = self.settings["project"]
@@ -392,7 +481,16 @@ class Api(object):
             )
         return self._reports[key]
 
-    def runs(self, path="", filters={}, order="-created_at", per_page=50):
+    def runs(
+        self,
+        path="",
+        filters={},
+        order="-created_at",
+        per_page=50,
+        fields=None,
+        config_keys=None,
+        summary_keys=None,
+    ):
         """
         Return a set of runs from a project that match the filters provided.
 
@@ -415,6 +513,12 @@ class Api(object):
             api.runs(path="my_entity/my_project", {"order": "+summary_metrics.loss"})
             ```
 
+            Only fetch the state, learning rate and loss of the runs in my_project
+            ```
+            api.runs(path="my_entity/my_project", fields=["state"],
+                config_keys=["lr"], summary_keys=["loss"])
+            ```
+
 
         Arguments:
             path: (str) path to project, should be in the form: "entity/project"
@@ -428,12 +532,21 @@ class Api(object):
                 If you prepend order with a + order is ascending.
                 If you prepend order with a - order is descending (default).
                 The default order is run.created_at from newest to oldest.
+            fields: (list, optional) Run fields to fetch, such as `tags`, `created_at` or
+                `history_keys`. When any of fields, config_keys or summary_keys is set
+                only these fields are queried and the other attributes of the runs are
+                empty, which makes listing many runs much cheaper. Call
+                `run.load(force=True)` to fetch all of a run's fields.
+            config_keys: (list, optional) Config keys to keep on the runs.
+            summary_keys: (list, optional) Summary keys to keep on the runs.
 
         Returns:
             A `Runs` object, which is an iterable collection of `Run` objects.
         """
         entity, project = self._parse_project_path(path)
         key = path + str(filters) + str(order)
+        if fields is not None or config_keys is not None or summary_keys is not None:
+            key += str((fields, config_keys, summary_keys))
         if not self._runs.get(key):
             self._runs[key] = Runs(
                 self.client,
@@ -442,6 +555,9 @@ class Api(object):
                 filters=filters,
                 order=order,
                 per_page=per_page,
+                fields=fields,
+                config_keys=config_keys,
+                summary_keys=summary_keys,
             )
         return self._runs[key]
 
@@ -463,6 +579,58 @@ class Api(object):
             self._runs[path] = Run(self.client, entity, project, run)
         return self._runs[path]
 
+    def export_history(
+        self, runs, keys=None, page_size=1000, max_workers=8, pandas=True
+    ):
+        """
+        Returns the full history of many runs as a single table, with one row per
+        history row of each run. Histories are fetched concurrently.
+
+        Example:
+            Export the loss of all the runs of a sweep
+            ```
+            runs = api.runs("my_entity/my_project", {"sweep": "abc123"})
+            df = api.export_history(runs, keys=["loss"])
+            ```
+
+        Arguments:
+            runs: (Runs or list) the runs to export, for example from `Api.runs`
+            keys: ([str], optional) only fetch these keys, and only the rows of each
+                run that have all of keys defined, as with `Run.scan_history`
+            page_size: (int, optional) size of the history pages to fetch
+            max_workers: (int, optional) number of runs fetched at the same time
+            pandas: (bool, optional) return a pandas dataframe
+
+        Returns:
+            If pandas=True a `pandas.DataFrame` with a `run` column holding the run ids
+            and a column per history key. Otherwise a dict of column name to list of
+            values, with None where a run didn't log a key. Numeric columns are
+            float arrays with NaN for missing values when numpy is available.
+        """
+        runs = list(runs)
+        fetch = partial(_history_columns, keys=keys, page_size=page_size)
+        if runs:
+            pool = ThreadPool(max(1, min(max_workers, len(runs))))
+            try:
+                histories = pool.map(fetch, runs)
+            finally:
+                pool.terminate()
+        else:
+            histories = []
+
+        table = collections.OrderedDict()
+        table["run"] = [
+            run.id for run, (n_rows, _) in zip(runs, histories) for _ in range(n_rows)
+        ]
+        table.update(_concat_columns(histories, _column_names(histories, keys)))
+
+        if pandas:
+            pandas = util.get_module("pandas")
+            if pandas:
+                return pandas.DataFrame(table)
+            print("Unable to load pandas, call export_history with pandas=False")
+        return table
+
     @normalize_exceptions
     def sweep(self, path=""):
         """
@@ -521,11 +689,87 @@ class Api(object):
         return artifact
 
 
+class AsyncApi(object):
+    """
+    Asyncio interface of the public api, so one event loop can send many
+    queries at the same time.
+
+    Queries are sent from a pool of `max_workers` threads, which share the
+    http connections, the retry policy and the query cache of an `Api`.
+
+    Examples:
+        ```python
+        api = wandb.AsyncApi()
+        run = await api.run("entity/project/run_id")
+        async for run in api.runs("entity/project"):
+            print(run.name)
+        async for row in api.scan_history(run, keys=["loss"]):
+            print(row["loss"])
+        ```
+
+    Arguments:
+        overrides: (dict) Settings of the `Api`, see `Api`.
+        cache_ttl: (float, optional) Cache query results on disk, see `Api`.
+        max_workers: (int, optional) Most queries in flight at the same time.
+        api: (Api, optional) Send the queries with this `Api` instead of a new one.
+    """
+
+    def __init__(self, overrides={}, cache_ttl=None, max_workers=32, api=None):
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.api = api or Api(overrides, cache_ttl=cache_ttl)
+        self.executor = ThreadPoolExecutor(max_workers)
+        # each request would open its own connection otherwise
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=max_workers)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        self.api._base_client.transport.session = session
+
+    def _call(self, fn, *args, **kwargs):
+        return _ExecutorAwaitable(self.executor, partial(fn, *args, **kwargs))
+
+    def close(self):
+        """Stops the worker threads once the pending queries are done."""
+        self.executor.shutdown(wait=False)
+
+    def run(self, path=""):
+        """Returns an awaitable of the `Run` at path, see `Api.run`."""
+        return self._call(self.api.run, path)
+
+    def runs(self, *args, **kwargs):
+        """Returns the `Runs` of a project, takes the arguments of `Api.runs`.
+        Iterate them with `async for`, pages are loaded by the worker
+        threads."""
+        runs = self.api.runs(*args, **kwargs)
+        runs.executor = self.executor
+        return runs
+
+    def scan_history(self, run, *args, **kwargs):
+        """Returns the history of a run, takes the arguments of
+        `Run.scan_history`. Iterate it with `async for`, the scan, which
+        queries the last step of the run, and its pages are loaded by the
+        worker threads."""
+        return _AsyncHistoryScanIterator(
+            partial(run.scan_history, *args, **kwargs), self.executor
+        )
+
+    def artifact(self, name, type=None):
+        """Returns an awaitable of an `Artifact`, see `Api.artifact`."""
+        return self._call(self.api.artifact, name, type)
+
+    def download(self, artifact, root=None, recursive=False):
+        """Returns an awaitable of the directory an artifact was downloaded
+        to, see `Artifact.download`."""
+        return self._call(artifact.download, root, recursive)
+
+
 class Attrs(object):
     def __init__(self, attrs):
         self._attrs = attrs
 
-    def snake_to_camel(self, string):
+    @staticmethod
+    def snake_to_camel(string):
         camel = "".join([i.title() for i in string.split("_")])
         return camel[0].lower() + camel[1:]
 
@@ -544,7 +788,23 @@ class Attrs(object):
 
 
 class Paginator(object):
+    """Base class of the paged collections.
+
+    After the first page, pages are loaded in a background thread,
+    `prefetch` pages ahead of the ones that have been consumed, so the next
+    page is usually ready by the time it's needed. `prefetch` defaults to
+    WANDB_PREFETCH_PAGES, set it to 0 to load pages on demand. The objects
+    can also be iterated from a coroutine with `async for`.
+    """
+
     QUERY = None
+    # Executor of the pages loaded by `async for`, None for the event loop's
+    # default executor
+    executor = None
+    # A prefetch thread exits when nothing was consumed for this many seconds,
+    # a new one is started if iteration resumes. Keeps abandoned iterations
+    # from holding a thread, and the paginator, for long.
+    PREFETCH_IDLE_TIMEOUT = 5
 
     def __init__(self, client, variables, per_page=None):
         self.client = client
@@ -556,11 +816,23 @@ class Paginator(object):
         self.objects = []
         self.index = -1
         self.last_response = None
+        self.prefetch = env.get_prefetch_pages(1)
+        self._prefetch_cond = threading.Condition()
+        self._prefetched = collections.deque()
+        self._prefetch_thread = None
+        self._prefetch_error = None
+        self._prefetch_done = False
+        # async iterations of the same paginator load pages from several
+        # threads
+        self._load_lock = threading.RLock()
 
     def __iter__(self):
         self.index = -1
         return self
 
+    def __aiter__(self):
+        return _AsyncPaginatorIterator(self)
+
     def __len__(self):
         if self.length is None:
             self._load_page()
@@ -586,13 +858,103 @@ class Paginator(object):
     def update_variables(self):
         self.variables.update({"perPage": self.per_page, "cursor": self.cursor})
 
-    def _load_page(self):
-        if not self.more:
-            return False
-        self.update_variables()
-        self.last_response = self.client.execute(
-            self.QUERY, variable_values=self.variables
+    def _next_page_variables(self, response):
+        """Returns the variables of the page following `response`, or None if
+        it was the last page. `more` and `update_variables` look at
+        `last_response` so they're evaluated on a copy of the paginator."""
+        view = copy.copy(self)
+        view.last_response = response
+        view.variables = dict(self.variables)
+        if not view.more:
+            return None
+        view.update_variables()
+        return view.variables
+
+    def _start_prefetch(self):
+        self._prefetch_thread = threading.Thread(
+            target=self._prefetch_pages, name="PaginatorPrefetch"
         )
+        self._prefetch_thread.daemon = True
+        self._prefetch_thread.start()
+
+    def _prefetch_pages(self):
+        while True:
+            with self._prefetch_cond:
+                deadline = time.time() + self.PREFETCH_IDLE_TIMEOUT
+                while len(self._prefetched) >= max(self.prefetch, 1):
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        self._prefetch_thread = None
+                        return
+                    self._prefetch_cond.wait(remaining)
+                if self._prefetched:
+                    response = self._prefetched[-1][1]
+                else:
+                    response = self.last_response
+            try:
+                variables = self._next_page_variables(response)
+                if variables is not None:
+                    response = self.client.execute(
+                        self.QUERY, variable_values=variables
+                    )
+            except Exception:
+                with self._prefetch_cond:
+                    self._prefetch_error = sys.exc_info()
+                    self._prefetch_thread = None
+                    self._prefetch_cond.notify_all()
+                return
+            with self._prefetch_cond:
+                if variables is None:
+                    self._prefetch_done = True
+                    self._prefetch_thread = None
+                else:
+                    self._prefetched.append((variables, response))
+                self._prefetch_cond.notify_all()
+                if variables is None:
+                    return
+
+    def _load_prefetched_page(self):
+        with self._prefetch_cond:
+            while not self._prefetched:
+                if self._prefetch_error is not None:
+                    exc_info, self._prefetch_error = self._prefetch_error, None
+                    six.reraise(*exc_info)
+                if self._prefetch_done:
+                    return False
+                if self._prefetch_thread is None:
+                    self._start_prefetch()
+                self._prefetch_cond.wait()
+            # last_response is updated under the lock, the prefetch thread
+            # continues from it once the queue is empty
+            self.variables, self.last_response = self._prefetched.popleft()
+            if (
+                self.prefetch > 0
+                and self._prefetch_thread is None
+                and not self._prefetch_done
+                and self._prefetch_error is None
+            ):
+                self._start_prefetch()
+            self._prefetch_cond.notify_all()
+        return True
+
+    def _load_page(self):
+        with self._load_lock:
+            return self._load_page_locked()
+
+    def _load_page_locked(self):
+        # the first page is always loaded on demand, so looking up a single
+        # object doesn't fetch a page that's never used
+        prefetch = self.prefetch > 0 and self.last_response is not None
+        if prefetch or self._prefetched or self._prefetch_thread:
+            if not self._load_prefetched_page():
+                return False
+        else:
+            if not self.more:
+                return False
+            self.update_variables()
+            self.last_response = self.client.execute(
+                self.QUERY, variable_values=self.variables
+            )
         self.objects.extend(self.convert_objects())
         return True
 
@@ -603,17 +965,111 @@ class Paginator(object):
         return self.objects[index]
 
     def __next__(self):
-        self.index += 1
-        if len(self.objects) <= self.index:
+        # only advance once the page loaded, a failed load can be retried
+        index = self.index + 1
+        if len(self.objects) <= index:
             if not self._load_page():
                 raise StopIteration
-            if len(self.objects) <= self.index:
+            if len(self.objects) <= index:
                 raise StopIteration
+        self.index = index
         return self.objects[self.index]
 
     next = __next__
 
 
+def _running_loop():
+    import asyncio
+
+    # get_event_loop is deprecated outside of a coroutine in newer versions
+    return getattr(asyncio, "get_running_loop", asyncio.get_event_loop)()
+
+
+class _ExecutorAwaitable(object):
+    """Awaitable of `fn` called in `executor`, or the event loop's default
+    executor. The loop is looked up when it's awaited, so the future belongs
+    to the loop awaiting it. `fn` is called on the loop instead if `inline`
+    returns True at that point."""
+
+    def __init__(self, executor, fn, inline=None):
+        self._executor = executor
+        self._fn = fn
+        self._inline = inline
+
+    def __await__(self):
+        loop = _running_loop()
+        if self._inline is not None and self._inline():
+            future = loop.create_future()
+            future.set_result(self._fn())
+        else:
+            future = loop.run_in_executor(self._executor, self._fn)
+        return future.__await__()
+
+
+class _AsyncIterator(object):
+    """Base class of the async iterators over paged objects. Pages are loaded
+    in `executor`, or the event loop's default executor, objects that are
+    already loaded are returned right away."""
+
+    def __init__(self, executor=None):
+        self._executor = executor
+
+    def __aiter__(self):
+        return self
+
+    def __anext__(self):
+        return _ExecutorAwaitable(self._executor, self._next, self._loaded)
+
+    def _loaded(self):
+        raise NotImplementedError()
+
+    def _next(self):
+        raise NotImplementedError()
+
+
+class _AsyncPaginatorIterator(_AsyncIterator):
+    def __init__(self, paginator):
+        super(_AsyncPaginatorIterator, self).__init__(paginator.executor)
+        self._paginator = paginator
+        self._index = -1
+
+    def _loaded(self):
+        return self._index + 1 < len(self._paginator.objects)
+
+    def _next(self):
+        index = self._index + 1
+        while len(self._paginator.objects) <= index:
+            # another iteration may have loaded the last page meanwhile
+            if (
+                not self._paginator._load_page()
+                and len(self._paginator.objects) <= index
+            ):
+                raise StopAsyncIteration  # noqa: F821
+        self._index = index
+        return self._paginator.objects[index]
+
+
+class _AsyncHistoryScanIterator(_AsyncIterator):
+    """Iterates the scan returned by `make_scan`, which is called by the
+    first `_next` so it can query the api from the executor."""
+
+    def __init__(self, make_scan, executor=None):
+        super(_AsyncHistoryScanIterator, self).__init__(executor)
+        self._make_scan = make_scan
+        self._scan = None
+
+    def _loaded(self):
+        return self._scan is not None and self._scan.scan_offset < len(self._scan.rows)
+
+    def _next(self):
+        if self._scan is None:
+            self._scan = iter(self._make_scan())
+        try:
+            return next(self._scan)
+        except StopIteration:
+            raise StopAsyncIteration  # noqa: F821
+
+
 class User(Attrs):
     def init(self, attrs):
         super(User, self).__init__(attrs)
@@ -707,8 +1163,7 @@ class Runs(Paginator):
     This is generally used indirectly via the `Api`.runs method
     """
 
-    QUERY = gql(
-        """
+    QUERY_TEMPLATE = """
         query Runs($project: String!, $entity: String!, $cursor: String, $perPage: Int = 50, $order: String, $filters: JSONString) {
             project(name: $project, entityName: $entity) {
                 runCount(filters: $filters)
@@ -729,15 +1184,37 @@ class Runs(Paginator):
         }
         %s
         """
-        % RUN_FRAGMENT
-    )
+    QUERY = gql(QUERY_TEMPLATE % RUN_FRAGMENT)
 
-    def __init__(self, client, entity, project, filters={}, order=None, per_page=50):
+    def __init__(
+        self,
+        client,
+        entity,
+        project,
+        filters={},
+        order=None,
+        per_page=50,
+        fields=None,
+        config_keys=None,
+        summary_keys=None,
+    ):
         self.entity = entity
         self.project = project
         self.filters = filters
         self.order = order
+        self.config_keys = config_keys
+        self.summary_keys = summary_keys
+        self.projected = (
+            fields is not None or config_keys is not None or summary_keys is not None
+        )
         self._sweeps = {}
+        if self.projected:
+            fields = list(fields or [])
+            if config_keys is not None:
+                fields.append("config")
+            if summary_keys is not None:
+                fields.append("summaryMetrics")
+            self.QUERY = gql(self.QUERY_TEMPLATE % run_fragment(fields))
         variables = {
             "project": self.project,
             "entity": self.entity,
@@ -779,30 +1256,31 @@ class Runs(Paginator):
                 run_response["node"]["name"],
                 run_response["node"],
             )
+            if self.projected:
+                run._project(self.config_keys, self.summary_keys)
+            # sweeps are only fetched when a run's sweep is first accessed
+            run._sweep_getter = self._get_sweep
+            sweep_name = run._attrs.get("sweepName")
+            if self._sweeps.get(sweep_name) is not None:
+                run.sweep = self._sweeps[sweep_name]
             objs.append(run)
 
-            if run.sweep_name:
-                if run.sweep_name in self._sweeps:
-                    sweep = self._sweeps[run.sweep_name]
-                else:
-                    sweep = Sweep.get(
-                        self.client,
-                        self.entity,
-                        self.project,
-                        run.sweep_name,
-                        withRuns=False,
-                    )
-                    self._sweeps[run.sweep_name] = sweep
-
-                if sweep is None:
-                    continue
-                run.sweep = sweep
-                if run.id not in sweep.runs_by_id:
-                    sweep.runs_by_id[run.id] = run
-                    sweep.runs.append(run)
-
         return objs
 
+    def _get_sweep(self, sweep_name):
+        if sweep_name not in self._sweeps:
+            # There may be a lot of runs. Don't bother pulling them all
+            # just for the sake of the ones listed here.
+            sweep = Sweep.get(
+                self.client, self.entity, self.project, sweep_name, withRuns=False,
+            )
+            self._sweeps[sweep_name] = sweep
+            if sweep is not None:
+                for run in self.objects:
+                    if run._attrs.get("sweepName") == sweep_name:
+                        run.sweep = sweep
+        return self._sweeps[sweep_name]
+
     def __repr__(self):
         return "<Runs {}/{} ({})>".format(self.entity, self.project, len(self))
 
@@ -830,6 +1308,10 @@ class Run(Attrs):
         read_only (boolean): Whether the run is editable
         history_keys (str): Keys of the history metrics that have been logged
             with `wandb.log({key: value})`
+        sweep (Sweep): the sweep of the run, fetched when it's first accessed
+
+    config, summary and system_metrics are decoded when they're first accessed,
+    listing runs doesn't pay for the decoding of runs whose values aren't read.
     """
 
     def __init__(self, client, entity, project, run_id, attrs={}):
@@ -843,12 +1325,16 @@ class Run(Attrs):
         self._files = {}
         self._base_dir = env.get_dir(tempfile.gettempdir())
         self.id = run_id
-        self.sweep = None
-        self.dir = os.path.join(self._base_dir, *self.path)
-        try:
-            os.makedirs(self.dir)
-        except OSError:
-            pass
+        self._sweep = None
+        self._sweep_loaded = False
+        self._sweep_getter = None
+        self._dir = None
+        self._projected = False
+        # config, summaryMetrics and systemMetrics are JSON strings, they're
+        # decoded when they're first accessed
+        self._decoded = set()
+        self._config_keys = None
+        self._summary_keys = None
         self._summary = None
         self.state = attrs.get("state", "not found")
 
@@ -863,6 +1349,47 @@ class Run(Attrs):
         wandb.termwarn("Run.username is deprecated. Please use Run.entity instead.")
         return self._entity
 
+    @property
+    def dir(self):
+        if self._dir is None:
+            self._dir = os.path.join(self._base_dir, *self.path)
+            try:
+                os.makedirs(self._dir)
+            except OSError:
+                pass
+        return self._dir
+
+    @property
+    def sweep(self):
+        if not self._sweep_loaded:
+            self._sweep_loaded = True
+            sweep_name = self._attrs.get("sweepName")
+            if sweep_name:
+                if self._sweep_getter:
+                    sweep = self._sweep_getter(sweep_name)
+                else:
+                    # There may be a lot of runs. Don't bother pulling them all
+                    # just for the sake of this one.
+                    sweep = Sweep.get(
+                        self.client,
+                        self.entity,
+                        self.project,
+                        sweep_name,
+                        withRuns=False,
+                    )
+                # TODO: Older runs don't always have sweeps when sweep_name is set
+                if sweep:
+                    self.sweep = sweep
+        return self._sweep
+
+    @sweep.setter
+    def sweep(self, sweep):
+        self._sweep = sweep
+        self._sweep_loaded = True
+        if sweep is not None and self.id not in sweep.runs_by_id:
+            sweep.runs_by_id[self.id] = self
+            sweep.runs.append(self)
+
     @property
     def storage_id(self):
         # For compatibility with wandb.Run, which has storage IDs
@@ -932,20 +1459,20 @@ class Run(Attrs):
         )
 
     def load(self, force=False):
-        query = gql(
-            """
-        query Run($project: String!, $entity: String!, $name: String!) {
-            project(name: $project, entityName: $entity) {
-                run(name: $name) {
-                    ...RunFragment
+        if force or not self._attrs:
+            query = gql(
+                """
+            query Run($project: String!, $entity: String!, $name: String!) {
+                project(name: $project, entityName: $entity) {
+                    run(name: $name) {
+                        ...RunFragment
+                    }
                 }
             }
-        }
-        %s
-        """
-            % RUN_FRAGMENT
-        )
-        if force or not self._attrs:
+            %s
+            """
+                % RUN_FRAGMENT
+            )
             response = self._exec(query)
             if (
                 response is None
@@ -955,51 +1482,75 @@ class Run(Attrs):
                 raise ValueError("Could not find run %s" % self)
             self._attrs = response["project"]["run"]
             self.state = self._attrs["state"]
+            self._projected = False
+            self._decoded = set()
+            self._config_keys = None
+            self._summary_keys = None
+            if self._sweep is None:
+                # the sweep is fetched when it's first accessed
+                self._sweep_loaded = False
 
-            if self.sweep_name and not self.sweep:
-                # There may be a lot of runs. Don't bother pulling them all
-                # just for the sake of this one.
-                self.sweep = Sweep.get(
-                    self.client,
-                    self.entity,
-                    self.project,
-                    self.sweep_name,
-                    withRuns=False,
-                )
-                # TODO: Older runs don't always have sweeps when sweep_name is set
-                if self.sweep:
-                    self.sweep.runs.append(self)
-                    self.sweep.runs_by_id[self.id] = self
-
-        self._attrs["summaryMetrics"] = (
-            json.loads(self._attrs["summaryMetrics"])
-            if self._attrs.get("summaryMetrics")
-            else {}
-        )
-        self._attrs["systemMetrics"] = (
-            json.loads(self._attrs["systemMetrics"])
-            if self._attrs.get("systemMetrics")
-            else {}
-        )
         if self._attrs.get("user"):
             self.user = User(self._attrs["user"])
-        config_user, config_raw = {}, {}
-        for key, value in six.iteritems(json.loads(self._attrs.get("config") or "{}")):
-            config = config_raw if key in WANDB_INTERNAL_KEYS else config_user
-            if isinstance(value, dict) and "value" in value:
-                config[key] = value["value"]
-            else:
-                config[key] = value
-        config_raw.update(config_user)
-        self._attrs["config"] = config_user
-        self._attrs["rawconfig"] = config_raw
         return self._attrs
 
+    def __getattr__(self, name):
+        key = self.snake_to_camel(name)
+        if key in ("config", "rawconfig", "summaryMetrics", "systemMetrics"):
+            return self._decode(key)
+        return super(Run, self).__getattr__(name)
+
+    def _decode(self, key):
+        """Returns the decoded config, rawconfig, summaryMetrics or
+        systemMetrics, decoding them on first access."""
+        field = "config" if key == "rawconfig" else key
+        if field not in self._decoded:
+            value = json.loads(self._attrs.get(field) or "{}")
+            if field == "config":
+                config_user, config_raw = {}, {}
+                for k, v in six.iteritems(value):
+                    if k in WANDB_INTERNAL_KEYS:
+                        config = config_raw
+                    elif self._config_keys is None or k in self._config_keys:
+                        config = config_user
+                    else:
+                        continue
+                    if isinstance(v, dict) and "value" in v:
+                        config[k] = v["value"]
+                    else:
+                        config[k] = v
+                config_raw.update(config_user)
+                self._attrs["config"] = config_user
+                self._attrs["rawconfig"] = config_raw
+            else:
+                if field == "summaryMetrics" and self._summary_keys is not None:
+                    value = {
+                        k: v for k, v in six.iteritems(value) if k in self._summary_keys
+                    }
+                self._attrs[field] = value
+            self._decoded.add(field)
+        return self._attrs[key]
+
+    def _project(self, config_keys=None, summary_keys=None):
+        """Keeps only the given config and summary keys of a run listed with a
+        projection, see `Api.runs`. They're picked when the config and summary
+        are decoded."""
+        self._projected = True
+        if config_keys is not None:
+            self._config_keys = set(config_keys)
+        if summary_keys is not None:
+            self._summary_keys = set(summary_keys)
+
     @normalize_exceptions
     def update(self):
         """
         Persists changes to the run object to the wandb backend.
         """
+        if self._projected:
+            raise ValueError(
+                "Run %s was listed with a projection, call run.load(force=True) "
+                "before updating it" % self
+            )
         mutation = gql(
             """
         mutation UpsertBucket($id: String!, $description: String, $display_name: String, $notes: String, $tags: [String!], $config: JSONString!) {
@@ -1202,6 +1753,12 @@ class Run(Attrs):
             losses = [row["Loss"] for row in history]
             ```
 
+            Load the whole history of a long run into a dataframe, without
+            keeping a dict per row in memory
+            ```python
+            df = run.scan_history().to_columns()
+            ```
+
 
         Arguments:
             keys ([str], optional): only fetch these keys, and only fetch rows that have all of keys defined.
@@ -1596,6 +2153,59 @@ class Files(Paginator):
             for r in self.last_response["project"]["run"]["files"]["edges"]
         ]
 
+    def download_all(self, root=".", replace=False, max_workers=8, callback=None):
+        """Downloads the files to root, several at a time.
+
+        Local files that are identical to the ones in the run are skipped.
+        Interrupted downloads are resumed by the next call.
+
+        Arguments:
+            root (str): Local directory to save the files.  Defaults to ".".
+            replace (boolean): If `True`, overwrite local files that differ from
+                the ones in the run, otherwise they are left alone.
+            max_workers (int): Number of files downloaded at the same time.
+            callback (func, optional): Called with the number of bytes downloaded
+                so far and the total number of bytes, to report progress.
+
+        Returns:
+            The local paths of the files.
+        """
+        files = list(self)
+        api_key = Api().api_key
+        total = sum(f.size for f in files)
+        progress = {"bytes": 0}
+        lock = threading.Lock()
+
+        def report(n_bytes):
+            with lock:
+                progress["bytes"] += n_bytes
+                if callback:
+                    callback(min(progress["bytes"], total), total)
+
+        def download(f):
+            path = os.path.join(root, f.name)
+            if os.path.isfile(path):
+                if f.md5 and util.md5_file(path) == f.md5:
+                    report(f.size)
+                    return path
+                if not replace:
+                    wandb.termwarn(
+                        "Skipping %s, it differs from the file in the run, "
+                        "pass replace=True to overwrite it" % path
+                    )
+                    report(f.size)
+                    return path
+            f._download_to(path, api_key, report)
+            return path
+
+        if not files:
+            return []
+        pool = ThreadPool(max(1, min(max_workers, len(files))))
+        try:
+            return pool.map(download, files)
+        finally:
+            pool.terminate()
+
     def __repr__(self):
         return "<Files {} ({})>".format("/".join(self.run.path), len(self))
 
@@ -1683,6 +2293,49 @@ class File(object):
         util.download_file_from_url(path, self.url, Api().api_key)
         return open(path, "r")
 
+    @normalize_exceptions
+    @retriable(
+        retry_timedelta=RETRY_TIMEDELTA,
+        check_retry_fn=util.no_retry_auth,
+        retryable_exceptions=(RetryError, requests.RequestException),
+    )
+    def _download_to(self, path, api_key, callback=None):
+        """Downloads the file to path through path + ".part", so an interrupted
+        download is resumed by the next call. callback is called with the
+        number of bytes downloaded, the bytes of a resumed partial file are
+        counted once it's been checked."""
+        part_path = path + ".part"
+        received = [0]
+
+        def report(n_bytes):
+            received[0] += n_bytes
+            if callback:
+                callback(n_bytes)
+
+        offset = util.download_file_from_url(
+            part_path, self.url, api_key, resume=True, callback=report
+        )
+        if offset and self.md5 and util.md5_file(part_path) != self.md5:
+            # the partial file was stale, start over without counting the
+            # bytes that were already reported again
+            def report_new(n_bytes):
+                counted = min(n_bytes, received[0])
+                received[0] -= counted
+                if callback and n_bytes > counted:
+                    callback(n_bytes - counted)
+
+            util.download_file_from_url(
+                part_path, self.url, api_key, callback=report_new
+            )
+        elif offset and callback:
+            callback(offset)
+        try:
+            os.replace(part_path, path)
+        except AttributeError:  # python 2
+            if os.path.exists(path):
+                os.remove(path)
+            os.rename(part_path, path)
+
     @normalize_exceptions
     def delete(self):
         mutation = gql(
@@ -1934,19 +2587,96 @@ class BetaReport(Attrs):
         return self._attrs["updatedAt"]
 
 
-class HistoryScan(object):
-    QUERY = gql(
-        """
-        query HistoryPage($entity: String!, $project: String!, $run: String!, $minStep: Int64!, $maxStep: Int64!, $pageSize: Int!) {
-            project(name: $project, entityName: $entity) {
-                run(name: $run) {
-                    history(minStep: $minStep, maxStep: $maxStep, samples: $pageSize)
-                }
-            }
-        }
-        """
+def _rows_to_columns(rows):
+    """Returns the number of rows and the rows as a dict of key to list of
+    values, with None for the rows that don't have the key."""
+    columns = {}
+    n_rows = 0
+    for row in rows:
+        for key, value in six.iteritems(row):
+            column = columns.get(key)
+            if column is None:
+                column = columns[key] = [None] * n_rows
+            column.append(value)
+        n_rows += 1
+        if len(row) < len(columns):
+            for column in six.itervalues(columns):
+                if len(column) < n_rows:
+                    column.append(None)
+    return n_rows, columns
+
+
+def _typed_column(values):
+    """Converts a column of numbers into an int array, or a float array with NaN
+    for missing values, other columns are returned as is."""
+    np = util.get_module("numpy")
+    if np is None:
+        return values
+    kinds = set()
+    for value in values:
+        if value is None or isinstance(value, float):
+            kinds.add(float)
+        elif isinstance(value, six.integer_types) and not isinstance(value, bool):
+            kinds.add(int)
+        else:
+            return values
+    if kinds == {int}:
+        return np.array(values, dtype=np.int64)
+    return np.array(
+        [np.nan if value is None else value for value in values], dtype=np.float64
     )
 
+
+def _concat_columns(chunks, names):
+    """Concatenates (n_rows, columns) chunks into one dict of columns. Chunks
+    missing a column are filled with NaN, or None for non-numeric columns."""
+    np = util.get_module("numpy")
+    table = collections.OrderedDict()
+    for name in names:
+        parts = [(n_rows, columns.get(name)) for n_rows, columns in chunks]
+        if np is not None and all(
+            isinstance(part, np.ndarray) or part is None for _, part in parts
+        ):
+            table[name] = np.concatenate(
+                [
+                    np.full(n_rows, np.nan) if part is None else part
+                    for n_rows, part in parts
+                ]
+                or [np.zeros(0)]
+            )
+            continue
+        values = []
+        for n_rows, part in parts:
+            if part is None:
+                values.extend([None] * n_rows)
+            elif np is not None and isinstance(part, np.ndarray):
+                values.extend(part.tolist())
+            else:
+                values.extend(part)
+        table[name] = values
+    return table
+
+
+def _column_names(chunks, keys=None):
+    names = list(keys or [])
+    seen = set(names)
+    for _, columns in chunks:
+        for name in sorted(columns):
+            if name not in seen:
+                seen.add(name)
+                names.append(name)
+    return names
+
+
+def _history_columns(run, keys=None, page_size=1000):
+    n_rows, columns = _rows_to_columns(run.scan_history(keys=keys, page_size=page_size))
+    return n_rows, {key: _typed_column(values) for key, values in columns.items()}
+
+
+class _HistoryScanBase(object):
+    """Pages through the history of a run. Iterating yields one dict per row,
+    `column_chunks` and `to_columns` decode pages straight into columns."""
+
     def __init__(self, client, run, min_step, max_step, page_size=1000):
         self.client = client
         self.run = run
@@ -1956,6 +2686,7 @@ class HistoryScan(object):
         self.page_offset = min_step  # minStep for next page
         self.scan_offset = 0  # index within current page of rows
         self.rows = []  # current page of rows
+        self.executor = None  # executor of the pages loaded by `async for`
 
     def __iter__(self):
         self.page_offset = self.min_step
@@ -1975,32 +2706,102 @@ class HistoryScan(object):
 
     next = __next__
 
+    def __aiter__(self):
+        return _AsyncHistoryScanIterator(lambda: self, self.executor)
+
+    def _load_next(self):
+        self.rows = self._decode_rows(self._fetch_page(self.page_offset))
+        self.page_offset += self.page_size
+        self.scan_offset = 0
+
+    def _fetch_page(self, page_offset):
+        raise NotImplementedError
+
+    def _decode_rows(self, page):
+        raise NotImplementedError
+
+    def column_chunks(self):
+        """Yields (n_rows, columns) for each page of history, where columns is a
+        dict of key to column. Numeric columns are numpy arrays with NaN for
+        missing values. The next page is fetched while a page is decoded."""
+        offsets = list(range(self.min_step, self.max_step, self.page_size))
+        if not offsets:
+            return
+        pool = ThreadPool(1)
+        try:
+            pending = pool.apply_async(self._fetch_page, (offsets[0],))
+            for next_offset in offsets[1:] + [None]:
+                page = pending.get()
+                if next_offset is not None:
+                    pending = pool.apply_async(self._fetch_page, (next_offset,))
+                n_rows, columns = _rows_to_columns(self._decode_rows(page))
+                yield n_rows, {
+                    key: _typed_column(values) for key, values in columns.items()
+                }
+        finally:
+            pool.terminate()
+
+    def to_columns(self, pandas=True):
+        """Returns the whole history as columns, built with `column_chunks`.
+
+        Arguments:
+            pandas (bool, optional): Return a pandas dataframe
+
+        Returns:
+            If pandas=True returns a `pandas.DataFrame` of history metrics.
+            If pandas=False returns a dict of key to column.
+        """
+        chunks = list(self.column_chunks())
+        table = _concat_columns(
+            chunks, _column_names(chunks, getattr(self, "keys", None))
+        )
+        if pandas:
+            pandas = util.get_module("pandas")
+            if pandas:
+                return pandas.DataFrame(table)
+            print("Unable to load pandas, call to_columns with pandas=False")
+        return table
+
+
+class HistoryScan(_HistoryScanBase):
+    QUERY = gql(
+        """
+        query HistoryPage($entity: String!, $project: String!, $run: String!, $minStep: Int64!, $maxStep: Int64!, $pageSize: Int!) {
+            project(name: $project, entityName: $entity) {
+                run(name: $run) {
+                    history(minStep: $minStep, maxStep: $maxStep, samples: $pageSize)
+                }
+            }
+        }
+        """
+    )
+
     @normalize_exceptions
     @retriable(
         check_retry_fn=util.no_retry_auth,
         retryable_exceptions=(RetryError, requests.RequestException),
     )
-    def _load_next(self):
-        max_step = self.page_offset + self.page_size
+    def _fetch_page(self, page_offset):
+        max_step = page_offset + self.page_size
         if max_step > self.max_step:
             max_step = self.max_step
         variables = {
             "entity": self.run.entity,
             "project": self.run.project,
             "run": self.run.id,
-            "minStep": int(self.page_offset),
+            "minStep": int(page_offset),
             "maxStep": int(max_step),
             "pageSize": int(self.page_size),
         }
 
         res = self.client.execute(self.QUERY, variable_values=variables)
-        res = res["project"]["run"]["history"]
-        self.rows = [json.loads(row) for row in res]
-        self.page_offset += self.page_size
-        self.scan_offset = 0
+        return res["project"]["run"]["history"]
+
+    def _decode_rows(self, page):
+        return [json.loads(row) for row in page]
 
 
-class SampledHistoryScan(object):
+class SampledHistoryScan(_HistoryScanBase):
     QUERY = gql(
         """
         query SampledHistoryPage($entity: String!, $project: String!, $run: String!, $spec: JSONString!) {
@@ -2014,41 +2815,18 @@ class SampledHistoryScan(object):
     )
 
     def __init__(self, client, run, keys, min_step, max_step, page_size=1000):
-        self.client = client
-        self.run = run
+        super(SampledHistoryScan, self).__init__(
+            client, run, min_step, max_step, page_size
+        )
         self.keys = keys
-        self.page_size = page_size
-        self.min_step = min_step
-        self.max_step = max_step
-        self.page_offset = min_step  # minStep for next page
-        self.scan_offset = 0  # index within current page of rows
-        self.rows = []  # current page of rows
-
-    def __iter__(self):
-        self.page_offset = self.min_step
-        self.scan_offset = 0
-        self.rows = []
-        return self
-
-    def __next__(self):
-        while True:
-            if self.scan_offset < len(self.rows):
-                row = self.rows[self.scan_offset]
-                self.scan_offset += 1
-                return row
-            if self.page_offset >= self.max_step:
-                raise StopIteration()
-            self._load_next()
-
-    next = __next__
 
     @normalize_exceptions
     @retriable(
         check_retry_fn=util.no_retry_auth,
         retryable_exceptions=(RetryError, requests.RequestException),
     )
-    def _load_next(self):
-        max_step = self.page_offset + self.page_size
+    def _fetch_page(self, page_offset):
+        max_step = page_offset + self.page_size
         if max_step > self.max_step:
             max_step = self.max_step
         variables = {
@@ -2058,7 +2836,7 @@ class SampledHistoryScan(object):
             "spec": json.dumps(
                 {
                     "keys": self.keys,
-                    "minStep": int(self.page_offset),
+                    "minStep": int(page_offset),
                     "maxStep": int(max_step),
                     "samples": int(self.page_size),
                 }
@@ -2066,10 +2844,10 @@ class SampledHistoryScan(object):
         }
 
         res = self.client.execute(self.QUERY, variable_values=variables)
-        res = res["project"]["run"]["sampledHistory"]
-        self.rows = res[0]
-        self.page_offset += self.page_size
-        self.scan_offset = 0
+        return res["project"]["run"]["sampledHistory"][0]
+
+    def _decode_rows(self, page):
+        return page
 
 
 class ProjectArtifactTypes(Paginator):
@@ -0,0 +1,232 @@
+"""
+On-disk cache of public api query results.
+
+Responses are stored as one JSON file per query and variables. Queries
+about runs that are still running are never cached: when a response doesn't
+include the state of the run it's about, the state is looked up before it's
+cached. Any mutation clears the cache, since it can change the results of
+cached queries.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from wandb.apis.query_registry import Document, gql
+
+logger = logging.getLogger(__name__)
+
+# Run states whose data can still change
+LIVE_STATES = ("running", "pending", "preempting")
+
+RUN_STATE_QUERY = gql(
+    """
+    query RunState($entity: String!, $project: String!, $name: String!) {
+        project(name: $project, entityName: $entity) {
+            run(name: $name) {
+                name
+                state
+            }
+        }
+    }
+    """
+)
+
+
+def _query_text(document):
+    if isinstance(document, Document):
+        return document.source
+    if getattr(document, "loc", None) is not None:
+        return document.loc.source.body
+    return str(document)
+
+
+def _is_mutation(document):
+    definitions = getattr(document, "definitions", None) or []
+    return any(getattr(d, "operation", None) == "mutation" for d in definitions)
+
+
+def _scope(variables):
+    """Returns the (entity, project, run) a query is about, any of them can be
+    None."""
+    return (
+        variables.get("entity") or variables.get("entityName"),
+        variables.get("project") or variables.get("projectName"),
+        variables.get("name") or variables.get("run") or variables.get("runName"),
+    )
+
+
+def _run_states(response):
+    """Yields the (name, state) of the runs in a response."""
+    stack = [response]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            if "state" in value and "name" in value:
+                yield value["name"], value["state"]
+            stack.extend(value.values())
+        elif isinstance(value, list):
+            stack.extend(value)
+
+
+class QueryCache(object):
+    """Caches query responses under `cache_dir` for `ttl` seconds.
+
+    Arguments:
+        cache_dir (str): directory of the cache files
+        ttl (float): seconds a response is served from the cache
+        namespace (str): separates the caches of different servers and users
+    """
+
+    def __init__(self, cache_dir, ttl, namespace=""):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self._namespace = namespace
+        self._lock = threading.Lock()
+        # (entity, project, run) of runs seen in a live state by this process
+        self._live = set()
+        # (entity, project, run) of runs seen in a final state by this process
+        self._finished = set()
+
+    def _key(self, document, variables):
+        key = json.dumps(
+            [self._namespace, _query_text(document), variables],
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + ".json")
+
+    def get(self, document, variables):
+        """Returns the cached response of a query, or None."""
+        path = self._path(self._key(document, variables))
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+        except (IOError, OSError, ValueError):
+            return None
+        if time.time() - entry["time"] > self.ttl:
+            return None
+        return entry["response"]
+
+    def set(self, document, variables, response):
+        path = self._path(self._key(document, variables))
+        entry = {
+            "time": time.time(),
+            "scope": _scope(variables),
+            "response": response,
+        }
+        try:
+            if not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, "w") as f:
+                json.dump(entry, f)
+            # atomic on posix, readers never see a partial entry
+            try:
+                os.replace(tmp_path, path)
+            except AttributeError:  # python 2
+                if os.path.exists(path):
+                    os.remove(path)
+                os.rename(tmp_path, path)
+        except (IOError, OSError) as e:
+            logger.warning("Unable to cache query response: %s", e)
+
+    def is_live(self, variables):
+        entity, project, run = _scope(variables)
+        with self._lock:
+            return (entity, project, run) in self._live
+
+    def execute(self, execute, document, variable_values=None, *args, **kwargs):
+        """Runs the query with `execute` unless its response is cached."""
+        if _is_mutation(document):
+            response = execute(document, variable_values, *args, **kwargs)
+            self.invalidate()
+            return response
+
+        variables = variable_values or {}
+        cacheable = not self.is_live(variables)
+        if cacheable:
+            response = self.get(document, variables)
+            if response is not None:
+                return response
+
+        response = execute(document, variable_values, *args, **kwargs)
+        entity, project, _ = _scope(variables)
+        states = dict(_run_states(response))
+        live = [
+            (entity, project, name)
+            for name, state in states.items()
+            if state in LIVE_STATES
+        ]
+        if live:
+            with self._lock:
+                self._live.update(live)
+        elif cacheable and self._is_finished(execute, variables, states):
+            self.set(document, variables, response)
+        return response
+
+    def _is_finished(self, execute, variables, states):
+        """Returns whether the run a query is about, if any, is finished. Its
+        state is taken from `states`, the run states in the response, or
+        looked up once per process."""
+        entity, project, run = _scope(variables)
+        if run is None:
+            return True
+        with self._lock:
+            if (entity, project, run) in self._finished:
+                return True
+        if run in states:
+            state = states[run]
+        elif entity is None or project is None:
+            return False
+        else:
+            try:
+                data = execute(
+                    RUN_STATE_QUERY,
+                    {"entity": entity, "project": project, "name": run},
+                )
+            except Exception as e:
+                logger.warning("Unable to look up the state of run %s: %s", run, e)
+                return False
+            run_data = ((data or {}).get("project") or {}).get("run")
+            if run_data is None:
+                # `name` wasn't a run, e.g. a sweep or an artifact
+                return True
+            state = run_data.get("state")
+        with self._lock:
+            if state in LIVE_STATES:
+                self._live.add((entity, project, run))
+                return False
+            self._finished.add((entity, project, run))
+        return True
+
+    def invalidate(self, entity=None, project=None, run=None):
+        """Removes the cached responses of the queries about a run, a project or
+        an entity. Without arguments the whole cache is cleared."""
+        if entity is None and project is None and run is None:
+            shutil.rmtree(self.cache_dir, ignore_errors=True)
+            return
+        for dirpath, _, filenames in os.walk(self.cache_dir):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                try:
+                    with open(path) as f:
+                        scope = json.load(f)["scope"]
+                except (IOError, OSError, ValueError, KeyError):
+                    continue
+                if all(
+                    expected is None or expected == actual
+                    for expected, actual in zip((entity, project, run), scope)
+                ):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
@@ -0,0 +1,123 @@
+"""
+Registry of the GraphQL documents sent by the api clients.
+
+`gql` returns the registered Document for a query string, the same string
+always gives the same Document. A Document is parsed the first time it's
+used and printed once, so queries defined at import time or built inside
+methods don't pay for the graphql parser and printer on every call.
+"""
+
+import threading
+
+import six
+from wandb import util
+
+_documents = {}
+_lock = threading.Lock()
+_transport_class = None
+
+
+class Document(object):
+    """A GraphQL document, parsed on first use. Attributes of the parsed
+    document, like `definitions`, are available on the Document."""
+
+    def __init__(self, source):
+        self.source = source
+        self._ast = None
+        self._printed = None
+
+    @property
+    def ast(self):
+        if self._ast is None:
+            self._ast = util.vendor_import("gql").gql(self.source)
+        return self._ast
+
+    @property
+    def printed(self):
+        """The document as sent to the server."""
+        if self._printed is None:
+            printer = util.vendor_import("graphql.language.printer")
+            self._printed = printer.print_ast(self.ast)
+        return self._printed
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.ast, name)
+
+    def __repr__(self):
+        return "<Document {}>".format(self.source.strip().split("\n")[0])
+
+
+def gql(source):
+    """Returns the Document of a query string."""
+    document = _documents.get(source)
+    if document is None:
+        if not isinstance(source, six.string_types):
+            raise Exception('Received incompatible request "{}".'.format(source))
+        with _lock:
+            document = _documents.setdefault(source, Document(source))
+    return document
+
+
+def documents():
+    """Returns all the registered documents."""
+    with _lock:
+        return list(_documents.values())
+
+
+def parse_all():
+    """Parses and prints all the registered documents, raising on the first
+    invalid one."""
+    for document in documents():
+        document.printed
+
+
+def _requests_transport_class():
+    global _transport_class
+    if _transport_class is not None:
+        return _transport_class
+    gql_requests = util.vendor_import("gql.transport.requests")
+
+    class RequestsHTTPTransport(gql_requests.RequestsHTTPTransport):
+        """Sends the printed form of registered documents instead of printing
+        them on every request. Requests are sent with `session` when it's set,
+        to reuse its connections."""
+
+        session = None
+
+        def execute(self, document, variable_values=None, timeout=None):
+            if isinstance(document, Document):
+                query_str = document.printed
+            else:
+                query_str = gql_requests.print_ast(document)
+            payload = {"query": query_str, "variables": variable_values or {}}
+
+            data_key = "json" if self.use_json else "data"
+            post_args = {
+                "headers": self.headers,
+                "auth": self.auth,
+                "cookies": self.cookies,
+                "timeout": timeout or self.default_timeout,
+                data_key: payload,
+            }
+            # looked up on the gql module, where tests mock it
+            post = (self.session or gql_requests.requests).post
+            request = post(self.url, **post_args)
+            request.raise_for_status()
+
+            result = request.json()
+            assert (
+                "errors" in result or "data" in result
+            ), 'Received non-compatible response "{}"'.format(result)
+            return gql_requests.ExecutionResult(
+                errors=result.get("errors"), data=result.get("data")
+            )
+
+    _transport_class = RequestsHTTPTransport
+    return _transport_class
+
+
+def requests_transport(*args, **kwargs):
+    """Returns a gql RequestsHTTPTransport for registered documents."""
+    return _requests_transport_class()(*args, **kwargs)
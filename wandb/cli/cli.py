@@ -411,7 +411,8 @@ def init(ctx, project, entity, reset, mode):
 
 
 @cli.command(
-    context_settings=CONTEXT, help="Upload an offline training directory to W&B"
+    context_settings=CONTEXT,
+    help="Upload an offline training directory, or a tensorboard logdir, to W&B",
 )
 @click.pass_context
 @click.argument("path", nargs=-1, type=click.Path(exists=True))
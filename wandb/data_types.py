@@ -16,6 +16,7 @@ import logging
 import os
 import pprint
 import sys
+import threading
 import warnings
 
 import six
@@ -26,6 +27,7 @@ _PY3 = sys.version_info.major == 3 and sys.version_info.minor >= 6
 
 if _PY3:
     from wandb.sdk.interface import _dtypes
+    from wandb.sdk.lib import columnar
     from wandb.sdk.data_types import (
         WBValue,
         Histogram,
@@ -46,6 +48,7 @@ if _PY3:
     )
 else:
     from wandb.sdk_py27.interface import _dtypes
+    from wandb.sdk_py27.lib import columnar
     from wandb.sdk_py27.data_types import (
         WBValue,
         Histogram,
@@ -103,6 +106,79 @@ warnings.filterwarnings(
 # we put them into the Run directory to be uploaded.
 MEDIA_TMP = tempfile.TemporaryDirectory("wandb-media")
 
+# Types (and python classes) where assignment only depends on the class of
+# the assigned value, not on the value itself.
+_CLASS_ONLY_TYPES = (
+    _dtypes.UnknownType,
+    _dtypes.AnyType,
+    _dtypes.NoneType,
+    _dtypes.StringType,
+    _dtypes.NumberType,
+    _dtypes.BooleanType,
+)
+_CLASS_ONLY_PY_CLASSES = frozenset(
+    _dtypes.NoneType.types
+    + _dtypes.StringType.types
+    + _dtypes.NumberType.types
+    + _dtypes.BooleanType.types
+)
+
+
+def _is_class_only_type(wbtype):
+    if isinstance(wbtype, _dtypes.UnionType):
+        return all(_is_class_only_type(t) for t in wbtype.params["allowed_types"])
+    return wbtype.__class__ in _CLASS_ONLY_TYPES
+
+
+def _is_primitive_column_type(wbtype):
+    if isinstance(wbtype, _dtypes.UnionType):
+        wbtypes = [
+            t
+            for t in wbtype.params["allowed_types"]
+            if not isinstance(t, _dtypes.NoneType)
+        ]
+    else:
+        wbtypes = [wbtype]
+    return len(wbtypes) == 1 and wbtypes[0].__class__ in (
+        _dtypes.NumberType,
+        _dtypes.BooleanType,
+        _dtypes.StringType,
+    )
+
+
+class _LazyTableData(object):
+    """Rows of a table deserialized from an artifact whose primitive columns
+    are stored in a columnar file. Columns are only decoded when requested.
+    """
+
+    # Number of rows decoded at a time when streaming
+    ROW_CHUNK = 4096
+
+    def __init__(self, columns, json_rows, reader):
+        self.columns = columns
+        self.json_columns = [c for c in columns if c not in reader.columns]
+        self.json_rows = json_rows
+        self.reader = reader
+
+    def column(self, name, start=0, stop=None):
+        if name in self.reader.columns:
+            return self.reader.read_column(name, start, stop)
+        ndx = self.json_columns.index(name)
+        return [row[ndx] for row in self.json_rows[start:stop]]
+
+    def rows(self, start=0, stop=None):
+        with self.reader:
+            columns = [self.column(c, start, stop) for c in self.columns]
+        return [list(row) for row in zip(*columns)]
+
+    def iterrows(self):
+        # the file stays open while streaming, and is closed when the
+        # iteration ends or is abandoned
+        with self.reader:
+            for start in range(0, self.reader.nrows, self.ROW_CHUNK):
+                for row in self.rows(start, start + self.ROW_CHUNK):
+                    yield row
+
 
 class Table(Media):
     """This is a table designed to display sets of records.
@@ -117,6 +193,9 @@ class Table(Media):
             applies to all columns. A list of bool values applies to each respective column.
             Default to True.
         allow_mixed_types (bool): Determines if columns are allowed to have mixed types (disables type validation). Defaults to False
+        artifact_format (str): How the table is stored when added to an artifact. "json" (the default) stores
+            everything as JSON. "parquet" or "numpy" store number, boolean and string columns in a compact binary
+            file next to the JSON, "columnar" picks parquet if pyarrow is installed and numpy otherwise.
     """
 
     MAX_ROWS = 10000
@@ -132,9 +211,14 @@ class Table(Media):
         dtype=None,
         optional=True,
         allow_mixed_types=False,
+        artifact_format="json",
     ):
         """rows is kept for legacy reasons, we use data to mimic the Pandas api"""
         super(Table, self).__init__()
+        if artifact_format != "json":
+            columnar.resolve_format(artifact_format)
+        self._artifact_format = artifact_format
+        self._lazy_data = None
         if allow_mixed_types:
             dtype = _dtypes.AnyType
 
@@ -163,6 +247,18 @@ class Table(Media):
             else:
                 self._init_from_list([], columns, optional, dtype)
 
+    @property
+    def data(self):
+        if self._lazy_data is not None:
+            self._data = self._lazy_data.rows()
+            self._lazy_data = None
+        return self._data
+
+    @data.setter
+    def data(self, data):
+        self._lazy_data = None
+        self._data = data
+
     @staticmethod
     def _assert_valid_columns(columns):
         valid_col_types = [str, int]
@@ -179,8 +275,7 @@ class Table(Media):
         self._assert_valid_columns(columns)
         self.columns = columns
         self._make_column_types(dtype, optional)
-        for row in data:
-            self.add_data(*row)
+        self._add_rows(data)
 
     def _init_from_ndarray(self, ndarray, columns, optional=True, dtype=None):
         assert util.is_numpy_array(
@@ -190,8 +285,7 @@ class Table(Media):
         self._assert_valid_columns(columns)
         self.columns = columns
         self._make_column_types(dtype, optional)
-        for row in ndarray.tolist():
-            self.add_data(*row)
+        self._add_rows(ndarray.tolist())
 
     def _init_from_dataframe(self, dataframe, columns, optional=True, dtype=None):
         assert util.is_pandas_data_frame(
@@ -200,8 +294,9 @@ class Table(Media):
         self.data = []
         self.columns = list(dataframe.columns)
         self._make_column_types(dtype, optional)
-        for row in range(len(dataframe)):
-            self.add_data(*tuple(dataframe[col].values[row] for col in self.columns))
+        # Pull each column out of the frame once instead of indexing per cell
+        col_values = [dataframe[col].values for col in self.columns]
+        self._add_rows([list(row) for row in zip(*col_values)])
 
     def _make_column_types(self, dtype=None, optional=True):
         if dtype is None:
@@ -270,19 +365,118 @@ class Table(Media):
         self._validate_data(data)
         self.data.append(list(data))
 
-    def _validate_data(self, data):
-        incoming_data_dict = {
-            col_key: data[ndx] for ndx, col_key in enumerate(self.columns)
-        }
-        current_type = self._column_types
-        result_type = current_type.assign(incoming_data_dict)
-        if isinstance(result_type, _dtypes.InvalidType):
-            raise TypeError(
-                "Data row contained incompatible types:\n{}".format(
-                    current_type.explain(incoming_data_dict)
+    def add_column(self, name, data, optional=False):
+        """Add a column of data to the table.
+
+        Arguments:
+            name: (str) the unique name of the column
+            data: (list | np.array) a column of homogenous data
+            optional: (bool) if None values are permitted
+        """
+        assert (
+            isinstance(name, six.string_types) and name not in self.columns
+        ), "column name must be a string not already in the table"
+        if util.is_numpy_array(data):
+            data = data.tolist()
+        assert type(data) is list, "data argument expects a `list` or `np.array`"
+        if len(self.columns) > 0 and len(data) != len(self.data):
+            raise ValueError(
+                "Expected column of length {}, got {}".format(len(self.data), len(data))
+            )
+
+        wbtype = _dtypes.UnknownType()
+        if optional:
+            wbtype = _dtypes.OptionalType(wbtype)
+        wbtype = self._assign_column(wbtype, name, data)
+
+        if len(self.columns) == 0:
+            self.data = [[val] for val in data]
+        else:
+            for row, val in zip(self.data, data):
+                row.append(val)
+        self.columns = self.columns + [name]
+        type_map = dict(self._column_types.params["type_map"])
+        type_map[name] = wbtype
+        self._column_types = _dtypes.DictType(type_map)
+
+    def get_column(self, name, convert_to=None):
+        """Retrieves a column of data from the table. For tables loaded from a
+        columnar artifact only this column is decoded.
+
+        Arguments:
+            name: (str) the name of the column
+            convert_to: (str, optional) "numpy" converts the column to a numpy array
+        """
+        if name not in self.columns:
+            raise ValueError("Column {} does not exist".format(name))
+        if self._lazy_data is not None:
+            col = self._lazy_data.column(name)
+        else:
+            ndx = self.columns.index(name)
+            col = [row[ndx] for row in self.data]
+        if convert_to == "numpy":
+            np = util.get_module(
+                "numpy", required="Converting to numpy requires installing numpy"
+            )
+            col = np.array(col)
+        return col
+
+    def _add_rows(self, rows):
+        # Column-wise bulk ingestion: types are inferred once per column batch
+        # rather than once per row, and only committed if every column is valid.
+        rows = [list(row) for row in rows]
+        for row in rows:
+            if len(row) != len(self.columns):
+                raise ValueError(
+                    "This table expects {} columns: {}".format(
+                        len(self.columns), self.columns
+                    )
                 )
+        if len(rows) == 0:
+            return
+        type_map = dict(self._column_types.params["type_map"])
+        for col_name, values in zip(self.columns, zip(*rows)):
+            type_map[col_name] = self._assign_column(
+                type_map[col_name], col_name, values
             )
-        self._column_types = result_type
+        self._column_types = _dtypes.DictType(type_map)
+        self.data.extend(rows)
+
+    @staticmethod
+    def _assign_column(wbtype, col_name, values):
+        # Re-assigning a type already absorbed into wbtype is a no-op, so while
+        # the column type is made of simple types each class is assigned once.
+        seen_classes = set()
+        for val in values:
+            if val.__class__ in seen_classes:
+                continue
+            result_type = wbtype.assign(val)
+            if isinstance(result_type, _dtypes.InvalidType):
+                raise TypeError(
+                    "Data column '{}' contained incompatible types:\n{}".format(
+                        col_name, wbtype.explain(val)
+                    )
+                )
+            wbtype = result_type
+            if val.__class__ in _CLASS_ONLY_PY_CLASSES and _is_class_only_type(wbtype):
+                seen_classes.add(val.__class__)
+        return wbtype
+
+    def _validate_data(self, data):
+        type_map = dict(self._column_types.params["type_map"])
+        for col_name, val in zip(self.columns, data):
+            result_type = type_map[col_name].assign(val)
+            if isinstance(result_type, _dtypes.InvalidType):
+                incoming_data_dict = {
+                    col_key: data[ndx] for ndx, col_key in enumerate(self.columns)
+                }
+                raise TypeError(
+                    "Data row contained incompatible types:\n{}".format(
+                        self._column_types.explain(incoming_data_dict)
+                    )
+                )
+            type_map[col_name] = result_type
+        self._column_types = _dtypes.DictType(type_map)
 
     def _to_table_json(self, max_rows=None):
         # seperate method for testing
@@ -292,11 +486,26 @@ class Table(Media):
             logging.warning("Truncating wandb.Table object to %i rows." % max_rows)
         return {"columns": self.columns, "data": self.data[:max_rows]}
 
+    def _write_table_json(self, fp, max_rows=None):
+        # Streams the table one row at a time so the full serialized table is
+        # never held in memory.
+        if max_rows is None:
+            max_rows = Table.MAX_ROWS
+        if len(self.data) > max_rows:
+            logging.warning("Truncating wandb.Table object to %i rows." % max_rows)
+        fp.write('{"columns": ')
+        fp.write(util.json_dumps_safer(self.columns))
+        fp.write(', "data": [')
+        for ndx in range(min(len(self.data), max_rows)):
+            if ndx > 0:
+                fp.write(", ")
+            fp.write(util.json_dumps_safer(_numpy_arrays_to_lists(self.data[ndx])))
+        fp.write("]}")
+
     def bind_to_run(self, *args, **kwargs):
-        data = self._to_table_json()
         tmp_path = os.path.join(MEDIA_TMP.name, util.generate_id() + ".table.json")
-        data = _numpy_arrays_to_lists(data)
-        util.json_dump_safer(data, codecs.open(tmp_path, "w", encoding="utf-8"))
+        with codecs.open(tmp_path, "w", encoding="utf-8") as fp:
+            self._write_table_json(fp)
         self._set_file(tmp_path, is_tmp=True, extension=".table.json")
         super(Table, self).bind_to_run(*args, **kwargs)
 
@@ -318,7 +527,16 @@ class Table(Media):
                 row_data.append(cell)
             data.append(row_data)
 
-        new_obj = cls(columns=json_obj["columns"], data=data)
+        columnar_info = json_obj.get("columnar")
+        if columnar_info is None:
+            new_obj = cls(columns=json_obj["columns"], data=data)
+        else:
+            # Primitive columns are decoded lazily from the columnar file, their
+            # types come from the serialized column_types
+            path = source_artifact.get_path(json_obj["path"]).download()
+            reader = columnar.ColumnReader(path, columnar_info["format"])
+            new_obj = cls(columns=json_obj["columns"])
+            new_obj._lazy_data = _LazyTableData(json_obj["columns"], data, reader)
 
         if json_obj.get("column_types") is not None:
             new_obj._column_types = _dtypes.TypeRegistry.type_from_dict(
@@ -327,6 +545,34 @@ class Table(Media):
 
         return new_obj
 
+    def _add_columnar_file(self, data, artifact):
+        # Writes the primitive, string-named columns of `data` to a columnar
+        # file added to the artifact. Returns the columns written and the path
+        # of the file in the artifact.
+        type_map = self._column_types.params["type_map"]
+        columns = {}
+        for ndx, col in enumerate(self.columns):
+            if isinstance(col, six.string_types) and _is_primitive_column_type(
+                type_map[col]
+            ):
+                values = [row[ndx] for row in data]
+                if columnar.to_array(values) is not None:
+                    columns[col] = values
+        if not columns:
+            return [], None
+
+        fmt = columnar.resolve_format(self._artifact_format)
+        extension = columnar.EXTENSIONS[fmt]
+        tmp_path = os.path.join(MEDIA_TMP.name, util.generate_id() + extension)
+        columnar.write_columns(tmp_path, columns, fmt)
+        # the table's own file, if it's bound to a run, is left untouched
+        entry = artifact.add_file(
+            tmp_path,
+            name=os.path.join(self.get_media_subdir(), os.path.basename(tmp_path)),
+            is_tmp=True,
+        )
+        return list(columns.keys()), entry.path
+
     def to_json(self, run_or_artifact):
         json_dict = super(Table, self).to_json(run_or_artifact)
         wandb_run, wandb_artifacts = _safe_sdk_import()
@@ -351,6 +597,13 @@ class Table(Media):
             artifact = run_or_artifact
             mapped_data = []
             data = self._to_table_json(Table.MAX_ARTIFACT_ROWS)["data"]
+            columnar_columns = []
+            if self._artifact_format != "json":
+                columnar_columns, columnar_path = self._add_columnar_file(
+                    data, artifact
+                )
+                if columnar_columns:
+                    json_dict["path"] = columnar_path
 
             def json_helper(val):
                 if isinstance(val, WBValue):
@@ -363,11 +616,21 @@ class Table(Media):
                 else:
                     return util.json_friendly(val)[0]
 
+            json_ndxs = [
+                ndx
+                for ndx, col in enumerate(self.columns)
+                if col not in columnar_columns
+            ]
             for row in data:
                 mapped_row = []
-                for v in row:
-                    mapped_row.append(json_helper(v))
+                for ndx in json_ndxs:
+                    mapped_row.append(json_helper(row[ndx]))
                 mapped_data.append(mapped_row)
+            if columnar_columns:
+                json_dict["columnar"] = {
+                    "format": columnar.resolve_format(self._artifact_format),
+                    "columns": columnar_columns,
+                }
             json_dict.update(
                 {
                     "_type": Table.artifact_type,
@@ -392,6 +655,13 @@ class Table(Media):
         row : List[any]
             The data of the row
         """
+        lazy_data = self._lazy_data
+        if lazy_data is not None:
+            # stream from the columnar file without materializing the table
+            for ndx, row in enumerate(lazy_data.iterrows()):
+                yield ndx, row
+            return
+
         for ndx in range(len(self.data)):
             yield ndx, self.data[ndx]
 
@@ -400,18 +670,48 @@ class _PartitionTablePartEntry:
     """Helper class for PartitionTable to track its parts
     """
 
-    def __init__(self, entry, source_artifact):
+    def __init__(self, entry, source_artifact, get_lock=None):
         self.entry = entry
         self.source_artifact = source_artifact
         self._part = None
+        self._lock = threading.Lock()
+        # shared by the parts of a table so the artifact is never read from
+        # two threads at once
+        self._get_lock = get_lock or threading.Lock()
+        self._prefetch_thread = None
 
     def get_part(self):
-        if self._part is None:
-            self._part = self.source_artifact.get(self.entry.path)
-        return self._part
+        with self._lock:
+            if self._part is None:
+                with self._get_lock:
+                    self._part = self.source_artifact.get(self.entry.path)
+            return self._part
+
+    def prefetch(self):
+        """Loads the part in a background thread, `get_part` waits for it,
+        `join` waits for the thread to finish"""
+
+        def _load():
+            try:
+                self.get_part()
+            except Exception:
+                # get_part will retry and raise on the caller's thread
+                logging.exception("Failed to prefetch table part %s", self.entry.path)
+
+        thread = threading.Thread(target=_load)
+        thread.daemon = True
+        thread.start()
+        self._prefetch_thread = thread
+
+    def join(self):
+        if self._prefetch_thread is not None:
+            self._prefetch_thread.join()
+            self._prefetch_thread = None
 
     def free(self):
-        self._part = None
+        self.join()
+        with self._lock:
+            self._part = None
 
 
 class PartitionedTable(Media):
@@ -430,6 +730,7 @@ class PartitionedTable(Media):
         super(PartitionedTable, self).__init__()
         self.parts_path = parts_path
         self._loaded_part_entries = {}
+        self._get_lock = threading.Lock()
 
     def to_json(self, artifact):
         json_obj = super(PartitionedTable, self).to_json(artifact)
@@ -457,25 +758,35 @@ class PartitionedTable(Media):
         """
         columns = None
         ndx = 0
-        for entry_path in self._loaded_part_entries:
-            part = self._loaded_part_entries[entry_path].get_part()
-            if columns is None:
-                columns = part.columns
-            elif columns != part.columns:
-                raise ValueError(
-                    "Table parts have non-matching columns. {} != {}".format(
-                        columns, part.columns
+        part_entries = list(self._loaded_part_entries.values())
+        try:
+            for part_ndx, part_entry in enumerate(part_entries):
+                part = part_entry.get_part()
+                # load the next part while the rows of this one are consumed
+                if part_ndx + 1 < len(part_entries):
+                    part_entries[part_ndx + 1].prefetch()
+                if columns is None:
+                    columns = part.columns
+                elif columns != part.columns:
+                    raise ValueError(
+                        "Table parts have non-matching columns. {} != {}".format(
+                            columns, part.columns
+                        )
                     )
-                )
-            for _, row in part.iterrows():
-                yield ndx, row
-                ndx += 1
+                for _, row in part.iterrows():
+                    yield ndx, row
+                    ndx += 1
 
-            self._loaded_part_entries[entry_path].free()
+                part_entry.free()
+        finally:
+            # runs when the iteration fails or the generator is closed early,
+            # waits for a pending prefetch so no part stays loaded
+            for part_entry in part_entries:
+                part_entry.free()
 
     def _add_part_entry(self, entry, source_artifact):
         self._loaded_part_entries[entry.path] = _PartitionTablePartEntry(
-            entry, source_artifact
+            entry, source_artifact, self._get_lock
         )
 
     def __ne__(self, other):
@@ -643,21 +954,32 @@ class JoinedTable(Media):
                 "JoinedTable table2 should be an artifact path to a table or wandb.Table object"
             )
 
-        self._table1 = table1
-        self._table2 = table2
+        self._tables = [table1, table2]
         self._join_key = join_key
+        # Set when loaded from an artifact, tables are then fetched on first use
+        self._source_artifact = None
 
-    @classmethod
-    def from_json(cls, json_obj, source_artifact):
-        t1 = source_artifact.get(json_obj["table1"])
-        if t1 is None:
-            t1 = json_obj["table1"]
+    @property
+    def _table1(self):
+        return self._get_table(0)
 
-        t2 = source_artifact.get(json_obj["table2"])
-        if t2 is None:
-            t2 = json_obj["table2"]
+    @property
+    def _table2(self):
+        return self._get_table(1)
+
+    def _get_table(self, ndx):
+        table = self._tables[ndx]
+        if self._source_artifact is not None and isinstance(table, six.string_types):
+            loaded = self._source_artifact.get(table)
+            if loaded is not None:
+                self._tables[ndx] = loaded
+        return self._tables[ndx]
 
-        return cls(t1, t2, json_obj["join_key"],)
+    @classmethod
+    def from_json(cls, json_obj, source_artifact):
+        instance = cls(json_obj["table1"], json_obj["table2"], json_obj["join_key"],)
+        instance._source_artifact = source_artifact
+        return instance
 
     @staticmethod
     def _validate_table_input(table):
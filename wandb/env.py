@@ -14,7 +14,6 @@ import os
 import sys
 import json
 import wandb
-from distutils.util import strtobool
 
 CONFIG_PATHS = "WANDB_CONFIG_PATHS"
 SWEEP_PARAM_PATH = "WANDB_SWEEP_PARAM_PATH"
@@ -44,6 +43,8 @@ RUN_GROUP = "WANDB_RUN_GROUP"
 RUN_DIR = "WANDB_RUN_DIR"
 SWEEP_ID = "WANDB_SWEEP_ID"
 HTTP_TIMEOUT = "WANDB_HTTP_TIMEOUT"
+PREFETCH_PAGES = "WANDB_PREFETCH_PAGES"
+API_CACHE_TTL = "WANDB_API_CACHE_TTL"
 API_KEY = "WANDB_API_KEY"
 JOB_TYPE = "WANDB_JOB_TYPE"
 DISABLE_CODE = "WANDB_DISABLE_CODE"
@@ -63,6 +64,7 @@ ANONYMOUS = "WANDB_ANONYMOUS"
 JUPYTER = "WANDB_JUPYTER"
 CONFIG_DIR = "WANDB_CONFIG_DIR"
 CACHE_DIR = "WANDB_CACHE_DIR"
+CONSOLE_MAX_LATENCY = "WANDB_CONSOLE_MAX_LATENCY"
 
 # For testing, to be removed in future version
 USE_V1_ARTIFACTS = "_WANDB_USE_V1_ARTIFACTS"
@@ -102,6 +104,20 @@ def immutable_keys():
     ]
 
 
+def strtobool(val):
+    """Converts a string like "true" or "0" to 1 or 0, raises ValueError for
+    anything else. Same as distutils.util.strtobool, but importing distutils
+    is slow and pulls in setuptools on newer pythons.
+    """
+    val = val.lower()
+    if val in ("y", "yes", "t", "true", "on", "1"):
+        return 1
+    elif val in ("n", "no", "f", "false", "off", "0"):
+        return 0
+    else:
+        raise ValueError("invalid truth value %r" % (val,))
+
+
 def _env_as_bool(var, default=None, env=None):
     if env is None:
         env = os.environ
@@ -161,6 +177,21 @@ def get_http_timeout(default=10, env=None):
     return int(env.get(HTTP_TIMEOUT, default))
 
 
+def get_prefetch_pages(default=1, env=None):
+    if env is None:
+        env = os.environ
+
+    return int(env.get(PREFETCH_PAGES, default))
+
+
+def get_api_cache_ttl(default=None, env=None):
+    if env is None:
+        env = os.environ
+
+    val = env.get(API_CACHE_TTL, default)
+    return float(val) if val else None
+
+
 def get_ignore(default=None, env=None):
     if env is None:
         env = os.environ
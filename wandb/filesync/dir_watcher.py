@@ -1,6 +1,7 @@
 import logging
 import os
-import six
+import platform
+import re
 from six.moves import queue
 import time
 
@@ -13,6 +14,102 @@ wd_events = util.vendor_import("watchdog.events")
 logger = logging.getLogger(__file__)
 
 
+def native_observer_module():
+    """Returns the vendored watchdog module with an event-driven observer for this
+    platform, or None if we have to poll."""
+    if platform.system() != "Linux":
+        return None
+    try:
+        return util.vendor_import("watchdog.observers.inotify")
+    except Exception as e:
+        # e.g. UnsupportedLibc when the libc doesn't expose inotify
+        logger.info("inotify unavailable, falling back to polling: %s", e)
+        return None
+
+
+def _glob_to_regex(glob_str):
+    """Translates a glob relative to the run directory into a regex with the same
+    semantics as glob.glob: wildcards don't cross "/" and don't match a leading
+    "." unless the pattern does."""
+    parts = []
+    for component in glob_str.split("/"):
+        regex = "" if component.startswith(".") else r"(?!\.)"
+        i, n = 0, len(component)
+        while i < n:
+            c = component[i]
+            i += 1
+            if c == "*":
+                regex += "[^/]*"
+            elif c == "?":
+                regex += "[^/]"
+            elif c == "[":
+                j = i
+                if j < n and component[j] == "!":
+                    j += 1
+                if j < n and component[j] == "]":
+                    j += 1
+                while j < n and component[j] != "]":
+                    j += 1
+                if j >= n:
+                    regex += r"\["
+                else:
+                    stuff = component[i:j].replace("\\", "\\\\")
+                    i = j + 1
+                    if stuff.startswith("!"):
+                        stuff = "^/" + stuff[1:]
+                    elif stuff.startswith("^"):
+                        stuff = "\\" + stuff
+                    regex += "[{}]".format(stuff)
+            else:
+                regex += re.escape(c)
+        parts.append(regex)
+    return "/".join(parts)
+
+
+class PolicyMatcher(object):
+    """Classifies save names by the wandb.save globs registered for each policy.
+
+    All globs of a policy are compiled into a single regex, and results are cached
+    per save name until the next glob is added.
+    """
+
+    # later policies take precedence when a file matches several globs
+    POLICIES = ("live", "now")
+
+    def __init__(self):
+        self._globs = {policy: [] for policy in self.POLICIES}
+        self._regexes = {}
+        self._cache = {}
+
+    def add(self, glob_str, policy):
+        if policy not in self._globs:
+            return
+        glob_str = util.to_forward_slash_path(os.path.normpath(glob_str))
+        if glob_str in self._globs[policy]:
+            return
+        self._globs[policy].append(glob_str)
+        flags = re.IGNORECASE if os.name == "nt" else 0
+        self._regexes[policy] = re.compile(
+            r"(?:{})\Z".format(
+                "|".join(_glob_to_regex(g) for g in self._globs[policy])
+            ),
+            flags,
+        )
+        self._cache = {}
+
+    def match(self, save_name):
+        """Returns the policy for save_name, or None if no glob matches it."""
+        save_name = util.to_forward_slash_path(save_name)
+        if save_name not in self._cache:
+            matched = None
+            for policy in self.POLICIES:
+                regex = self._regexes.get(policy)
+                if regex is not None and regex.match(save_name):
+                    matched = policy
+            self._cache[save_name] = matched
+        return self._cache[save_name]
+
+
 class FileEventHandler(object):
     def __init__(self, file_path, save_name, api, file_pusher, *args, **kwargs):
         self.file_path = file_path
@@ -83,21 +180,39 @@ class PolicyEnd(FileEventHandler):
 
 class PolicyLive(FileEventHandler):
     """This policy will upload files every RATE_LIMIT_SECONDS as it 
-        changes throttling as the size increases"""
+        changes throttling as the size increases.
+
+    Once a file larger than MIN_APPEND_SIZE has been uploaded, bytes appended to
+    it are sent through the file stream instead of uploading the whole file
+    again. If the file is rewritten rather than appended to we go back to full
+    uploads, and a full upload is always done when the run finishes."""
 
+    ONE_MB = 1000000
     TEN_MB = 10000000
     HUNDRED_MB = 100000000
     ONE_GB = 1000000000
     RATE_LIMIT_SECONDS = 15
     # Wait to upload until size has increased 20% from last upload
     RATE_LIMIT_SIZE_INCREASE = 1.2
-
-    def __init__(self, file_path, save_name, api, file_pusher, *args, **kwargs):
+    MIN_APPEND_SIZE = ONE_MB
+    MAX_APPEND_SIZE = TEN_MB
+    APPEND_CHUNK_SIZE = ONE_MB
+    # Bytes before the uploaded size we compare to detect rewrites
+    TAIL_SIZE = 4096
+
+    def __init__(
+        self, file_path, save_name, api, file_pusher, file_stream=None, *args, **kwargs
+    ):
         super(PolicyLive, self).__init__(
             file_path, save_name, api, file_pusher, *args, **kwargs
         )
         self._last_uploaded_time = None
         self._last_uploaded_size = 0
+        self._file_stream = file_stream
+        self._append_only = file_stream is not None
+        self._appended = False
+        self._inode = None
+        self._tail = None
 
     @property
     def current_size(self):
@@ -137,11 +252,61 @@ class PolicyLive(FileEventHandler):
         elif force and not self.synced:
             self.save_file()
 
-    def save_file(self):
+    def save_file(self, full=False):
         self._last_sync = os.path.getmtime(self.file_path)
         self._last_uploaded_time = time.time()
+        if not full and self._push_appended():
+            return
         self._last_uploaded_size = self.current_size
         self._file_pusher.file_changed(self.save_name, self.file_path)
+        self._appended = False
+        if self._append_only:
+            self._inode = os.stat(self.file_path).st_ino
+            self._tail = self._read_tail(self._last_uploaded_size)
+
+    def finish(self):
+        if self._appended:
+            # make sure the stored file is complete, whatever happened to the
+            # streamed segments
+            self.save_file(full=True)
+        else:
+            super(PolicyLive, self).finish()
+
+    def _read_tail(self, size):
+        start = max(0, size - self.TAIL_SIZE)
+        with open(self.file_path, "rb") as f:
+            f.seek(start)
+            return f.read(size - start)
+
+    def _push_appended(self):
+        """Sends the bytes appended since the last upload through the file stream.
+        Returns False if the file has to be uploaded in full instead."""
+        if not self._append_only or self._tail is None:
+            return False
+        uploaded = self._last_uploaded_size
+        size = self.current_size
+        if uploaded < self.MIN_APPEND_SIZE or size - uploaded > self.MAX_APPEND_SIZE:
+            return False
+        if (
+            size < uploaded
+            or os.stat(self.file_path).st_ino != self._inode
+            or self._read_tail(uploaded) != self._tail
+        ):
+            # the file was rewritten, from here on always upload it in full
+            logger.info("live file %s was rewritten", self.save_name)
+            self._append_only = False
+            return False
+
+        with open(self.file_path, "rb") as f:
+            f.seek(uploaded)
+            data = f.read(size - uploaded)
+        for start in range(0, len(data), self.APPEND_CHUNK_SIZE):
+            chunk = data[start : start + self.APPEND_CHUNK_SIZE]
+            self._file_stream.push_appended(self.save_name, uploaded + start, chunk)
+        self._last_uploaded_size = uploaded + len(data)
+        self._tail = (self._tail + data)[-self.TAIL_SIZE :]
+        self._appended = self._appended or bool(data)
+        return True
 
     @property
     def policy(self):
@@ -149,21 +314,45 @@ class PolicyLive(FileEventHandler):
 
 
 class DirWatcher(object):
-    def __init__(self, settings, api, file_pusher):
+    def __init__(
+        self, settings, api, file_pusher, force_polling=False, file_stream=None
+    ):
         self._api = api
+        self._file_stream = file_stream
         self._file_count = 0
         self._dir = settings.files_dir
         self._settings = settings
-        self._user_file_policies = {"end": set(), "live": set(), "now": set()}
+        self._policy_matcher = PolicyMatcher()
         self._file_pusher = file_pusher
         self._file_event_handlers = {}
-        self._file_observer = wd_polling.PollingObserver()
-        self._file_observer.schedule(
-            self._per_file_event_handler(), self._dir, recursive=True
-        )
-        self._file_observer.start()
+        self._event_handler = self._per_file_event_handler()
+        self._file_observer = self._start_file_observer(force_polling)
         logger.info("watching files in: %s", settings.files_dir)
 
+    def _start_file_observer(self, force_polling=False):
+        """Start an event-driven observer (inotify on Linux) if we can. Polling
+        re-stats the whole run directory every tick, so we only fall back to it
+        when native events aren't available, e.g. when we've run out of inotify
+        watches or instances.
+        """
+        native = None if force_polling else native_observer_module()
+        if native is not None:
+            observer = native.InotifyObserver()
+            try:
+                observer.schedule(self._event_handler, self._dir, recursive=True)
+                observer.start()
+                self._polling = False
+                return observer
+            except (OSError, IOError) as e:
+                logger.warning("inotify failed, falling back to polling: %s", e)
+                observer.unschedule_all()
+
+        observer = wd_polling.PollingObserver()
+        observer.schedule(self._event_handler, self._dir, recursive=True)
+        observer.start()
+        self._polling = True
+        return observer
+
     @property
     def emitter(self):
         try:
@@ -172,7 +361,7 @@ class DirWatcher(object):
             return None
 
     def update_policy(self, path, policy):
-        self._user_file_policies[policy].add(path)
+        self._policy_matcher.add(path, policy)
         for src_path in glob.glob(os.path.join(self._dir, path)):
             save_name = os.path.relpath(src_path, self._dir)
             feh = self._get_file_event_handler(src_path, save_name)
@@ -215,7 +404,7 @@ class DirWatcher(object):
             return None
         self._file_count += 1
         # We do the directory scan less often as it grows
-        if self._file_count % 100 == 0:
+        if self._polling and self._file_count % 100 == 0:
             emitter = self.emitter
             if emitter:
                 emitter._timeout = int(self._file_count / 100) + 1
@@ -254,49 +443,50 @@ class DirWatcher(object):
             # TODO: we can use PolicyIgnore if there are files we never want to sync
             if "tfevents" in save_name or "graph.pbtxt" in save_name:
                 self._file_event_handlers[save_name] = PolicyLive(
-                    file_path, save_name, self._api, self._file_pusher
+                    file_path,
+                    save_name,
+                    self._api,
+                    self._file_pusher,
+                    file_stream=self._file_stream,
                 )
             else:
-                Handler = PolicyEnd
-                for policy, globs in six.iteritems(self._user_file_policies):
-                    if policy == "end":
-                        continue
-                    # Convert set to list to avoid RuntimeError's
-                    # TODO: we may need to add locks
-                    for g in list(globs):
-                        paths = glob.glob(os.path.join(self._dir, g))
-                        if any(save_name in p for p in paths):
-                            if policy == "live":
-                                Handler = PolicyLive
-                            elif policy == "now":
-                                Handler = PolicyNow
-                self._file_event_handlers[save_name] = Handler(
-                    file_path, save_name, self._api, self._file_pusher
-                )
+                policy = self._policy_matcher.match(save_name)
+                if policy == "live":
+                    handler = PolicyLive(
+                        file_path,
+                        save_name,
+                        self._api,
+                        self._file_pusher,
+                        file_stream=self._file_stream,
+                    )
+                else:
+                    Handler = PolicyNow if policy == "now" else PolicyEnd
+                    handler = Handler(
+                        file_path, save_name, self._api, self._file_pusher
+                    )
+                self._file_event_handlers[save_name] = handler
         return self._file_event_handlers[save_name]
 
+    def _dispatch_pending_events(self):
+        event_queue = self._file_observer.event_queue
+        while True:
+            try:
+                event, _ = event_queue.get_nowait()
+            except queue.Empty:
+                break
+            self._event_handler.dispatch(event)
+
     def finish(self):
         logger.info("shutting down directory watcher")
         try:
             # avoid hanging if we crashed before the observer was started
             if self._file_observer.is_alive():
-                # rather unfortunatly we need to manually do a final scan of the dir
-                # with `queue_events`, then iterate through all events before stopping
-                # the observer to catch all files written.  First we need to prevent the
-                # existing thread from consuming our final events, then we process them
-                self._file_observer._timeout = 0
-                self._file_observer._stopped_event.set()
-                self._file_observer.join()
-                self.emitter.queue_events(0)
-                while True:
-                    try:
-                        self._file_observer.dispatch_events(
-                            self._file_observer.event_queue, 0
-                        )
-                    except queue.Empty:
-                        break
-                # Calling stop unschedules any inflight events so we handled them above
                 self._file_observer.stop()
+                self._file_observer.join()
+            # stop() stops and joins the emitters and detaches our handler, events
+            # they already emitted are still queued. The scan below picks up
+            # anything that was still in flight.
+            self._dispatch_pending_events()
         # TODO: py2 TypeError: PyCObject_AsVoidPtr called with null pointer
         except TypeError:
             pass
@@ -313,4 +503,9 @@ class DirWatcher(object):
                 file_path = os.path.join(dirpath, fname)
                 save_name = os.path.relpath(file_path, self._dir)
                 logger.info("scan save: %s %s", file_path, save_name)
-                self._get_file_event_handler(file_path, save_name).finish()
+                missed = save_name not in self._file_event_handlers
+                feh = self._get_file_event_handler(file_path, save_name)
+                if missed:
+                    # We never saw an event for this file, treat it as created
+                    feh.on_modified()
+                feh.finish()
@@ -6,7 +6,7 @@ import sys
 import time
 import requests
 
-from gql import gql
+from wandb.apis.query_registry import gql
 import six
 
 import wandb
@@ -5,6 +5,7 @@ import logging
 import numbers
 import os
 import shutil
+import threading
 
 import six
 from six.moves.collections_abc import Sequence as SixSequence
@@ -63,6 +64,10 @@ if wandb.TYPE_CHECKING:
 
 _MEDIA_TMP = tempfile.TemporaryDirectory("wandb-media")
 _DATA_FRAMES_SUBDIR = os.path.join("media", "data_frames")
+_HASH_CHUNK_SIZE = 2 ** 20
+
+# Guards the media files a run has written, see Run._media_files
+_RUN_MEDIA_FILES_LOCK = threading.Lock()
 
 
 def _safe_sdk_import() -> Tuple[Type["LocalRun"], Type["LocalArtifact"]]:
@@ -261,11 +266,11 @@ class Histogram(WBValue):
                     "Expected np_histogram to be a tuple of (values, bin_edges) or sequence to be specified"
                 )
         else:
-            np = util.get_module(
+            util.get_module(
                 "numpy", required="Auto creation of histograms requires numpy"
             )
 
-            self.histogram, self.bins = np.histogram(sequence, bins=num_bins)
+            self.histogram, self.bins = util.array_histogram(sequence, num_bins)
             self.histogram = self.histogram.tolist()
             self.bins = self.bins.tolist()
         if len(self.histogram) > self.MAX_LENGTH:
@@ -295,6 +300,11 @@ class Media(WBValue):
     _sha256: Optional[str]
     _size: Optional[int]
 
+    # True for media whose file names the frontend derives from key, step and
+    # index when they are logged in a sequence, rather than reading the path
+    # from the JSON. Those files can't be shared between steps.
+    _implicit_seq_paths: ClassVar[bool] = False
+
     def __init__(self, caption: Optional[str] = None) -> None:
         super(Media, self).__init__()
         self._path = None
@@ -315,8 +325,11 @@ class Media(WBValue):
                 )
             )
 
+        sha256 = hashlib.sha256()
         with open(self._path, "rb") as f:
-            self._sha256 = hashlib.sha256(f.read()).hexdigest()
+            for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+                sha256.update(chunk)
+        self._sha256 = sha256.hexdigest()
         self._size = os.path.getsize(self._path)
 
     @classmethod
@@ -374,6 +387,11 @@ class Media(WBValue):
         else:
             extension = self._extension
 
+        shareable = id_ is None or not self._implicit_seq_paths
+        content_key = (self.get_media_subdir(), extension, self._sha256)
+        if shareable and self._bind_to_existing_file(content_key):
+            return
+
         if id_ is None:
             id_ = self._sha256[:8]
 
@@ -382,6 +400,10 @@ class Media(WBValue):
         new_path = os.path.join(base_path, file_path)
         util.mkdir_exists_ok(os.path.dirname(new_path))
 
+        if shareable:
+            with _RUN_MEDIA_FILES_LOCK:
+                self._run._media_files[content_key] = new_path
+
         if self._is_tmp:
             shutil.move(self._path, new_path)
             self._path = new_path
@@ -392,6 +414,23 @@ class Media(WBValue):
             self._path = new_path
             _datatypes_callback(media_path)
 
+    def _bind_to_existing_file(self, content_key: Tuple[str, str, str]) -> bool:
+        """Points this object at a file with identical contents already written
+        to the run's media directory, if there is one. That file has already
+        been handed to the uploader, so nothing new is uploaded.
+        """
+        assert self._run is not None
+        assert isinstance(self._path, six.string_types)
+        with _RUN_MEDIA_FILES_LOCK:
+            existing = self._run._media_files.get(content_key)
+        if existing is None or not os.path.exists(existing):
+            return False
+        if existing != self._path and self._is_tmp:
+            os.remove(self._path)
+        self._path = existing
+        self._is_tmp = False
+        return True
+
     def to_json(self, run: Union["LocalRun", "LocalArtifact"]) -> dict:
         """Serializes the object into a JSON blob, using a run or artifact to store additional data. If `run_or_artifact`
         is a wandb.Run then `self.bind_to_run()` must have been previously been called.
@@ -1468,6 +1507,9 @@ class Image(BatchableMedia):
 
     artifact_type = "image-file"
 
+    # "images/separated" sequences reference files by key, step and index
+    _implicit_seq_paths = True
+
     format: Optional[str]
     _grouping: Optional[str]
     _caption: Optional[str]
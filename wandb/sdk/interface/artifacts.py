@@ -8,10 +8,12 @@ import os
 import wandb
 from wandb import env
 from wandb import util
-from wandb.data_types import WBValue
 
 if wandb.TYPE_CHECKING:  # type: ignore
-    from typing import Optional, Union
+    from typing import Optional, Union, TYPE_CHECKING
+
+    if TYPE_CHECKING:  # pragma: no cover
+        from wandb.data_types import WBValue
 
 
 def md5_string(string):
@@ -362,7 +364,7 @@ class Artifact(object):
         """
         raise NotImplementedError
 
-    def add(self, obj: WBValue, name: str):
+    def add(self, obj: "WBValue", name: str):
         """
         Adds `obj` to the artifact, where the object is a W&B histogram or
         media type.
@@ -429,7 +431,7 @@ class Artifact(object):
         """
         raise NotImplementedError
 
-    def get(self, name: str) -> WBValue:
+    def get(self, name: str) -> "WBValue":
         """
         Gets the WBValue object located at the artifact relative `name`.
 
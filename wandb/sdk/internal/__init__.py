@@ -0,0 +1,22 @@
+#
+"""
+internal.
+
+Modules of the internal process. They're only needed once a run is started,
+on python 3.7+ they're imported when first accessed as attributes.
+"""
+
+import importlib
+import sys
+from types import ModuleType
+
+if sys.version_info >= (3, 7):
+
+    def __getattr__(name: str) -> ModuleType:
+        if not name.startswith("_"):
+            try:
+                return importlib.import_module("." + name, __name__)
+            except ImportError as e:
+                if getattr(e, "name", None) != __name__ + "." + name:
+                    raise
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
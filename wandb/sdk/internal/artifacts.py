@@ -104,7 +104,7 @@ class ArtifactSaver(object):
         ):
             # TODO: update aliases, labels, description etc?
             if use_after_commit:
-                self._api.use_artifact(artifact_id)
+                self._api.use_artifact(artifact_id, batch=True)
             return self._server_artifact
         elif (
             self._server_artifact["state"] != "PENDING"
@@ -179,7 +179,7 @@ class ArtifactSaver(object):
 
         def on_commit():
             if finalize and use_after_commit:
-                self._api.use_artifact(artifact_id)
+                self._api.use_artifact(artifact_id, batch=True)
             step_prepare.shutdown()
 
         # This will queue the commit. It will only happen after all the file uploads are done
@@ -1,7 +1,4 @@
 #
-from gql import Client, gql  # type: ignore
-from gql.client import RetryError  # type: ignore
-from gql.transport.requests import RequestsHTTPTransport  # type: ignore
 import datetime
 import ast
 import os
@@ -27,9 +24,11 @@ from wandb.old.settings import Settings
 from wandb.old import retry
 from wandb import util
 from wandb.apis.normalize import normalize_exceptions
+from wandb.apis.query_registry import gql, requests_transport
 from wandb.errors.error import CommError, UsageError
 from ..lib.filenames import DIFF_FNAME
 from ..lib.git import GitRepo
+from .mutation_batcher import MutationBatcher
 
 from .progress import Progress
 
@@ -80,8 +79,9 @@ class Api(object):
             "system_samples": 15,
             "heartbeat_seconds": 30,
         }
-        self.client = Client(
-            transport=RequestsHTTPTransport(
+        gql_client = util.vendor_import("gql.client")
+        self.client = gql_client.Client(
+            transport=requests_transport(
                 headers={
                     "User-Agent": self.user_agent,
                     "X-WANDB-USERNAME": env.get_username(env=self._environ),
@@ -99,16 +99,29 @@ class Api(object):
             self.execute,
             retry_timedelta=retry_timedelta,
             check_retry_fn=util.no_retry_auth,
-            retryable_exceptions=(RetryError, requests.RequestException),
+            retryable_exceptions=(gql_client.RetryError, requests.RequestException),
         )
         self._current_run_id = None
         self._file_stream_api = None
+        self._mutation_batcher = None
         # This Retry class is initialized once for each Api instance, so this
         # defaults to retrying 1 million times per process or 7 days
         self.upload_file_retry = normalize_exceptions(
             retry.retriable(retry_timedelta=retry_timedelta)(self.upload_file)
         )
 
+    @property
+    def mutation_batcher(self):
+        """Sends the mutations queued with `batch=True` in batches."""
+        if self._mutation_batcher is None:
+            self._mutation_batcher = MutationBatcher(self.gql)
+        return self._mutation_batcher
+
+    def flush_mutations(self):
+        """Sends the queued mutations now."""
+        if self._mutation_batcher is not None:
+            self._mutation_batcher.flush()
+
     def reauth(self):
         """Ensures the current api key is set in the transport"""
         self.client.transport.auth = ("api", self.api_key or "")
@@ -852,6 +865,7 @@ class Api(object):
         sweep_name=None,
         summary_metrics=None,
         num_retries=None,
+        batch=False,
     ):
         """Update a run
 
@@ -869,6 +883,10 @@ class Api(object):
             program_path (str, optional): Path to the program.
             commit (str, optional): The Git SHA to associate the run with
             summary_metrics (str, optional): The JSON summary metrics
+            batch (bool, optional): Queue the update to be sent with other
+                mutations instead of waiting for it. Returns a MutationFuture of
+                the response instead of (run, inserted), errors are raised by its
+                result() rather than by this call.
         """
         mutation = gql(
             """
@@ -966,6 +984,9 @@ class Api(object):
             "summaryMetrics": summary_metrics,
         }
 
+        if batch:
+            return self.mutation_batcher.queue(mutation, variable_values, **kwargs)
+
         response = self.gql(mutation, variable_values=variable_values, **kwargs)
 
         run = response["upsertBucket"]["bucket"]
@@ -1571,7 +1592,12 @@ class Api(object):
         return responses
 
     def use_artifact(
-        self, artifact_id, entity_name=None, project_name=None, run_name=None
+        self,
+        artifact_id,
+        entity_name=None,
+        project_name=None,
+        run_name=None,
+        batch=False,
     ):
         query = gql(
             """
@@ -1603,16 +1629,16 @@ class Api(object):
         entity_name = entity_name or self.settings("entity")
         project_name = project_name or self.settings("project")
         run_name = run_name or self.current_run_id
+        variable_values = {
+            "entityName": entity_name,
+            "projectName": project_name,
+            "runName": run_name,
+            "artifactID": artifact_id,
+        }
+        if batch:
+            return self.mutation_batcher.queue(query, variable_values)
 
-        response = self.gql(
-            query,
-            variable_values={
-                "entityName": entity_name,
-                "projectName": project_name,
-                "runName": run_name,
-                "artifactID": artifact_id,
-            },
-        )
+        response = self.gql(query, variable_values=variable_values)
 
         if response["useArtifact"]["artifact"]:
             return response["useArtifact"]["artifact"]
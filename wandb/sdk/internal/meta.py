@@ -11,6 +11,8 @@ import multiprocessing
 import os
 from shutil import copyfile
 import sys
+import threading
+import time
 
 from wandb import util
 from wandb.vendor.pynvml import pynvml
@@ -26,6 +28,9 @@ else:
 
 logger = logging.getLogger(__name__)
 
+# Seconds we wait for all probes before moving on without the missing results
+DEFAULT_PROBE_TIMEOUT = 10.0
+
 
 class Meta(object):
     """Used to store metadata during and after a run."""
@@ -45,8 +50,49 @@ class Meta(object):
         self._saved_program = None
         # Locations under files directory where diff patches were saved.
         self._saved_patches = []
+        self._probe_timeout = (
+            self._settings._meta_probe_timeout
+            if self._settings._meta_probe_timeout is not None
+            else DEFAULT_PROBE_TIMEOUT
+        )
+        # All probes share one deadline. Once it passed, or the metadata was
+        # written, probes that are still running discard their results.
+        self._deadline = None
+        self._expired = False
+        self._lock = threading.Lock()
         logger.debug("meta init done")
 
+    def _run_probe(self, name, probe):
+        """Runs probe in a daemon thread and returns once it's done or the probe
+        deadline passed."""
+        remaining = self._deadline - time.time()
+        if remaining <= 0 or self._expired:
+            logger.warning("Skipping metadata probe %s, out of time", name)
+            return
+
+        def run():
+            try:
+                probe()
+            except Exception as e:
+                logger.error("Error in metadata probe %s: %s", name, e)
+
+        thread = threading.Thread(target=run, name="MetaProbe-" + name)
+        thread.daemon = True
+        thread.start()
+        thread.join(remaining)
+        if thread.is_alive():
+            logger.warning(
+                "Metadata probe %s timed out after %ss", name, self._probe_timeout
+            )
+            with self._lock:
+                self._expired = True
+
+    def _commit(self, commit):
+        """Applies the result of a probe, unless the probes already timed out."""
+        with self._lock:
+            if not self._expired:
+                commit()
+
     def _save_pip(self):
         """Saves the current working set of pip packages to {REQUIREMENTS_FNAME}"""
         logger.debug("save pip")
@@ -57,10 +103,14 @@ class Meta(object):
             installed_packages_list = sorted(
                 ["%s==%s" % (i.key, i.version) for i in installed_packages]
             )
-            with open(
-                os.path.join(self._settings.files_dir, REQUIREMENTS_FNAME), "w"
-            ) as f:
-                f.write("\n".join(installed_packages_list))
+
+            def commit():
+                with open(
+                    os.path.join(self._settings.files_dir, REQUIREMENTS_FNAME), "w"
+                ) as f:
+                    f.write("\n".join(installed_packages_list))
+
+            self._commit(commit)
         except Exception:
             logger.error("Error saving pip packages")
         logger.debug("save pip done")
@@ -83,10 +133,13 @@ class Meta(object):
             logger.warning("unable to save code -- can't find %s" % program_absolute)
             return
         saved_program = os.path.join(self._settings.files_dir, "code", program_relative)
-        self._saved_program = program_relative
 
-        if not os.path.exists(saved_program):
-            copyfile(program_absolute, saved_program)
+        def commit():
+            self._saved_program = program_relative
+            if not os.path.exists(saved_program):
+                copyfile(program_absolute, saved_program)
+
+        self._commit(commit)
         logger.debug("save code done")
 
     def _save_patches(self):
@@ -113,14 +166,11 @@ class Meta(object):
 
             if self._git.dirty:
                 patch_path = os.path.join(self._settings.files_dir, DIFF_FNAME)
-                with open(patch_path, "wb") as patch:
-                    # we diff against HEAD to ensure we get changes in the index
-                    subprocess.check_call(
-                        diff_args + ["HEAD"], stdout=patch, cwd=root, timeout=5
-                    )
-                    self._saved_patches.append(
-                        os.path.relpath(patch_path, start=self._settings.files_dir)
-                    )
+                # we diff against HEAD to ensure we get changes in the index
+                diff = subprocess.check_output(
+                    diff_args + ["HEAD"], cwd=root, timeout=5
+                )
+                self._commit(lambda: self._save_patch(patch_path, diff))
 
             upstream_commit = self._git.get_upstream_fork_point()
             if upstream_commit and upstream_commit != self._git.repo.head.commit:
@@ -128,15 +178,8 @@ class Meta(object):
                 upstream_patch_path = os.path.join(
                     self._settings.files_dir, "upstream_diff_{}.patch".format(sha)
                 )
-                with open(upstream_patch_path, "wb") as upstream_patch:
-                    subprocess.check_call(
-                        diff_args + [sha], stdout=upstream_patch, cwd=root, timeout=5
-                    )
-                    self._saved_patches.append(
-                        os.path.relpath(
-                            upstream_patch_path, start=self._settings.files_dir
-                        )
-                    )
+                diff = subprocess.check_output(diff_args + [sha], cwd=root, timeout=5)
+                self._commit(lambda: self._save_patch(upstream_patch_path, diff))
         # TODO: A customer saw `ValueError: Reference at 'refs/remotes/origin/foo'
         # does not exist` so we now catch ValueError. Catching this error feels
         # too generic.
@@ -148,47 +191,59 @@ class Meta(object):
             logger.error("Error generating diff: %s" % e)
         logger.debug("save patches done")
 
+    def _save_patch(self, patch_path, diff):
+        with open(patch_path, "wb") as patch:
+            patch.write(diff)
+        self._saved_patches.append(
+            os.path.relpath(patch_path, start=self._settings.files_dir)
+        )
+
     def _setup_sys(self):
-        self.data["os"] = self._settings._os
-        self.data["python"] = self._settings._python
-        self.data["heartbeatAt"] = datetime.utcnow().isoformat()
-        self.data["startedAt"] = datetime.utcfromtimestamp(
+        data = {}
+        data["os"] = self._settings._os
+        data["python"] = self._settings._python
+        data["heartbeatAt"] = datetime.utcnow().isoformat()
+        data["startedAt"] = datetime.utcfromtimestamp(
             self._settings._start_time
         ).isoformat()
 
-        self.data["docker"] = self._settings.docker
+        data["docker"] = self._settings.docker
 
         try:
             pynvml.nvmlInit()
-            self.data["gpu"] = pynvml.nvmlDeviceGetName(
+            data["gpu"] = pynvml.nvmlDeviceGetName(
                 pynvml.nvmlDeviceGetHandleByIndex(0)
             ).decode("utf8")
-            self.data["gpu_count"] = pynvml.nvmlDeviceGetCount()
+            data["gpu_count"] = pynvml.nvmlDeviceGetCount()
         except pynvml.NVMLError:
             pass
         try:
-            self.data["cpu_count"] = multiprocessing.cpu_count()
+            data["cpu_count"] = multiprocessing.cpu_count()
         except NotImplementedError:
             pass
 
-        self.data["cuda"] = self._settings._cuda
-        self.data["args"] = self._settings._args
-        self.data["state"] = "running"
+        data["cuda"] = self._settings._cuda
+        data["args"] = self._settings._args
+        data["state"] = "running"
+        self._commit(lambda: self.data.update(data))
 
     def _setup_git(self):
         if self._git.enabled:
             logger.debug("setup git")
-            self.data["git"] = {
+            data = {}
+            data["git"] = {
                 "remote": self._git.remote_url,
                 "commit": self._git.last_commit,
             }
-            self.data["email"] = self._git.email
-            self.data["root"] = self._git.root or self.data["root"] or os.getcwd()
+            data["email"] = self._git.email
+            data["root"] = self._git.root or self.data.get("root") or os.getcwd()
+            self._commit(lambda: self.data.update(data))
             logger.debug("setup git done")
 
     def probe(self):
         logger.debug("probe")
-        self._setup_sys()
+        self._deadline = time.time() + self._probe_timeout
+        self._run_probe("sys", self._setup_sys)
         if not self._settings.disable_code:
             if self._settings.program_relpath is not None:
                 self.data["codePath"] = self._settings.program_relpath
@@ -212,36 +267,42 @@ class Meta(object):
                             else:
                                 self.data["program"] = self._settings._jupyter_path
                                 self.data["root"] = self._settings._jupyter_root
-            self._setup_git()
+            self._run_probe("git", self._setup_git)
 
         if self._settings.anonymous != "true":
             self.data["host"] = self._settings.host
             self.data["username"] = self._settings.username
             self.data["executable"] = sys.executable
-        else:
-            self.data.pop("email", None)
-            self.data.pop("root", None)
 
         if self._settings.save_code:
-            self._save_code()
-            self._save_patches()
+            self._run_probe("code", self._save_code)
+            self._run_probe("patches", self._save_patches)
 
         if self._settings._save_requirements:
-            self._save_pip()
+            self._run_probe("pip", self._save_pip)
         logger.debug("probe done")
 
     def write(self):
+        # probes that timed out may still be running, write what we have and
+        # make them discard whatever they'd add later
+        with self._lock:
+            self._expired = True
+            data = self.data.copy()
+            saved_patches = list(self._saved_patches)
+            saved_program = self._saved_program
+        if self._settings.anonymous == "true":
+            data.pop("email", None)
+            data.pop("root", None)
         with open(self.fname, "w") as f:
-            s = json.dumps(self.data, indent=4)
+            s = json.dumps(data, indent=4)
             f.write(s)
             f.write("\n")
         base_name = os.path.basename(self.fname)
         files = dict(files=[(base_name, "now")])
 
-        if self._saved_program:
-            saved_program = os.path.join("code", self._saved_program)
-            files["files"].append((saved_program, "now"))
-        for patch in self._saved_patches:
+        if saved_program:
+            files["files"].append((os.path.join("code", saved_program), "now"))
+        for patch in saved_patches:
             files["files"].append((patch, "now"))
 
         self._interface.publish_files(files)
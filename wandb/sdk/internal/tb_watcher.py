@@ -9,10 +9,10 @@ import socket
 import threading
 import time
 
-import six
 from six.moves import queue
 import wandb
 from wandb import util
+from wandb.filesync import dir_watcher
 
 from . import run as internal_run
 
@@ -22,7 +22,7 @@ if wandb.TYPE_CHECKING:
     if TYPE_CHECKING:
         from ..interface.interface import BackendSender
         from .settings_static import SettingsStatic
-        from typing import Dict, List, Optional
+        from typing import Dict, List, Optional, Set
         from wandb.proto.wandb_internal_pb2 import RunRecord
         from six.moves.queue import PriorityQueue
         from tensorboard.compat.proto.event_pb2 import ProtoEvent
@@ -36,8 +36,14 @@ if wandb.TYPE_CHECKING:
 SHUTDOWN_DELAY = 5
 ERROR_DELAY = 5
 REMOTE_FILE_TOKEN = "://"
+# Most events converted before their rows are published
+MAX_BATCH_EVENTS = 1000
+# How often logdirs we can't watch for changes are polled
+POLL_INTERVAL = 1
 logger = logging.getLogger(__name__)
 
+wd_events = util.vendor_import("watchdog.events")
+
 
 def _link_and_save_file(
     path: str, base_path: str, interface: "BackendSender", settings: "SettingsStatic"
@@ -97,7 +103,15 @@ def is_tfevents_file_created_by(path: str, hostname: str, start_time: float) ->
 
 
 class TBWatcher(object):
+    """Watches the tensorboard logdirs of a run.
+
+    A single thread multiplexes all logdirs. Local logdirs are watched for
+    file changes and only reloaded when they're written to, remote logdirs
+    (and any we can't watch) are polled every POLL_INTERVAL seconds.
+    """
+
     _logdirs: "Dict[str, TBDirWatcher]"
+    _dirty: "Set[str]"
     _watcher_queue: "PriorityQueue"
 
     def __init__(
@@ -105,6 +119,7 @@ class TBWatcher(object):
         settings: "SettingsStatic",
         run_proto: "RunRecord",
         interface: "BackendSender",
+        force_polling: bool = False,
     ) -> None:
         self._logdirs = {}
         self._consumer = None
@@ -113,6 +128,13 @@ class TBWatcher(object):
         self._run_proto = run_proto
         # TODO(jhr): do we need locking in this queue?
         self._watcher_queue = queue.PriorityQueue()
+        self._lock = threading.Lock()
+        self._dirty = set()
+        self._wake = threading.Event()
+        self._shutdown = threading.Event()
+        self._thread = threading.Thread(target=self._thread_body)
+        self._observer = None
+        self._force_polling = force_polling
         wandb.tensorboard.reset_state()
 
     def _calculate_namespace(self, logdir: str, rootdir: str) -> "Optional[str]":
@@ -156,19 +178,99 @@ class TBWatcher(object):
             self._consumer.start()
 
         tbdir_watcher = TBDirWatcher(self, logdir, save, namespace, self._watcher_queue)
-        self._logdirs[logdir] = tbdir_watcher
-        tbdir_watcher.start()
+        with self._lock:
+            self._logdirs[logdir] = tbdir_watcher
+            self._dirty.add(logdir)
+        if not self._thread.is_alive():
+            self._thread.start()
+        self._wake.set()
+
+    def _notify(self, logdir: str) -> None:
+        with self._lock:
+            self._dirty.add(logdir)
+        self._wake.set()
+
+    def _watch(self, tbdir_watcher: "TBDirWatcher") -> None:
+        """Subscribes to file changes in a local logdir, tbdir_watcher.watched
+        stays False if the logdir has to be polled."""
+        logdir = tbdir_watcher._logdir
+        if (
+            self._force_polling
+            or REMOTE_FILE_TOKEN in logdir
+            or not os.path.isdir(logdir)
+        ):
+            return
+        if self._observer is None:
+            native = dir_watcher.native_observer_module()
+            if native is None:
+                self._force_polling = True
+                return
+            self._observer = native.InotifyObserver()
+            self._observer.start()
+
+        handler = wd_events.FileSystemEventHandler()
+        handler.on_any_event = lambda event: self._notify(logdir)
+        try:
+            # tensorboard only loads the files directly in the logdir
+            self._observer.schedule(handler, logdir, recursive=False)
+        except (OSError, IOError) as e:
+            # e.g. when we've run out of inotify watches
+            logger.warning("Polling tensorboard logdir %s: %s", logdir, e)
+            return
+        tbdir_watcher.watched = True
+
+    def _thread_body(self) -> None:
+        shutdown_time: "Optional[float]" = None
+        next_poll = 0.0
+        while True:
+            with self._lock:
+                tbdir_watchers = list(self._logdirs.values())
+                dirty = self._dirty
+                self._dirty = set()
+
+            now = time.time()
+            shutting_down = shutdown_time is not None
+            poll = now >= next_poll or shutting_down
+            if poll:
+                next_poll = now + POLL_INTERVAL
+            for tbdir_watcher in tbdir_watchers:
+                logdir = tbdir_watcher._logdir
+                unwatched = not tbdir_watcher.watched
+                if poll and unwatched:
+                    self._watch(tbdir_watcher)
+                # watched logdirs are only loaded when they change
+                if (poll and unwatched) or logdir in dirty or shutting_down:
+                    tbdir_watcher.load(retry=shutting_down)
+
+            if self._shutdown.is_set():
+                # keep loading for a bit, tensorboard data may still be flushed
+                if shutdown_time is None:
+                    shutdown_time = now + SHUTDOWN_DELAY
+                elif now > shutdown_time:
+                    break
+                time.sleep(1)
+            else:
+                self._wake.wait(max(0.0, next_poll - time.time()))
+                self._wake.clear()
+
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
 
     def finish(self) -> None:
-        for tbdirwatcher in six.itervalues(self._logdirs):
-            tbdirwatcher.shutdown()
-        for tbdirwatcher in six.itervalues(self._logdirs):
-            tbdirwatcher.finish()
+        self._shutdown.set()
+        self._wake.set()
+        if self._thread.is_alive():
+            self._thread.join()
         if self._consumer:
             self._consumer.finish()
 
 
 class TBDirWatcher(object):
+    """Loads the events of the tfevents files in a logdir. TBDirWatchers don't
+    have a thread of their own, they are loaded by their TBWatcher when the
+    logdir changes."""
+
     def __init__(
         self,
         tbwatcher: "TBWatcher",
@@ -192,17 +294,14 @@ class TBDirWatcher(object):
         self._generator = self.directory_watcher.DirectoryWatcher(
             logdir, self._loader(save, namespace), self._is_our_tfevents_file
         )
-        self._thread = threading.Thread(target=self._thread_body)
         self._first_event_timestamp = None
-        self._shutdown = threading.Event()
         self._queue = queue
         self._file_version = None
         self._namespace = namespace
         self._logdir = logdir
         self._hostname = socket.gethostname()
-
-    def start(self) -> None:
-        self._thread.start()
+        self._retry_time = 0.0
+        self.watched = False
 
     def _is_our_tfevents_file(self, path: str) -> bool:
         """Checks if a path has been modified since launch and contains tfevents"""
@@ -246,29 +345,22 @@ class TBDirWatcher(object):
 
         return EventFileLoader
 
-    def _thread_body(self) -> None:
-        """Check for new events every second"""
-        shutdown_time: "Optional[float]" = None
-        while True:
-            try:
-                for event in self._generator.Load():
-                    self.process_event(event)
-            except (
-                self.directory_watcher.DirectoryDeletedError,
-                StopIteration,
-                RuntimeError,
-            ) as e:
-                # When listing s3 the directory may not yet exist, or could be empty
-                logger.debug("Encountered tensorboard directory watcher error: %s", e)
-                if not self._shutdown.is_set():
-                    time.sleep(ERROR_DELAY)
-            if self._shutdown.is_set():
-                now = time.time()
-                if not shutdown_time:
-                    shutdown_time = now + SHUTDOWN_DELAY
-                elif now > shutdown_time:
-                    break
-            time.sleep(1)
+    def load(self, retry: bool = False) -> None:
+        """Queues the events written since the last load. After an error the
+        logdir is skipped for ERROR_DELAY seconds, unless retry is set."""
+        if not retry and time.time() < self._retry_time:
+            return
+        try:
+            for event in self._generator.Load():
+                self.process_event(event)
+        except (
+            self.directory_watcher.DirectoryDeletedError,
+            StopIteration,
+            RuntimeError,
+        ) as e:
+            # When listing s3 the directory may not yet exist, or could be empty
+            logger.debug("Encountered tensorboard directory watcher error: %s", e)
+            self._retry_time = time.time() + ERROR_DELAY
 
     def process_event(self, event: "ProtoEvent") -> None:
         # print("\nEVENT:::", self._logdir, self._namespace, event, "\n")
@@ -281,13 +373,6 @@ class TBDirWatcher(object):
         if event.HasField("summary"):
             self._queue.put(Event(event, self._namespace))
 
-    def shutdown(self) -> None:
-        self._shutdown.set()
-
-    def finish(self) -> None:
-        self.shutdown()
-        self._thread.join()
-
 
 class Event(object):
     """An event wrapper to enable priority queueing"""
@@ -338,36 +423,35 @@ class TBEventConsumer(object):
         self._thread.start()
 
     def finish(self) -> None:
-        self._delay = 0
         self._shutdown.set()
         self._thread.join()
 
     def _thread_body(self) -> None:
         tb_history = TBHistory()
+        # Wait self._delay seconds from consumer start before logging events,
+        # unless we're finished before then
+        self._shutdown.wait(max(0.0, self._start_time + self._delay - time.time()))
         while True:
             try:
-                event = self._queue.get(True, 1)
-                # Wait self._delay seconds from consumer start before logging events
-                if (
-                    time.time() < self._start_time + self._delay
-                    and not self._shutdown.is_set()
-                ):
-                    self._queue.put(event)
-                    time.sleep(0.1)
-                    continue
+                events = [self._queue.get(True, 1)]
             except queue.Empty:
-                event = None
                 if self._shutdown.is_set():
                     break
-            if event:
+                continue
+            # Convert everything that's queued in one go instead of waking up
+            # for every event
+            while len(events) < MAX_BATCH_EVENTS:
+                try:
+                    events.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            for event in events:
                 self._handle_event(event, history=tb_history)
-                items = tb_history._get_and_reset()
-                for item in items:
-                    self._save_row(item,)
+            for item in tb_history._get_and_reset():
+                self._save_row(item)
         # flush uncommitted data
         tb_history._flush()
-        items = tb_history._get_and_reset()
-        for item in items:
+        for item in tb_history._get_and_reset():
             self._save_row(item)
 
     def _handle_event(self, event: "ProtoEvent", history: "TBHistory" = None) -> None:
@@ -0,0 +1,257 @@
+#
+"""
+Compact on-disk storage for the primitive columns of a wandb.Table.
+
+Two formats are supported: parquet (requires pyarrow) and a dependency-free
+numpy layout. Columns are written together and read back one at a time so
+that callers only pay for the columns they touch.
+"""
+
+import json
+import mmap
+import struct
+
+import six
+import wandb
+from wandb.util import get_module
+
+if wandb.TYPE_CHECKING:  # type: ignore
+    from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+np = get_module("numpy")
+
+FORMAT_PARQUET = "parquet"
+FORMAT_NUMPY = "numpy"
+FORMATS = (FORMAT_PARQUET, FORMAT_NUMPY)
+
+EXTENSIONS = {
+    FORMAT_PARQUET: ".table.parquet",
+    FORMAT_NUMPY: ".table.npcols",
+}
+
+# Layout of the numpy format:
+#   MAGIC | uint64 header length | JSON header | padding | column buffers
+# Every buffer starts on an ALIGNMENT boundary, offsets in the header are
+# relative to the first buffer.
+MAGIC = b"WBCOLS1\n"
+ALIGNMENT = 64
+_HEADER_LEN = struct.Struct("<Q")
+
+# numpy dtype kinds that round trip through the numpy format
+_NUMPY_KINDS = ("b", "i", "u", "f", "U")
+_FILL_VALUES = {"b": False, "i": 0, "u": 0, "f": 0.0, "U": ""}
+
+
+def default_format() -> str:
+    """Parquet when pyarrow is available, numpy otherwise."""
+    if get_module("pyarrow.parquet") is not None:
+        return FORMAT_PARQUET
+    return FORMAT_NUMPY
+
+
+def resolve_format(fmt: str) -> str:
+    if fmt == "columnar":
+        return default_format()
+    if fmt not in FORMATS:
+        raise ValueError(
+            "Unknown columnar format {}, expected one of {}".format(fmt, FORMATS)
+        )
+    return fmt
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def to_array(values: "Sequence[Any]") -> "Optional[Tuple[Any, Any]]":
+    """Converts a column of python scalars into a (values, mask) pair of
+    numpy arrays, where mask marks the None entries (or is None when there
+    are none). Returns None if the column can't be stored as a flat array.
+    """
+    if np is None:
+        return None
+    mask = [v is None for v in values]
+    has_none = any(mask)
+    non_null = [v for v in values if v is not None]
+    try:
+        arr = np.asarray(non_null)
+    except (TypeError, ValueError, OverflowError):
+        return None
+    if arr.ndim != 1 or arr.dtype.kind not in _NUMPY_KINDS:
+        return None
+    # numpy coerces mixed columns (1 -> 1.0, True -> 1, 1 -> "1"), those stay
+    # in the JSON so their values round trip unchanged
+    if arr.dtype.kind == "U":
+        if not all(isinstance(v, six.string_types) for v in non_null):
+            return None
+    elif arr.dtype.kind != "b" and any(isinstance(v, bool) for v in non_null):
+        return None
+    elif arr.dtype.kind == "f" and any(
+        isinstance(v, six.integer_types) for v in non_null
+    ):
+        return None
+    if not has_none:
+        return arr, None
+    full = np.full(len(values), _FILL_VALUES[arr.dtype.kind], dtype=arr.dtype)
+    mask_arr = np.asarray(mask, dtype=bool)
+    full[~mask_arr] = arr
+    return full, mask_arr
+
+
+def write_columns(path: str, columns: "Dict[str, Sequence[Any]]", fmt: str) -> None:
+    """Writes equal length columns of python scalars to `path`."""
+    arrays = []
+    for name, values in columns.items():
+        converted = to_array(values)
+        if converted is None:
+            raise TypeError("Column {} can not be stored as an array".format(name))
+        arrays.append((name, converted[0], converted[1]))
+
+    if fmt == FORMAT_PARQUET:
+        pa = get_module("pyarrow", required="Writing parquet tables requires pyarrow")
+        pq = get_module("pyarrow.parquet")
+        pq.write_table(
+            pa.Table.from_arrays(
+                [pa.array(arr, mask=mask) for _, arr, mask in arrays],
+                names=[name for name, _, _ in arrays],
+            ),
+            path,
+        )
+        return
+
+    header_cols = []
+    buffers = []
+    offset = 0
+    nrows = None
+    for name, arr, mask in arrays:
+        if nrows is None:
+            nrows = len(arr)
+        col = {"name": name, "dtype": arr.dtype.str, "offset": offset, "mask": None}
+        buffers.append((offset, arr))
+        offset = _align(offset + arr.nbytes)
+        if mask is not None:
+            col["mask"] = offset
+            buffers.append((offset, mask))
+            offset = _align(offset + mask.nbytes)
+        header_cols.append(col)
+
+    header = json.dumps({"nrows": nrows or 0, "columns": header_cols}).encode("utf-8")
+    data_start = _align(len(MAGIC) + _HEADER_LEN.size + len(header))
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(_HEADER_LEN.pack(len(header)))
+        f.write(header)
+        for buf_offset, arr in buffers:
+            f.seek(data_start + buf_offset)
+            f.write(np.ascontiguousarray(arr).tobytes())
+
+
+class ColumnReader(object):
+    """Reads individual columns, or row ranges of them, back from a file
+    written by `write_columns`. The numpy format is memory-mapped so only the
+    requested rows are paged in and decoded.
+
+    The file is opened for each read and closed after it. Use the reader as a
+    context manager to keep the file open across several reads.
+    """
+
+    def __init__(self, path: str, fmt: str) -> None:
+        self.path = path
+        self.format = fmt
+        self._file: "Optional[Any]" = None
+        self._mmap: "Optional[Any]" = None
+        self._parquet: "Optional[Any]" = None
+        self._open_count = 0
+        self._parquet_cols: "Dict[str, Any]" = {}
+        if fmt == FORMAT_PARQUET:
+            with self:
+                parquet = self._parquet_file()
+                self.columns = list(parquet.schema_arrow.names)
+                self.nrows = parquet.metadata.num_rows
+        elif fmt == FORMAT_NUMPY:
+            get_module("numpy", required="Reading numpy tables requires numpy")
+            with open(path, "rb") as f:
+                if f.read(len(MAGIC)) != MAGIC:
+                    raise ValueError("{} is not a columnar table file".format(path))
+                (header_len,) = _HEADER_LEN.unpack(f.read(_HEADER_LEN.size))
+                header = json.loads(f.read(header_len).decode("utf-8"))
+            self._data_start = _align(len(MAGIC) + _HEADER_LEN.size + header_len)
+            self._numpy_cols = {col["name"]: col for col in header["columns"]}
+            self.columns = [col["name"] for col in header["columns"]]
+            self.nrows = header["nrows"]
+        else:
+            raise ValueError("Unknown columnar format {}".format(fmt))
+
+    def __enter__(self) -> "ColumnReader":
+        self._open_count += 1
+        return self
+
+    def __exit__(self, *args: "Any") -> None:
+        self._open_count -= 1
+        if self._open_count == 0:
+            self.close()
+
+    def close(self) -> None:
+        """Closes the file, it's opened again by the next read."""
+        if self._parquet is not None:
+            self._parquet.close()
+            self._parquet = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _parquet_file(self) -> "Any":
+        if self._parquet is None:
+            pq = get_module(
+                "pyarrow.parquet", required="Reading parquet tables requires pyarrow"
+            )
+            self._parquet = pq.ParquetFile(self.path)
+        return self._parquet
+
+    def _buffer(self, offset: int, dtype: "Any") -> "Any":
+        # zero-copy view of a column buffer in the memory-mapped file
+        if self.nrows == 0:
+            return np.zeros(0, dtype=dtype)
+        if self._mmap is None:
+            self._file = open(self.path, "rb")
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return np.ndarray(
+            shape=(self.nrows,),
+            dtype=dtype,
+            buffer=self._mmap,
+            offset=self._data_start + offset,
+        )
+
+    def _read_numpy_column(self, name: str, start: int, stop: int) -> "List[Any]":
+        # the views into the mmap go out of scope on return, so it can be closed
+        col = self._numpy_cols[name]
+        values = self._buffer(col["offset"], np.dtype(col["dtype"]))[start:stop]
+        values = values.tolist()
+        if col["mask"] is not None:
+            mask = self._buffer(col["mask"], np.dtype(bool))[start:stop]
+            for ndx in np.flatnonzero(mask).tolist():
+                values[ndx] = None
+        return values
+
+    def read_column(
+        self, name: str, start: int = 0, stop: "Optional[int]" = None
+    ) -> "List[Any]":
+        """Returns rows [start, stop) of the column as a list of python values,
+        with nulls as None."""
+        if stop is None or stop > self.nrows:
+            stop = self.nrows
+        if self.format == FORMAT_PARQUET:
+            if name not in self._parquet_cols:
+                # arrow keeps the decoded column compact, python objects are
+                # only created for the requested slice
+                with self:
+                    self._parquet_cols[name] = (
+                        self._parquet_file().read(columns=[name]).column(0)
+                    )
+            return self._parquet_cols[name].slice(start, stop - start).to_pylist()
+
+        with self:
+            return self._read_numpy_column(name, start, stop)
@@ -7,9 +7,13 @@ import os
 from six.moves import configparser
 from six.moves.urllib.parse import urlparse, urlunparse
 
+from .lazyloader import LazyLoader
 
 logger = logging.getLogger(__name__)
 
+# GitPython takes a while to import, only load it once a repo is looked up
+git = LazyLoader("git", globals(), "git")
+
 
 class GitRepo(object):
     def __init__(self, root=None, remote="origin", lazy=True):
@@ -26,10 +30,13 @@ class GitRepo(object):
                 self._repo = False
             else:
                 try:
-                    self._repo = Repo(
+                    self._repo = git.Repo(
                         self._root or os.getcwd(), search_parent_directories=True
                     )
-                except exc.InvalidGitRepositoryError:
+                except ImportError:  # import fails if user doesn't have git
+                    logger.debug("git is not available")
+                    self._repo = False
+                except git.exc.InvalidGitRepositoryError:
                     logger.debug("git repository is invalid")
                     self._repo = False
         return self._repo
@@ -164,7 +171,7 @@ class GitRepo(object):
                     elif self.repo.is_ancestor(most_recent_ancestor, ancestor):
                         most_recent_ancestor = ancestor
             return most_recent_ancestor
-        except exc.GitCommandError as e:
+        except git.exc.GitCommandError as e:
             logger.debug("git remote upstream fork point could not be found")
             logger.debug(str(e))
             return None
@@ -172,7 +179,7 @@ class GitRepo(object):
     def tag(self, name, message):
         try:
             return self.repo.create_tag("wandb/" + name, message=message, force=True)
-        except exc.GitCommandError:
+        except git.exc.GitCommandError:
             print("Failed to tag repository.")
             return None
 
@@ -180,7 +187,7 @@ class GitRepo(object):
         if self.remote:
             try:
                 return self.remote.push("wandb/" + name, force=True)
-            except exc.GitCommandError:
+            except git.exc.GitCommandError:
                 logger.debug("failed to push git")
                 return None
 
@@ -189,9 +196,3 @@ class FakeGitRepo(GitRepo):
     @property
     def repo(self):
         return None
-
-
-try:
-    from git import Repo, exc  # type: ignore
-except ImportError:  # import fails if user doesn't have git
-    GitRepo = FakeGitRepo  # type: ignore
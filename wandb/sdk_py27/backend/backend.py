@@ -13,7 +13,6 @@ import sys
 import wandb
 
 from ..interface import interface
-from ..internal.internal import wandb_internal
 
 logger = logging.getLogger("wandb")
 
@@ -40,6 +39,9 @@ class Backend(object):
         use_redirect=None,
     ):
         """Launch backend worker if not running."""
+        # the internal process pulls in the whole sender, only load it when needed
+        from ..internal.internal import wandb_internal
+
         settings = dict(settings or ())
         settings["_log_level"] = log_level or logging.DEBUG
 
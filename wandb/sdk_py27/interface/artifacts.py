@@ -8,10 +8,12 @@ import os
 import wandb
 from wandb import env
 from wandb import util
-from wandb.data_types import WBValue
 
 if wandb.TYPE_CHECKING:  # type: ignore
-    from typing import Optional, Union
+    from typing import Optional, Union, TYPE_CHECKING
+
+    if TYPE_CHECKING:  # pragma: no cover
+        from wandb.data_types import WBValue
 
 
 def md5_string(string):
@@ -14,7 +14,6 @@ import uuid
 import six
 from six.moves import queue
 import wandb
-from wandb import data_types
 from wandb.proto import wandb_internal_pb2 as pb
 from wandb.proto import wandb_telemetry_pb2 as tpb
 from wandb.util import (
@@ -207,6 +206,8 @@ class BackendSender(object):
     def publish_history(
         self, data, step = None, run = None, publish_step = True
     ):
+        from wandb import data_types
+
         run = run or self._run
         data = data_types.history_dict_to_json(run, data, step=step)
         history = pb.HistoryRecord()
@@ -340,6 +341,8 @@ class BackendSender(object):
                 )
             return json_value
         else:
+            from wandb import data_types
+
             friendly_value, converted = json_friendly(  # type: ignore
                 data_types.val_to_json(
                     self._run, path_from_root, value, namespace="summary"
@@ -61,7 +61,7 @@ except Exception:
 
 
 class DataStore(object):
-    def __init__(self):
+    def __init__(self, for_import=False):
         self._opened_for_scan = False
         self._fp = None
         self._index = 0
@@ -70,7 +70,9 @@ class DataStore(object):
         for x in range(1, LEVELDBLOG_LAST + 1):
             self._crc[x] = zlib.crc32(strtobytes(chr(x))) & 0xFFFFFFFF
 
-        assert wandb._IS_INTERNAL_PROCESS
+        # run data is written by the internal process, or by importers that
+        # convert runs from other formats into an offline run for `wandb sync`
+        assert for_import or wandb._IS_INTERNAL_PROCESS
 
     def open_for_write(self, fname):
         self._fname = fname
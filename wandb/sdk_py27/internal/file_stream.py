@@ -19,6 +19,8 @@ MAX_LINE_SIZE = 4 * 1024 * 1024 - 100 * 1024  # imposed by back end
 logger = logging.getLogger(__name__)
 
 Chunk = collections.namedtuple("Chunk", ("filename", "data"))
+# Bytes appended to a file, at the byte offset they were written to
+AppendedChunk = collections.namedtuple("AppendedChunk", ("filename", "data", "offset"))
 
 
 class DefaultFilePolicy(object):
@@ -106,12 +108,23 @@ class CRDedupeFilePolicy(DefaultFilePolicy):
 
 
 class BinaryFilePolicy(DefaultFilePolicy):
+    """Streams raw bytes appended to a file, offsets are byte offsets.
+
+    Chunks are AppendedChunks that carry their own offset. A gap between two
+    chunks means the file was uploaded in full in between, only the bytes after
+    the last gap are sent since the upload already has the ones before it.
+    """
+
     def process_chunks(self, chunks):
+        start = 0
+        for ndx in range(1, len(chunks)):
+            prev = chunks[ndx - 1]
+            if chunks[ndx].offset != prev.offset + len(prev.data):
+                start = ndx
+        chunks = chunks[start:]
         data = b"".join([c.data for c in chunks])
         enc = base64.b64encode(data).decode("ascii")
-        offset = self._offset
-        self._offset += len(data)
-        return {"offset": self._offset, "content": enc, "encoding": "base64"}
+        return {"offset": chunks[0].offset, "content": enc, "encoding": "base64"}
 
 
 class FileStreamApi(object):
@@ -289,6 +302,17 @@ class FileStreamApi(object):
         """
         self._queue.put(Chunk(filename, data))
 
+    def push_appended(self, filename, offset, data):
+        """Push bytes appended to a file that was already uploaded in full.
+
+        Arguments:
+            filename: Name of the file the bytes were appended to.
+            offset: Byte offset of data in the file.
+            data: The appended bytes.
+        """
+        self.set_default_file_policy(filename, BinaryFilePolicy())
+        self._queue.put(AppendedChunk(filename, data, offset))
+
     def finish(self, exitcode):
         """Cleans up.
 
@@ -8,6 +8,7 @@ import json
 import logging
 import numbers
 import os
+import threading
 
 import six
 import wandb
@@ -28,7 +29,7 @@ if wandb.TYPE_CHECKING:
     )
     from .settings_static import SettingsStatic
     from six.moves.queue import Queue
-    from threading import Event
+    from threading import Event, Thread
     from ..interface.interface import BackendSender
     from wandb.proto.wandb_internal_pb2 import Record, Result
 
@@ -51,6 +52,7 @@ class HandleManager(object):
     # _interface: BackendSender
     # _system_stats: Optional[stats.SystemStats]
     # _tb_watcher: Optional[tb_watcher.TBWatcher]
+    # _meta_thread: Optional[Thread]
 
     def __init__(
         self,
@@ -72,6 +74,7 @@ class HandleManager(object):
 
         self._tb_watcher = None
         self._system_stats = None
+        self._meta_thread = None
         self._step = 0
 
         # keep track of summary from key/val updates
@@ -108,6 +111,8 @@ class HandleManager(object):
         logger.info("handle defer: {}".format(state))
         # only handle flush tb (sender handles the rest)
         if state == defer.FLUSH_STATS:
+            # publish the metadata files before the file pusher is flushed
+            self._join_meta()
             if self._system_stats:
                 # TODO(jhr): this could block so we dont really want to call shutdown
                 # from handler thread
@@ -261,13 +266,18 @@ class HandleManager(object):
 
         if not self._settings._disable_stats:
             pid = os.getpid()
-            self._system_stats = stats.SystemStats(pid=pid, interface=self._interface)
+            self._system_stats = stats.SystemStats(
+                pid=pid, interface=self._interface, settings=self._settings
+            )
             self._system_stats.start()
 
         if not self._settings._disable_meta:
-            run_meta = meta.Meta(settings=self._settings, interface=self._interface)
-            run_meta.probe()
-            run_meta.write()
+            # probing runs git and enumerates packages, don't hold up wandb.init
+            self._meta_thread = threading.Thread(
+                target=self._probe_meta, name="MetaProbe"
+            )
+            self._meta_thread.daemon = True
+            self._meta_thread.start()
 
         self._tb_watcher = tb_watcher.TBWatcher(
             self._settings, interface=self._interface, run_proto=run_start.run
@@ -278,6 +288,17 @@ class HandleManager(object):
         result = wandb_internal_pb2.Result(uuid=record.uuid)
         self._result_q.put(result)
 
+    def _probe_meta(self):
+        run_meta = meta.Meta(settings=self._settings, interface=self._interface)
+        run_meta.probe()
+        run_meta.write()
+
+    def _join_meta(self):
+        # the probes share one deadline, so this blocks for at most that long
+        if self._meta_thread:
+            self._meta_thread.join()
+            self._meta_thread = None
+
     def handle_request_resume(self, record):
         if self._system_stats is not None:
             logger.info("starting system metrics thread")
@@ -331,5 +352,6 @@ class HandleManager(object):
 
     def finish(self):
         logger.info("shutting down handler")
+        self._join_meta()
         if self._tb_watcher:
             self._tb_watcher.finish()
@@ -0,0 +1,251 @@
+# File is generated by: tox -e codemod
+"""
+Combines GraphQL mutations queued within a short window into one request.
+
+Each queued mutation becomes aliased root fields of a single `mutation Batch`
+operation, with its variables renamed so they can't collide. Root fields of
+a mutation are executed in order by the server, so queued mutations are
+applied in the order they were queued. Only idempotent mutations should be
+queued: when a batch fails its mutations are retried one by one.
+
+Errors aren't raised to the code that queued a mutation, they're logged and
+set on the MutationFuture returned by `queue`, whose `result()` raises them.
+"""
+
+import copy
+import logging
+import threading
+import time
+
+import wandb
+from wandb import util
+
+if wandb.TYPE_CHECKING:  # type: ignore
+    from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait for more mutations once one is queued
+BATCH_WINDOW = 0.1
+MAX_BATCH_SIZE = 50
+
+
+class MutationFuture(object):
+    """The result of a queued mutation."""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._result = None
+        self._exception = None
+
+    def set_result(self, result):
+        self._result = result
+        self._event.set()
+
+    def set_exception(self, exception):
+        self._exception = exception
+        self._event.set()
+
+    def done(self):
+        return self._event.is_set()
+
+    def result(self):
+        """Waits for the mutation to be sent and returns its response."""
+        self._event.wait()
+        if self._exception is not None:
+            raise self._exception
+        return self._result
+
+
+def _nodes(node):
+    """Yields node and all the ast nodes under it."""
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(node)
+        elif hasattr(node, "__slots__"):
+            yield node
+            stack.extend(
+                getattr(node, slot)
+                for slot in node.__slots__
+                if slot != "loc" and getattr(node, slot, None) is not None
+            )
+
+
+def _split(document):
+    """Returns the operation and fragments of a document that can be batched,
+    raises ValueError otherwise."""
+    ast = util.vendor_import("graphql.language.ast")
+    operations = [
+        d for d in document.definitions if isinstance(d, ast.OperationDefinition)
+    ]
+    fragments = [d for d in document.definitions if d not in operations]
+    if len(operations) != 1 or operations[0].operation != "mutation":
+        raise ValueError("Only single mutations can be batched")
+    if operations[0].directives or not all(
+        isinstance(s, ast.Field) for s in operations[0].selection_set.selections
+    ):
+        raise ValueError("Mutation can't be batched")
+    if any(isinstance(n, ast.Variable) for n in _nodes(fragments)):
+        raise ValueError("Fragments with variables can't be batched")
+    return operations[0], fragments
+
+
+def combine(
+    mutations,
+):
+    """Combines (document, variables) mutations into one document.
+
+    Returns the document, its variables and, for each mutation, the aliases of
+    its root fields in the combined response mapped to their original keys.
+    """
+    ast = util.vendor_import("graphql.language.ast")
+    printer = util.vendor_import("graphql.language.printer")
+    variable_definitions = []
+    selections = []
+    fragments = {}
+    variables = {}
+    aliases = []
+    for ndx, (document, mutation_variables) in enumerate(mutations):
+        prefix = "m%d_" % ndx
+        operation, mutation_fragments = _split(getattr(document, "ast", document))
+        operation = copy.deepcopy(operation)
+        for fragment in mutation_fragments:
+            name = fragment.name.value
+            if name in fragments and printer.print_ast(
+                fragments[name]
+            ) != printer.print_ast(fragment):
+                raise ValueError("Conflicting fragments named %s" % name)
+            fragments[name] = fragment
+
+        for node in _nodes(operation):
+            if isinstance(node, ast.Variable):
+                node.name = ast.Name(value=prefix + node.name.value)
+        for key, value in (mutation_variables or {}).items():
+            variables[prefix + key] = value
+        variable_definitions.extend(operation.variable_definitions or [])
+
+        field_aliases = {}
+        for field in operation.selection_set.selections:
+            key = (field.alias or field.name).value
+            field.alias = ast.Name(value=prefix + key)
+            field_aliases[prefix + key] = key
+            selections.append(field)
+        aliases.append(field_aliases)
+
+    document = ast.Document(
+        definitions=[
+            ast.OperationDefinition(
+                operation="mutation",
+                name=ast.Name(value="Batch"),
+                variable_definitions=variable_definitions,
+                directives=[],
+                selection_set=ast.SelectionSet(selections=selections),
+            )
+        ]
+        + list(fragments.values())
+    )
+    return document, variables, aliases
+
+
+class MutationBatcher(object):
+    """Sends queued mutations in batches from a background thread.
+
+    Arguments:
+        execute: executes a document, called like `execute(document,
+            variable_values=variables)` and returning the response data
+        window (float): seconds to wait for more mutations once one is queued
+        max_batch_size (int): most mutations sent in one request
+    """
+
+    def __init__(
+        self,
+        execute,
+        window = BATCH_WINDOW,
+        max_batch_size = MAX_BATCH_SIZE,
+    ):
+        self._execute = execute
+        self._window = window
+        self._max_batch_size = max_batch_size
+        self._queue = []
+        self._cond = threading.Condition()
+        # batches are sent one at a time, in order
+        self._send_lock = threading.Lock()
+        self._thread = None
+
+    def queue(
+        self,
+        document,
+        variable_values = None,
+        **kwargs
+    ):
+        """Queues a mutation, it's sent within `window` seconds.
+
+        kwargs, e.g. num_retries, are passed on to `execute`. Only mutations
+        queued one after the other with the same kwargs share a request.
+        """
+        future = MutationFuture()
+        with self._cond:
+            self._queue.append((document, variable_values, kwargs, future))
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="MutationBatcher"
+                )
+                self._thread.daemon = True
+                self._thread.start()
+            self._cond.notify()
+        return future
+
+    def flush(self):
+        """Sends all the queued mutations now."""
+        with self._send_lock:
+            while self._send_batch():
+                pass
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._cond.wait()
+            # give other mutations a chance to join the batch
+            time.sleep(self._window)
+            self.flush()
+
+    def _send_batch(self):
+        with self._cond:
+            if not self._queue:
+                return False
+            kwargs = self._queue[0][2]
+            size = 1
+            while (
+                size < min(len(self._queue), self._max_batch_size)
+                and self._queue[size][2] == kwargs
+            ):
+                size += 1
+            batch = self._queue[:size]
+            del self._queue[:size]
+        if len(batch) > 1:
+            try:
+                document, variables, aliases = combine(
+                    [(document, variables) for document, variables, _, _ in batch]
+                )
+                data = self._execute(document, variable_values=variables, **kwargs)
+            except Exception as e:
+                logger.warning("Sending mutations one by one, batch failed: %s", e)
+            else:
+                for (_, _, _, future), field_aliases in zip(batch, aliases):
+                    future.set_result(
+                        {key: data.get(alias) for alias, key in field_aliases.items()}
+                    )
+                return True
+
+        for document, variables, _, future in batch:
+            try:
+                future.set_result(
+                    self._execute(document, variable_values=variables, **kwargs)
+                )
+            except Exception as e:
+                logger.error("Mutation failed: %s", e)
+                future.set_exception(e)
+        return True
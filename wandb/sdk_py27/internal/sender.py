@@ -213,7 +213,9 @@ class SendManager(object):
 
         done = False
         if state == defer.BEGIN:
-            pass
+            # send queued run updates while the file stream still reports the
+            # run as running, FLUSH_FS marks it as finished
+            self._api.flush_mutations()
         elif state == defer.FLUSH_STATS:
             # NOTE: this is handled in handler.py:handle_request_defer()
             pass
@@ -583,7 +585,9 @@ class SendManager(object):
         )
         self._fs.start()
         self._pusher = FilePusher(self._api, silent=self._settings.silent)
-        self._dir_watcher = DirWatcher(self._settings, self._api, self._pusher)
+        self._dir_watcher = DirWatcher(
+            self._settings, self._api, self._pusher, file_stream=self._fs
+        )
         util.sentry_set_scope(
             "internal",
             entity=self._run.entity,
@@ -663,7 +667,10 @@ class SendManager(object):
     def _update_config(self):
         config_value_dict = self._config_format(self._consolidated_config)
         self._api.upsert_run(
-            name=self._run.run_id, config=config_value_dict, **self._api_settings
+            name=self._run.run_id,
+            config=config_value_dict,
+            batch=True,
+            **self._api_settings
         )
         self._config_save(config_value_dict)
         # TODO(jhr): check result of upsert_run?
@@ -764,6 +771,9 @@ class SendManager(object):
 
     def finish(self):
         logger.info("shutting down sender")
+        # the defer sequence already flushed these unless the run was
+        # stopped without it
+        self._api.flush_mutations()
         # if self._tb_watcher:
         #     self._tb_watcher.finish()
         if self._dir_watcher:
@@ -20,6 +20,11 @@ class SettingsStatic(object):
     # _offline: "Optional[bool]"
     # _disable_stats: "Optional[bool]"
     # _disable_meta: "Optional[bool]"
+    # _meta_probe_timeout: "Optional[float]"
+    # _stats_sample_rate_seconds: "Optional[float]"
+    # _stats_samples_to_average: "Optional[int]"
+    # _stats_sample_rates: "Optional[Dict[str, float]]"
+    # _stats_process_refresh_seconds: "Optional[float]"
     # _start_time: float
     # files_dir: str
     # log_internal: str
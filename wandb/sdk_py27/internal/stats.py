@@ -2,6 +2,7 @@
 from __future__ import absolute_import
 
 import json
+import os
 import platform
 import subprocess
 import threading
@@ -14,14 +15,16 @@ from wandb.vendor.pynvml import pynvml
 
 from . import tpu
 from ..lib import telemetry
+from ..wandb_settings import STATS_METRIC_GROUPS
 
 
 if wandb.TYPE_CHECKING:
-    from typing import Dict, List, Optional, Union
+    from typing import Dict, List, Optional, Set, Tuple, Union
     from ..interface.interface import BackendSender
+    from .settings_static import SettingsStatic
 
     GPUHandle = object
-    SamplerDict = Dict[str, List[float]]
+    SamplerDict = Dict[str, "RunningStat"]
     StatsDict = Dict[str, Union[float, Dict[str, float]]]
 
 
@@ -29,11 +32,12 @@ if wandb.TYPE_CHECKING:
 # Eventually we can have the apple_gpu_stats binary query for this.
 M1_MAX_POWER_WATTS = 16.5
 
+# Metrics are sampled in groups, each group can have its own sample rate
+METRIC_GROUPS = STATS_METRIC_GROUPS
 
-def gpu_in_use_by_this_process(gpu_handle):
-    if not psutil:
-        return False
 
+def user_process_tree():
+    """The user process and all of its descendants, e.g. data loader workers."""
     # NOTE: this optimizes for the case where wandb was initialized from
     # iniside the user script (i.e. `wandb.init()`). If we ran using
     # `wandb run` on the command line, the shell will be detected as the
@@ -44,8 +48,22 @@ def gpu_in_use_by_this_process(gpu_handle):
 
     our_processes = base_process.children(recursive=True)
     our_processes.append(base_process)
+    return our_processes
+
 
-    our_pids = set([process.pid for process in our_processes])
+def our_pids():
+    """The pids of the user process tree."""
+    return set([process.pid for process in user_process_tree()])
+
+
+def gpu_in_use_by_this_process(
+    gpu_handle, pids = None
+):
+    if not psutil:
+        return False
+
+    if pids is None:
+        pids = our_pids()
 
     compute_pids = set(
         [
@@ -62,10 +80,47 @@ def gpu_in_use_by_this_process(gpu_handle):
 
     pids_using_device = compute_pids | graphics_pids
 
-    return len(pids_using_device & our_pids) > 0
+    return len(pids_using_device & pids) > 0
+
+
+class RunningStat(object):
+    """Count, mean, min and max of a metric, updated one sample at a time."""
+
+    __slots__ = ("count", "total", "min", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    @property
+    def mean(self):
+        return self.total / self.count
 
 
 class SystemStats(object):
+    """Samples system metrics in a background thread and publishes their averages.
+
+    Every metric group is sampled at its own rate (by default every
+    sample_rate_seconds), and averages are published every samples_to_average
+    base samples. Groups sampled faster than the base rate also report the min
+    and max over the window as "<metric>.min" and "<metric>.max".
+    """
+
+    DEFAULT_SAMPLE_RATE_SECONDS = 1.0
+    DEFAULT_SAMPLES_TO_AVERAGE = 4
+    # How often we walk the user process tree, look up which GPUs it uses and
+    # measure its unique memory (USS), which is expensive to get
+    DEFAULT_PROCESS_REFRESH_SECONDS = 10.0
 
     # _pid: int
     # _interface: BackendSender
@@ -74,7 +129,12 @@ class SystemStats(object):
     # _thread: Optional[threading.Thread]
     # gpu_count: int
 
-    def __init__(self, pid, interface):
+    def __init__(
+        self,
+        pid,
+        interface,
+        settings = None,
+    ):
         try:
             pynvml.nvmlInit()
             self.gpu_count = pynvml.nvmlDeviceGetCount()
@@ -85,8 +145,20 @@ class SystemStats(object):
         self._interface = interface
         self.sampler = {}
         self.samples = 0
+        self._latest = {}
+        self._metric_groups = {}
         self._shutdown = False
+        self._shutdown_event = threading.Event()
         self._telem = telemetry.TelemetryRecord()
+        self._proc = None
+        self._gpu_handles = []
+        self._gpu_power_limits = {}
+        self._gpus_in_use = set()
+        self._gpus_in_use_time = None
+        self._tree = {}
+        self._tree_time = None
+        self._tree_uss = None
+        self._tree_io = {}
         if psutil:
             net = psutil.net_io_counters()
             self.network_init = {"sent": net.bytes_sent, "recv": net.bytes_recv}
@@ -103,9 +175,47 @@ class SystemStats(object):
             except Exception as e:
                 wandb.termlog("Error initializing TPUProfiler: " + str(e))
 
+        self._configure(settings)
+
+    def _configure(self, settings):
+        def setting(name):
+            return getattr(settings, name, None) if settings is not None else None
+
+        self._sample_rate_seconds = float(
+            setting("_stats_sample_rate_seconds") or self.DEFAULT_SAMPLE_RATE_SECONDS
+        )
+        self._samples_to_average = int(
+            setting("_stats_samples_to_average") or self.DEFAULT_SAMPLES_TO_AVERAGE
+        )
+        self._process_refresh_seconds = float(
+            setting("_stats_process_refresh_seconds")
+            or self.DEFAULT_PROCESS_REFRESH_SECONDS
+        )
+        # group names and rates are validated by the settings
+        rates = setting("_stats_sample_rates") or {}
+        self._sample_rates = {
+            group: float(rates.get(group) or self._sample_rate_seconds)  # type: ignore
+            for group in self._enabled_groups()
+        }
+
+    def _enabled_groups(self):
+        groups = []
+        if self.gpu_count > 0 or self._is_m1():
+            groups.append("gpu")
+        if psutil:
+            groups.extend(["cpu", "memory", "network", "disk", "proc"])
+        if self._tpu_profiler:
+            groups.append("tpu")
+        return groups
+
+    @staticmethod
+    def _is_m1():
+        return platform.system() == "Darwin" and platform.processor() == "arm"
+
     def start(self):
         if self._thread is None:
             self._shutdown = False
+            self._shutdown_event.clear()
             self._thread = threading.Thread(target=self._thread_body)
             self._thread.daemon = True
         if not self._thread.is_alive():
@@ -115,42 +225,42 @@ class SystemStats(object):
 
     @property
     def proc(self):
-        return psutil.Process(pid=self._pid)
+        if self._proc is None:
+            self._proc = psutil.Process(pid=self._pid)
+        return self._proc
 
     @property
     def sample_rate_seconds(self):
-        """Sample system stats every this many seconds, defaults to 2, min is 0.5"""
-        return 1
-        # return max(0.5, self._api.dynamic_settings["system_sample_seconds"])
+        """Sample system stats every this many seconds, defaults to 1"""
+        return self._sample_rate_seconds
 
     @property
     def samples_to_average(self):
-        """The number of samples to average before pushing, defaults to 15 valid range (2:30)"""
-        return 4
-        # return min(30, max(2, self._api.dynamic_settings["system_samples"]))
+        """The number of samples to average before pushing, defaults to 4"""
+        return self._samples_to_average
 
     def _thread_body(self):
+        now = time.time()
+        next_sample = {group: now for group in self._sample_rates}
+        next_flush = now + self.sample_rate_seconds * self.samples_to_average
         while True:
-            stats = self.stats()
-            for stat, value in stats.items():
-                if isinstance(value, (int, float)):
-                    self.sampler[stat] = self.sampler.get(stat, [])
-                    self.sampler[stat].append(value)
-            self.samples += 1
-            if self._shutdown or self.samples >= self.samples_to_average:
+            now = time.time()
+            due = [group for group, t in next_sample.items() if t <= now]
+            if due:
+                self._sample(due)
+                for group in due:
+                    next_sample[group] = now + self._sample_rates[group]
+            if now >= next_flush:
                 self.flush()
-                if self._shutdown:
-                    break
-            seconds = 0.0
-            while seconds < self.sample_rate_seconds:
-                time.sleep(0.1)
-                seconds += 0.1
-                if self._shutdown:
-                    self.flush()
-                    return
+                next_flush = now + self.sample_rate_seconds * self.samples_to_average
+            wake = min(list(next_sample.values()) + [next_flush])
+            if self._shutdown_event.wait(max(0.0, wake - time.time())):
+                break
+        self.flush()
 
     def shutdown(self):
         self._shutdown = True
+        self._shutdown_event.set()
         try:
             if self._thread is not None:
                 self._thread.join()
@@ -159,32 +269,194 @@ class SystemStats(object):
         if self._tpu_profiler:
             self._tpu_profiler.stop()
 
+    def _sample(self, groups):
+        for group in groups:
+            stats = {}
+            self._group_stats(group, stats)
+            for stat, value in stats.items():
+                self._metric_groups[stat] = group
+                if isinstance(value, (int, float)):
+                    if stat not in self.sampler:
+                        self.sampler[stat] = RunningStat()
+                    self.sampler[stat].add(value)
+                else:
+                    self._latest[stat] = value
+        self.samples += 1
+
     def flush(self):
-        stats = self.stats()
-        for stat, value in stats.items():
+        if not self.samples:
+            self._sample(list(self._sample_rates))
+        stats = dict(self._latest)
+        for stat, running in self.sampler.items():
             # TODO: a bit hacky, we assume all numbers should be averaged.  If you want
             # max for a stat, you must put it in a sub key, like ["network"]["sent"]
-            if isinstance(value, (float, int)):
-                # samples = list(self.sampler.get(stat, [stats[stat]]))
-                samples = list(self.sampler.get(stat, [value]))
-                stats[stat] = round(sum(samples) / len(samples), 2)
+            stats[stat] = round(running.mean, 2)
+            group = self._metric_groups[stat]
+            if self._sample_rates.get(group, 0) < self.sample_rate_seconds:
+                stats[stat + ".min"] = round(running.min, 2)
+                stats[stat + ".max"] = round(running.max, 2)
         # self.run.events.track("system", stats, _wandb=True)
         if self._interface:
             self._interface.publish_stats(stats)
         self.samples = 0
         self.sampler = {}
+        self._latest = {}
+
+    def _gpus_in_use_by_us(self):
+        """Indexes of the GPUs used by the user process tree. Walking the process
+        tree and listing the processes on every GPU is expensive, so the result is
+        only refreshed every process_refresh_seconds."""
+        now = time.time()
+        if (
+            self._gpus_in_use_time is not None
+            and now - self._gpus_in_use_time < self._process_refresh_seconds
+        ):
+            return self._gpus_in_use
+        in_use = set()
+        if psutil:
+            pids = set(self._process_tree())
+            for i, handle in enumerate(self._gpu_handles):
+                try:
+                    if gpu_in_use_by_this_process(handle, pids):
+                        in_use.add(i)
+                except pynvml.NVMLError:
+                    pass
+        self._gpus_in_use = in_use
+        self._gpus_in_use_time = now
+        return in_use
+
+    def _process_tree(self):
+        """The processes of the user process tree by pid, excluding this one.
+        Process objects are kept between refreshes since cpu_percent measures
+        the time since the previous call on the same object."""
+        now = time.time()
+        if (
+            self._tree_time is not None
+            and now - self._tree_time < self._process_refresh_seconds
+        ):
+            return self._tree
+        try:
+            processes = user_process_tree()
+        except psutil.Error:
+            processes = []
+        own_pid = os.getpid()
+        tree = {}
+        for process in processes:
+            if process.pid == own_pid:
+                continue
+            existing = self._tree.get(process.pid)
+            # a reused pid compares unequal, since the create time differs
+            tree[process.pid] = existing if existing == process else process
+        self._tree = tree
+        self._tree_time = now
+        self._tree_uss = None
+        return tree
+
+    def _proc_tree_stats(self, stats):
+        tree = self._process_tree()
+        now = time.time()
+        measure_uss = self._tree_uss is None
+        count = 0
+        cpu = rss = uss = fds = 0.0
+        read_rate = write_rate = 0.0
+        has_io = False
+        tree_io = {}
+        for pid, process in tree.items():
+            try:
+                with process.oneshot():
+                    cpu += process.cpu_percent()
+                    memory = process.memory_info()
+                    rss += memory.rss
+                    if measure_uss:
+                        try:
+                            uss += process.memory_full_info().uss
+                        except psutil.AccessDenied:
+                            # the full info can need extra privileges, the
+                            # rss is an upper bound of the uss
+                            uss += memory.rss
+                    if hasattr(process, "num_fds"):
+                        fds += process.num_fds()
+                    if hasattr(process, "io_counters"):
+                        io = process.io_counters()
+                        has_io = True
+                        tree_io[pid] = (now, io.read_bytes, io.write_bytes)
+                        if pid in self._tree_io:
+                            prev_time, prev_read, prev_write = self._tree_io[pid]
+                            elapsed = max(now - prev_time, 1e-6)
+                            read_rate += (io.read_bytes - prev_read) / elapsed
+                            write_rate += (io.write_bytes - prev_write) / elapsed
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+            count += 1
+        self._tree_io = tree_io
+        if measure_uss:
+            self._tree_uss = uss / 1048576.0
+
+        stats["proc.tree.count"] = count
+        stats["proc.tree.cpu.percent"] = cpu
+        stats["proc.tree.memory.rssMB"] = rss / 1048576.0
+        if self._tree_uss is not None:
+            stats["proc.tree.memory.ussMB"] = self._tree_uss
+        if fds:
+            stats["proc.tree.fds"] = fds
+        if has_io:
+            stats["proc.tree.io.readMBps"] = read_rate / 1048576.0
+            stats["proc.tree.io.writeMBps"] = write_rate / 1048576.0
 
     def stats(self):
         stats = {}
-        for i in range(0, self.gpu_count):
-            handle = pynvml.nvmlDeviceGetHandleByIndex(i)
+        for group in METRIC_GROUPS:
+            self._group_stats(group, stats)
+        return stats
+
+    def _group_stats(self, group, stats):
+        if group == "gpu":
+            self._gpu_stats(stats)
+        elif not psutil and group != "tpu":
+            return
+        elif group == "cpu":
+            stats["cpu"] = psutil.cpu_percent()
+            try:
+                stats["proc.cpu.threads"] = self.proc.num_threads()
+            except psutil.NoSuchProcess:
+                pass
+        elif group == "memory":
+            sysmem = psutil.virtual_memory()
+            stats["memory"] = sysmem.percent
+            stats["proc.memory.availableMB"] = sysmem.available / 1048576.0
+            try:
+                stats["proc.memory.rssMB"] = self.proc.memory_info().rss / 1048576.0
+                stats["proc.memory.percent"] = self.proc.memory_percent()
+            except psutil.NoSuchProcess:
+                pass
+        elif group == "network":
+            net = psutil.net_io_counters()
+            stats["network"] = {
+                "sent": net.bytes_sent - self.network_init["sent"],
+                "recv": net.bytes_recv - self.network_init["recv"],
+            }
+        elif group == "disk":
+            # TODO: maybe show other partitions, will likely need user to configure
+            stats["disk"] = psutil.disk_usage("/").percent
+        elif group == "proc":
+            self._proc_tree_stats(stats)
+        elif group == "tpu" and self._tpu_profiler:
+            stats["tpu"] = self._tpu_profiler.get_tpu_utilization()
+
+    def _gpu_stats(self, stats):
+        if not self._gpu_handles and self.gpu_count:
+            self._gpu_handles = [
+                pynvml.nvmlDeviceGetHandleByIndex(i) for i in range(self.gpu_count)
+            ]
+        in_use = self._gpus_in_use_by_us() if self.gpu_count else set()
+        for i, handle in enumerate(self._gpu_handles):
             try:
                 utilz = pynvml.nvmlDeviceGetUtilizationRates(handle)
                 memory = pynvml.nvmlDeviceGetMemoryInfo(handle)
                 temp = pynvml.nvmlDeviceGetTemperature(
                     handle, pynvml.NVML_TEMPERATURE_GPU
                 )
-                in_use_by_us = gpu_in_use_by_this_process(handle)
+                in_use_by_us = i in in_use
 
                 stats["gpu.{}.{}".format(i, "gpu")] = utilz.gpu
                 stats["gpu.{}.{}".format(i, "memory")] = utilz.memory
@@ -204,9 +476,11 @@ class SystemStats(object):
                     # Some GPUs don't provide information about power usage
                 try:
                     power_watts = pynvml.nvmlDeviceGetPowerUsage(handle) / 1000.0
-                    power_capacity_watts = (
-                        pynvml.nvmlDeviceGetEnforcedPowerLimit(handle) / 1000.0
-                    )
+                    if i not in self._gpu_power_limits:
+                        self._gpu_power_limits[i] = (
+                            pynvml.nvmlDeviceGetEnforcedPowerLimit(handle) / 1000.0
+                        )
+                    power_capacity_watts = self._gpu_power_limits[i]
                     power_usage = (power_watts / power_capacity_watts) * 100
 
                     stats["gpu.{}.{}".format(i, "powerWatts")] = power_watts
@@ -225,11 +499,7 @@ class SystemStats(object):
                 pass
 
         # On Apple M1 systems let's look for the gpu
-        if (
-            platform.system() == "Darwin"
-            and platform.processor() == "arm"
-            and self.gpu_count == 0
-        ):
+        if self._is_m1() and self.gpu_count == 0:
             try:
                 out = subprocess.check_output([util.apple_gpu_stats_binary(), "--json"])
                 m1_stats = json.loads(out.split(b"\n")[0])
@@ -252,25 +522,3 @@ class SystemStats(object):
             except (OSError, ValueError, TypeError, subprocess.CalledProcessError) as e:
                 wandb.termwarn("GPU stats error {}".format(e))
                 pass
-
-        if psutil:
-            net = psutil.net_io_counters()
-            sysmem = psutil.virtual_memory()
-            stats["cpu"] = psutil.cpu_percent()
-            stats["memory"] = sysmem.percent
-            stats["network"] = {
-                "sent": net.bytes_sent - self.network_init["sent"],
-                "recv": net.bytes_recv - self.network_init["recv"],
-            }
-            # TODO: maybe show other partitions, will likely need user to configure
-            stats["disk"] = psutil.disk_usage("/").percent
-            stats["proc.memory.availableMB"] = sysmem.available / 1048576.0
-            try:
-                stats["proc.memory.rssMB"] = self.proc.memory_info().rss / 1048576.0
-                stats["proc.memory.percent"] = self.proc.memory_percent()
-                stats["proc.cpu.threads"] = self.proc.num_threads()
-            except psutil.NoSuchProcess:
-                pass
-        if self._tpu_profiler:
-            stats["tpu"] = self._tpu_profiler.get_tpu_utilization()
-        return stats
@@ -5,10 +5,12 @@ util/redirect.
 """
 
 import io
+import itertools
 import logging
 import os
 import sys
 import threading
+import time
 
 
 logger = logging.getLogger("wandb")
@@ -64,6 +66,100 @@ class StreamFork(object):
         return getattr(output_streams[0], attr)
 
 
+def _collapse_carriage_returns(data):
+    """Drops the parts of each line in data that a terminal would overwrite because
+    of a later carriage return, keeping the final rendered state of the line.
+
+    Works on str and bytes. If the first line was partly overwritten a single CR is
+    kept in front of it, since it may continue a partial line sent earlier.
+    """
+    cr, nl = ("\r", "\n") if isinstance(data, str) else (b"\r", b"\n")
+    if cr not in data:
+        return data
+    lines = data.split(nl)
+    for i, line in enumerate(lines):
+        if i < len(lines) - 1 and line.endswith(cr):
+            # CRLF line ending
+            line = line[:-1]
+        if cr in line:
+            line = line.rpartition(cr)[2]
+            if i == 0:
+                line = cr + line
+        lines[i] = line
+    return nl.join(lines)
+
+
+class OutputCoalescer(object):
+    """Buffers console output for up to max_latency seconds before handing it to cb.
+
+    Bursts of small writes to the same stream are passed on as one chunk, and
+    progress bars redrawn with carriage returns are collapsed to their final state,
+    so that a fast updating bar doesn't produce a record for every redraw. Writes to
+    different streams are passed on in the order they were made.
+    """
+
+    def __init__(self, cb, max_latency=0.1):
+        self._cb = cb
+        self._max_latency = max_latency
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        # (stream name, data) in the order they were written
+        self._buffer = []
+        self._pending = threading.Event()
+        self._stopped = False
+        self._thread = None
+
+    def write(self, name, data):
+        if self._stopped or self._max_latency <= 0:
+            with self._flush_lock:
+                self._emit(name, [data])
+            return
+        with self._lock:
+            self._buffer.append((name, data))
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    name="OutputCoalescer", target=self._thread_body
+                )
+                self._thread.daemon = True
+                self._thread.start()
+        self._pending.set()
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                buffer = self._buffer
+                self._buffer = []
+                self._pending.clear()
+            # consecutive writes to the same stream are emitted together
+            for name, writes in itertools.groupby(buffer, lambda write: write[0]):
+                self._emit(name, [data for _, data in writes])
+
+    def stop(self):
+        self._stopped = True
+        self._pending.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+
+    def _emit(self, name, chunks):
+        data = _collapse_carriage_returns(chunks[0][:0].join(chunks))
+        if not data:
+            return
+        try:
+            self._cb(name, data)
+        except Exception:
+            logger.exception("problem in output callback")
+
+    def _thread_body(self):
+        while not self._stopped:
+            self._pending.wait()
+            if self._stopped:
+                break
+            # let the rest of the burst arrive
+            time.sleep(self._max_latency)
+            self.flush()
+
+
 class RedirectBase(object):
     def install(self):
         raise NotImplementedError
@@ -12,11 +12,11 @@ import sys
 import time
 
 import click
-from gql import gql  # type: ignore
 from pkg_resources import parse_version  # type: ignore
 import requests
 import wandb
 
+from ..internal.internal_api import gql
 
 if wandb.TYPE_CHECKING:  # type: ignore
     from typing import (
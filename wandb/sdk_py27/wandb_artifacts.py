@@ -24,15 +24,16 @@ from .interface.artifacts import (
     md5_file_b64,
     b64_string_to_hex,
 )
-from wandb.apis import InternalApi, PublicApi
-from wandb.apis.public import Artifact as PublicArtifact
+from wandb.apis import InternalApi
 from wandb.errors.error import CommError
 from wandb import util
 from wandb.errors.term import termwarn, termlog
-from wandb.data_types import WBValue
 
 if wandb.TYPE_CHECKING:  # type: ignore
-    from typing import Optional, Union
+    from typing import Optional, Union, TYPE_CHECKING
+
+    if TYPE_CHECKING:  # pragma: no cover
+        from wandb.data_types import WBValue
 
 # This makes the first sleep 1s, and then doubles it up to total times,
 # which makes for ~18 hours.
@@ -303,6 +304,8 @@ class Artifact(ArtifactInterface):
         return manifest_entries
 
     def add(self, obj, name):
+        from wandb.data_types import WBValue
+
         self._ensure_can_add()
 
         # Validate that the object is wandb.Media type
@@ -1275,6 +1278,8 @@ class WBArtifactHandler(StorageHandler):
     @property
     def client(self):
         if self._client is None:
+            from wandb.apis.public import Api as PublicApi
+
             self._client = PublicApi()
         return self._client
 
@@ -1300,6 +1305,8 @@ class WBArtifactHandler(StorageHandler):
         artifact_id = util.host_from_path(manifest_entry.ref)
         artifact_file_path = util.uri_from_path(manifest_entry.ref)
 
+        from wandb.apis.public import Artifact as PublicArtifact
+
         dep_artifact = PublicArtifact.from_id(
             util.hex_to_b64_id(artifact_id), self.client
         )
@@ -1323,6 +1330,8 @@ class WBArtifactHandler(StorageHandler):
             (list[ArtifactManifestEntry]): A list of manifest entries to store within the artifact
         """
 
+        from wandb.apis.public import Artifact as PublicArtifact
+
         # Recursively resolve the reference until a concrete asset is found
         while path is not None and urlparse(path).scheme == self._scheme:
             artifact_id = util.host_from_path(path)
@@ -17,8 +17,6 @@ By default, Summary is set to the final value of History.
 
 import time
 
-from wandb.wandb_torch import TorchHistory
-
 
 class History(object):
     """Time series data for Runs. This is essentially a list of dicts where each
@@ -69,5 +67,7 @@ class History(object):
     @property
     def torch(self):
         if self._torch is None:
+            from wandb.wandb_torch import TorchHistory
+
             self._torch = TorchHistory(self)
         return self._torch
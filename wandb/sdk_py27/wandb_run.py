@@ -25,7 +25,7 @@ from six.moves.urllib.parse import urlencode
 import wandb
 from wandb import trigger
 from wandb._globals import _datatypes_set_callback
-from wandb.apis import internal, public
+from wandb.apis import internal
 from wandb.errors import Error
 from wandb.util import add_import_hook, sentry_set_scope, to_forward_slash_path
 from wandb.viz import (
@@ -76,13 +76,14 @@ if wandb.TYPE_CHECKING:  # type: ignore
         PollExitResponse,
     )
     from .wandb_setup import _WandbSetup
-    from wandb.apis.public import Api as PublicApi
 
     from typing import TYPE_CHECKING
 
     if TYPE_CHECKING:
         from typing import NoReturn
 
+        from wandb.apis.public import Api as PublicApi
+
 logger = logging.getLogger("wandb")
 EXIT_TIMEOUT = 60
 RUN_NAME_COLOR = "#cdcd00"
@@ -207,6 +208,7 @@ class Run(object):
     # _out_redir: Optional[redirect.RedirectBase]
     # _err_redir: Optional[redirect.RedirectBase]
     # _redirect_cb: Optional[Callable[[str, str], None]]
+    # _output_coalescer: Optional[redirect.OutputCoalescer]
     # _output_writer: Optional["WriteSerializingFile"]
 
     # _atexit_cleanup_called: bool
@@ -259,6 +261,7 @@ class Run(object):
         self._hooks = None
         self._teardown_hooks = []
         self._redirect_cb = None
+        self._output_coalescer = None
         self._out_redir = None
         self._err_redir = None
         self.stdout_redirector = None
@@ -271,6 +274,10 @@ class Run(object):
         self._exit_result = None
         self._final_summary = None
         self._sampled_history = None
+        # Media files written to the run directory, keyed by (media subdir,
+        # extension, sha256). Lets identical payloads logged at different
+        # steps share a single file, which is only uploaded once.
+        self._media_files = {}
         self._jupyter_progress = None
         if self._settings._jupyter and ipython._get_python_type() == "jupyter":
             self._jupyter_progress = ipython.jupyter_progress_bar()
@@ -1073,6 +1080,7 @@ class Run(object):
         for hook in self._teardown_hooks:
             hook()
         self._atexit_cleanup(exit_code=exit_code)
+        self._media_files.clear()
         if self._wl and len(self._wl._global_run_stack) > 0:
             self._wl._global_run_stack.pop()
         module.unset_globals()
@@ -1361,6 +1369,8 @@ class Run(object):
                 self._out_redir.uninstall()
             if self._err_redir:
                 self._err_redir.uninstall()
+            if self._output_coalescer:
+                self._output_coalescer.stop()
             return
 
         if self.stdout_redirector:
@@ -1419,7 +1429,10 @@ class Run(object):
 
         if self._use_redirect:
             # setup fake callback
-            self._redirect_cb = self._console_callback
+            self._output_coalescer = redirect.OutputCoalescer(
+                self._console_callback, max_latency=self._settings._console_max_latency,
+            )
+            self._redirect_cb = self._output_coalescer.write
 
         output_log_path = os.path.join(self.dir, filenames.OUTPUT_FNAME)
         self._output_writer = WriteSerializingFile(open(output_log_path, "wb"))
@@ -1795,6 +1808,8 @@ class Run(object):
         Returns:
             An `Artifact` object.
         """
+        from wandb.apis import public
+
         r = self._run_obj
         api = internal.Api(default_settings={"entity": r.entity, "project": r.project})
         api.set_current_run_id(self.id)
@@ -1990,6 +2005,8 @@ class Run(object):
         return artifact
 
     def _public_api(self):
+        from wandb.apis import public
+
         overrides = {"run": self.id}
         run_obj = self._run_obj
         if run_obj is not None:
@@ -2000,6 +2017,8 @@ class Run(object):
     # TODO(jhr): annotate this
     def _assert_can_log_artifact(self, artifact):  # type: ignore
         if not self._settings._offline:
+            from wandb.apis import public
+
             public_api = self._public_api()
             expected_type = public.Artifact.expected_type(
                 public_api.client,
@@ -2150,6 +2169,8 @@ def restore(
     if root is None:
         if run is not None:
             root = run.dir
+    from wandb.apis import public
+
     api = public.Api()
     api_run = api.run(run_path)
     if root is None:
@@ -24,7 +24,6 @@ Override priorities are in the reverse order of non-override settings
 import configparser
 import copy
 from datetime import datetime
-from distutils.util import strtobool
 import enum
 import getpass
 import itertools
@@ -40,6 +39,7 @@ import time
 import six
 import wandb
 from wandb import util
+from wandb.env import strtobool
 
 from .lib.git import GitRepo
 from .lib.ipython import _get_python_type
@@ -58,11 +58,15 @@ if wandb.TYPE_CHECKING:  # type: ignore
         Sequence,
     )
 
+# System metrics are sampled in these groups, see `_stats_sample_rates`
+STATS_METRIC_GROUPS = ("gpu", "cpu", "memory", "network", "disk", "proc", "tpu")
+
 defaults = dict(
     base_url="https://api.wandb.ai",
     summary_warnings=5,
     git_remote="origin",
     ignore_globs=(),
+    _console_max_latency=0.1,
 )
 
 # env mapping?
@@ -96,6 +100,7 @@ env_settings = dict(
     run_notes="WANDB_NOTES",
     run_tags="WANDB_TAGS",
     run_job_type="WANDB_JOB_TYPE",
+    _console_max_latency=wandb.env.CONSOLE_MAX_LATENCY,
 )
 
 env_convert = dict(
@@ -358,8 +363,14 @@ class Settings(object):
         summary_warnings=None,
         _internal_queue_timeout=2,
         _internal_check_process=8,
+        _console_max_latency=None,
         _disable_meta=None,
+        _meta_probe_timeout=None,
         _disable_stats=None,
+        _stats_sample_rate_seconds=None,
+        _stats_samples_to_average=None,
+        _stats_sample_rates=None,
+        _stats_process_refresh_seconds=None,
         _jupyter_path=None,
         _jupyter_name=None,
         _jupyter_root=None,
@@ -587,6 +598,32 @@ class Settings(object):
         if val is None:
             return "{} is not a boolean".format(value)
 
+    def _validate__console_max_latency(self, value):
+        try:
+            if float(value) >= 0:
+                return
+        except (TypeError, ValueError):
+            pass
+        return "{} is not a non-negative number".format(value)
+
+    def _validate__stats_sample_rates(self, value):
+        if not isinstance(value, dict):
+            return "{} is not a dict of sample rates".format(value)
+        for group, rate in value.items():
+            if group not in STATS_METRIC_GROUPS:
+                return _error_choices(group, set(STATS_METRIC_GROUPS))
+            if isinstance(rate, bool) or not isinstance(rate, (int, float)):
+                return "{} sample rate {} is not a number".format(group, rate)
+            if rate <= 0:
+                return "{} sample rate {} is not positive".format(group, rate)
+
+    def _preprocess__console_max_latency(self, value):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            # reported by _validate__console_max_latency
+            return value
+
     def _preprocess_base_url(self, value):
         if value is not None:
             value = value.rstrip("/")
@@ -71,15 +71,50 @@ class SyncThread(threading.Thread):
         self._mark_synced = mark_synced
         self._app_url = app_url
 
+    def _import_tensorboard(self, logdir):
+        """Converts the tensorboard event files in logdir into an offline run,
+        returns the path of its .wandb file or None if there are no events."""
+        from . import tb_import
+
+        if not tb_import.find_event_files(logdir):
+            return None
+        importer = tb_import.TBImporter(logdir, run_id=self._run_id)
+        wandb.termlog(
+            "Importing tensorboard events from {} ...".format(logdir), newline=False
+        )
+        sync_file = importer.run()
+        wandb.termlog(" {} rows.".format(importer.rows), prefix=False)
+        if importer.skipped:
+            wandb.termwarn(
+                "Skipped {} tensorboard media summaries, use "
+                "wandb.init(sync_tensorboard=True) to sync them".format(
+                    importer.skipped
+                )
+            )
+        return sync_file
+
+    def _find_sync_file(self, sync_dir):
+        """Returns the .wandb file of a run directory, or of the run imported
+        from a tensorboard logdir, None if the directory is skipped."""
+        files = os.listdir(sync_dir)
+        filtered_files = list(filter(lambda f: f.endswith(WANDB_SUFFIX), files))
+        old = check_and_warn_old(files)
+        if not old and not filtered_files:
+            # not a run directory, it may be a tensorboard logdir
+            sync_file = self._import_tensorboard(sync_dir)
+            if sync_file:
+                filtered_files = [sync_file]
+        if old or len(filtered_files) != 1:
+            print("Skipping directory: {}".format(sync_dir))
+            return None
+        return os.path.join(sync_dir, filtered_files[0])
+
     def run(self):
         for sync_item in self._sync_list:
             if os.path.isdir(sync_item):
-                files = os.listdir(sync_item)
-                filtered_files = list(filter(lambda f: f.endswith(WANDB_SUFFIX), files))
-                if check_and_warn_old(files) or len(filtered_files) != 1:
-                    print("Skipping directory: {}".format(sync_item))
+                sync_item = self._find_sync_file(sync_item)
+                if sync_item is None:
                     continue
-                sync_item = os.path.join(sync_item, filtered_files[0])
             dirname = os.path.dirname(sync_item)
             files_dir = os.path.join(dirname, "files")
             sd = dict(
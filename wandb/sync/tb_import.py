@@ -0,0 +1,326 @@
+"""
+Bulk import of finished tensorboard runs.
+
+Event files are read sequentially and converted without going through the
+live tensorboard watcher: scalar summaries are collected into numpy chunks,
+grouped by step and written as history rows straight into a .wandb file that
+`wandb sync` can upload.
+"""
+
+import datetime
+import importlib
+import json
+import logging
+import os
+import struct
+import sys
+
+from wandb import env, util
+from wandb.proto import wandb_internal_pb2  # type: ignore
+
+PY3 = sys.version_info.major == 3 and sys.version_info.minor >= 6
+if PY3:
+    from wandb.sdk import data_types, wandb_settings
+    from wandb.sdk.internal import datastore
+else:
+    from wandb.sdk_py27 import data_types, wandb_settings
+    from wandb.sdk_py27.internal import datastore
+
+# the package exports a log function that shadows the module
+tb_log = importlib.import_module("wandb.integration.tensorboard.log")
+
+logger = logging.getLogger(__name__)
+
+np = util.get_module("numpy")
+
+TFEVENTS_TOKEN = "tfevents"
+# Event files are read with large buffers, there is no seeking back
+READ_BUFFER_SIZE = 16 * 1024 * 1024
+# Number of scalar values collected before they're packed into arrays
+CHUNK_SIZE = 1000000
+
+# tfrecord framing: uint64 length, uint32 length crc, data, uint32 data crc
+_RECORD_HEADER = struct.Struct("<QI")
+_RECORD_FOOTER_SIZE = 4
+
+
+def _event_pb2():
+    return util.get_module("tensorboard.compat.proto.event_pb2") or util.get_module(
+        "tensorflow.core.util.event_pb2",
+        required="Importing tensorboard runs requires tensorboard",
+    )
+
+
+def find_event_files(logdir):
+    """Returns {namespace: [event file paths]} for all the tfevents files under
+    logdir. The namespace is the directory of the files relative to logdir, ""
+    for logdir itself. Files are ordered by name, which starts with their
+    creation time."""
+    event_files = {}
+    for dirpath, _, filenames in os.walk(logdir):
+        paths = sorted(
+            os.path.join(dirpath, f)
+            for f in filenames
+            if TFEVENTS_TOKEN in f.split(".") and not f.endswith(".profile-empty")
+        )
+        if paths:
+            namespace = os.path.relpath(dirpath, logdir)
+            namespace = (
+                "" if namespace == "." else util.to_forward_slash_path(namespace)
+            )
+            event_files[namespace] = paths
+    return event_files
+
+
+def read_records(path, buffer_size=READ_BUFFER_SIZE):
+    """Yields the serialized records of a tfrecord file. CRCs aren't checked and
+    a truncated record at the end of the file (still being written) is
+    dropped."""
+    with open(path, "rb", buffer_size) as f:
+        while True:
+            header = f.read(_RECORD_HEADER.size)
+            if len(header) < _RECORD_HEADER.size:
+                return
+            length, _ = _RECORD_HEADER.unpack(header)
+            data = f.read(length)
+            if len(data) < length or len(f.read(_RECORD_FOOTER_SIZE)) < 4:
+                logger.warning("Truncated record at the end of %s", path)
+                return
+            yield data
+
+
+def _scalar_value(value):
+    """Returns the float of a scalar summary value, or None if it isn't one."""
+    kind = value.WhichOneof("value")
+    if kind == "simple_value":
+        return value.simple_value
+    if kind == "tensor" and value.metadata.plugin_data.plugin_name in ("scalars", ""):
+        tensor = value.tensor
+        if tensor.tensor_shape.dim:
+            return None
+        if tensor.float_val:
+            return tensor.float_val[0]
+        if tensor.double_val:
+            return tensor.double_val[0]
+        ndarray = tb_log.make_ndarray(tensor)
+        if ndarray is not None and ndarray.dtype.kind in "biuf":
+            return float(ndarray)
+    return None
+
+
+class _ScalarChunks(object):
+    """Scalar summaries as (step, key id, value, wall time) columns. Values are
+    appended to python lists and packed into numpy arrays every CHUNK_SIZE
+    values to keep memory compact."""
+
+    def __init__(self, chunk_size=CHUNK_SIZE):
+        self._chunk_size = chunk_size
+        self._chunks = []
+        self._steps = []
+        self._keys = []
+        self._values = []
+        self._walls = []
+        self.count = 0
+
+    def add(self, step, key_id, value, wall_time):
+        self._steps.append(step)
+        self._keys.append(key_id)
+        self._values.append(value)
+        self._walls.append(wall_time)
+        if len(self._steps) >= self._chunk_size:
+            self._pack()
+
+    def _pack(self):
+        if not self._steps:
+            return
+        self._chunks.append(
+            (
+                np.array(self._steps, dtype=np.int64),
+                np.array(self._keys, dtype=np.int32),
+                np.array(self._values, dtype=np.float64),
+                np.array(self._walls, dtype=np.float64),
+            )
+        )
+        self.count += len(self._steps)
+        self._steps, self._keys, self._values, self._walls = [], [], [], []
+
+    def grouped(self):
+        """Returns the sorted unique steps and, for each of them, the start and
+        end of its values in the returned (keys, value_jsons, walls) columns.
+        Within a step values keep the order they were read in, so later
+        values for a key win."""
+        self._pack()
+        if not self._chunks:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, empty, np.zeros(0, dtype=np.int32), [], empty
+        steps, keys, values, walls = (
+            np.concatenate(column) for column in zip(*self._chunks)
+        )
+        self._chunks = []
+        order = np.argsort(steps, kind="stable")
+        steps, keys, values, walls = (
+            steps[order],
+            keys[order],
+            values[order],
+            walls[order],
+        )
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(steps)) + 1))
+        ends = np.append(starts[1:], len(steps))
+
+        # json.dumps(float) is repr(float) for finite values
+        value_jsons = list(map(repr, values.tolist()))
+        for ndx in np.flatnonzero(~np.isfinite(values)).tolist():
+            value_jsons[ndx] = json.dumps(values[ndx].item())
+        wall_max = np.maximum.reduceat(walls, starts)
+        return steps[starts], starts, ends, keys, value_jsons, wall_max
+
+
+class TBImporter(object):
+    """Converts the tensorboard event files under a logdir into a .wandb file.
+
+    Scalars (simple values and scalar tensors) and histograms are imported.
+    Summaries that need media files, such as images, are skipped and counted
+    in `skipped`; sync those runs with `wandb.init(sync_tensorboard=True)`.
+
+    The offline run is written to the wandb directory under WANDB_DIR, like
+    the runs of `wandb.init`, or under logdir if it isn't set.
+    """
+
+    def __init__(
+        self, logdir, wandb_dir=None, run_id=None, project=None, entity=None,
+    ):
+        self._logdir = logdir
+        self._wandb_dir = wandb_dir or wandb_settings.get_wandb_dir(env.get_dir(logdir))
+        self._run_id = run_id or util.generate_id()
+        self._project = project
+        self._entity = entity
+        self._key_ids = {}
+        self._keys = []
+        self._scalars = _ScalarChunks()
+        # step -> {key: value_json} for non-scalar summaries
+        self._other = {}
+        self._other_walls = {}
+        self.events = 0
+        self.rows = 0
+        self.skipped = 0
+
+    def _key_id(self, key):
+        key_id = self._key_ids.get(key)
+        if key_id is None:
+            key_id = self._key_ids[key] = len(self._keys)
+            self._keys.append(key)
+        return key_id
+
+    def _add_other(self, event, values, namespace):
+        summary = tb_log.Summary(value=values)
+        converted = tb_log.tf_summary_to_dict(summary, namespace) or {}
+        row = self._other.setdefault(event.step, {})
+        for key, val in converted.items():
+            if isinstance(val, (list, data_types.Media)):
+                self.skipped += 1
+                continue
+            val = data_types.val_to_json(None, key, val, namespace=event.step)
+            row[key] = util.json_dumps_safer_history(val)
+        wall_time = self._other_walls.get(event.step, event.wall_time)
+        self._other_walls[event.step] = max(wall_time, event.wall_time)
+
+    def _read(self):
+        event_pb2 = _event_pb2()
+        namespaced_tag = tb_log.namespaced_tag
+        first_wall_time = None
+        for namespace, paths in sorted(find_event_files(self._logdir).items()):
+            for path in paths:
+                for data in read_records(path):
+                    event = event_pb2.Event()
+                    event.ParseFromString(data)
+                    if not event.HasField("summary"):
+                        continue
+                    self.events += 1
+                    if first_wall_time is None or event.wall_time < first_wall_time:
+                        first_wall_time = event.wall_time
+                    others = []
+                    for value in event.summary.value:
+                        scalar = _scalar_value(value)
+                        if scalar is None:
+                            others.append(value)
+                            continue
+                        key_id = self._key_id(namespaced_tag(value.tag, namespace))
+                        self._scalars.add(event.step, key_id, scalar, event.wall_time)
+                    if others:
+                        self._add_other(event, others, namespace)
+        return first_wall_time
+
+    def _write_rows(self, ds, first_wall_time):
+        steps, starts, ends, keys, value_jsons, wall_max = self._scalars.grouped()
+        scalar_rows = dict(
+            zip(steps.tolist(), zip(starts.tolist(), ends.tolist(), wall_max.tolist()))
+        )
+        key_names = [self._keys[k] for k in keys.tolist()]
+        summary = {}
+        for step in sorted(set(scalar_rows) | set(self._other)):
+            row = {}
+            wall_time = self._other_walls.get(step)
+            if step in scalar_rows:
+                start, end, scalar_wall_time = scalar_rows[step]
+                row.update(zip(key_names[start:end], value_jsons[start:end]))
+                wall_time = max(wall_time or scalar_wall_time, scalar_wall_time)
+            row.update(self._other.get(step, {}))
+            row["global_step"] = str(step)
+            row["_timestamp"] = repr(wall_time)
+            row["_runtime"] = str(int(wall_time - first_wall_time))
+            row["_step"] = str(self.rows)
+            summary.update(row)
+
+            record = wandb_internal_pb2.Record()
+            for key, value_json in row.items():
+                item = record.history.item.add()
+                item.key = key
+                item.value_json = value_json
+            ds.write(record)
+            self.rows += 1
+
+        record = wandb_internal_pb2.Record()
+        for key, value_json in summary.items():
+            update = record.summary.update.add()
+            update.key = key
+            update.value_json = value_json
+        ds.write(record)
+
+    def run(self):
+        """Imports the logdir and returns the absolute path of the .wandb file."""
+        util.get_module("numpy", required="Importing tensorboard runs requires numpy")
+        first_wall_time = self._read()
+        if first_wall_time is None:
+            raise ValueError("No tensorboard events found in {}".format(self._logdir))
+        timespec = datetime.datetime.fromtimestamp(first_wall_time).strftime(
+            "%Y%m%d_%H%M%S"
+        )
+        run_dir = os.path.join(
+            self._wandb_dir, "offline-run-{}-{}".format(timespec, self._run_id)
+        )
+        util.mkdir_exists_ok(os.path.join(run_dir, "files"))
+        sync_file = os.path.join(run_dir, "run-{}.wandb".format(self._run_id))
+
+        ds = datastore.DataStore(for_import=True)
+        ds.open_for_write(sync_file)
+        try:
+            record = wandb_internal_pb2.Record()
+            run = record.run
+            run.run_id = self._run_id
+            run.project = self._project or ""
+            run.entity = self._entity or ""
+            run.display_name = os.path.basename(os.path.abspath(self._logdir))
+            run.start_time.FromMicroseconds(int(first_wall_time * 1e6))
+            ds.write(record)
+
+            self._write_rows(ds, first_wall_time)
+
+            record = wandb_internal_pb2.Record()
+            record.exit.exit_code = 0
+            ds.write(record)
+            record = wandb_internal_pb2.Record()
+            record.final.SetInParent()
+            ds.write(record)
+        finally:
+            ds.close()
+        return os.path.abspath(sync_file)
@@ -112,6 +112,10 @@ def sentry_set_scope(process_context, entity, project, email=None, url=None):
             scope.set_tag("url", url)
 
 
+# vendor_import swaps sys.path, which other threads may be importing with
+_vendor_lock = threading.RLock()
+
+
 def vendor_setup():
     """This enables us to use the vendor directory for packages we don't depend on
     Returns a function to call after imports are complete. Make sure to call this
@@ -119,6 +123,9 @@ def vendor_setup():
     reset_path = vendor_setup()
     # do any vendor imports...
     reset_path()
+
+    This isn't thread safe, use vendor_import for imports that may happen after
+    startup, e.g. from a background thread.
     """
     original_path = [directory for directory in sys.path]
 
@@ -145,10 +152,12 @@ def apple_gpu_stats_binary():
 
 
 def vendor_import(name):
-    reset_path = vendor_setup()
-    module = import_module(name)
-    reset_path()
-    return module
+    with _vendor_lock:
+        reset_path = vendor_setup()
+        try:
+            return import_module(name)
+        finally:
+            reset_path()
 
 
 def get_module(name, required=None):
@@ -247,6 +256,8 @@ class PreInitObject(object):
 np = get_module("numpy")
 
 MAX_SLEEP_SECONDS = 60 * 5
+# Downloads are written in large blocks, small ones make big files slow
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
 # TODO: Revisit these limits
 VALUE_BYTES_LIMIT = 100000
 
@@ -472,6 +483,148 @@ def convert_plots(obj):
         return obj
 
 
+# Percentiles reported when compressing arrays in the summary
+SUMMARY_PERCENTILES = (10, 25, 75, 90)
+# Arrays that don't fit comfortably in memory (np.memmap) are scanned in
+# chunks of this many elements
+ARRAY_STATS_CHUNK_SIZE = 2 ** 22
+# Resolution of the histogram used to estimate percentiles in chunked mode
+ARRAY_STATS_PERCENTILE_BINS = 4096
+
+
+def _array_chunks(arr, chunk_size):
+    flat = arr.reshape(-1) if hasattr(arr, "reshape") else np.asarray(arr).ravel()
+    for start in range(0, flat.size, chunk_size):
+        yield np.asarray(flat[start : start + chunk_size])
+
+
+def _use_chunks(arr, chunk_size):
+    return chunk_size is not None or isinstance(arr, np.memmap)
+
+
+def _chunked_moments(arr, chunk_size):
+    """One pass over arr returning (size, mean, var, min, max), merging the
+    moments of each chunk (Chan et al.)"""
+    count, mean, m2 = 0, 0.0, 0.0
+    amin, amax = None, None
+    for chunk in _array_chunks(arr, chunk_size):
+        n = chunk.size
+        if n == 0:
+            continue
+        if chunk.dtype.kind in "iub":
+            # differences of small integer dtypes would wrap around
+            chunk = chunk.astype(np.float64)
+        chunk_mean = chunk.mean()
+        centered = chunk - chunk_mean
+        chunk_m2 = np.vdot(centered, centered).real
+        delta = chunk_mean - mean
+        total = count + n
+        mean = mean + delta * n / total
+        m2 = m2 + chunk_m2 + abs(delta) ** 2 * count * n / total
+        count = total
+        chunk_min, chunk_max = chunk.min(), chunk.max()
+        amin = chunk_min if amin is None else np.minimum(amin, chunk_min)
+        amax = chunk_max if amax is None else np.maximum(amax, chunk_max)
+    return count, mean, m2 / count, amin, amax
+
+
+def _histogram_edges(amin, amax, num_bins):
+    # same edges np.histogram picks for an empty range
+    amin, amax = float(amin), float(amax)
+    if amin == amax:
+        amin, amax = amin - 0.5, amax + 0.5
+    return np.linspace(amin, amax, num_bins + 1)
+
+
+def _chunked_histogram(arr, edges, chunk_size):
+    counts = np.zeros(len(edges) - 1, dtype=np.int64)
+    for chunk in _array_chunks(arr, chunk_size):
+        counts += np.histogram(chunk, bins=edges)[0]
+    return counts
+
+
+def array_histogram(arr, num_bins, chunk_size=None):
+    """Histogram of arr as returned by np.histogram(arr, bins=num_bins).
+
+    Memory-mapped arrays, or any array when chunk_size is given, are read in
+    chunks: one pass for the range and one to count.
+    """
+    if not _use_chunks(arr, chunk_size):
+        return np.histogram(arr, bins=num_bins)
+    chunk_size = chunk_size or ARRAY_STATS_CHUNK_SIZE
+    _, _, _, amin, amax = _chunked_moments(arr, chunk_size)
+    edges = _histogram_edges(amin, amax, num_bins)
+    return _chunked_histogram(arr, edges, chunk_size), edges
+
+
+def array_stats(arr, percentiles=SUMMARY_PERCENTILES, chunk_size=None):
+    """Size, mean, variance, min, max and percentiles of a numpy array.
+
+    In memory, a single np.partition places the min, max and every percentile
+    neighbour at once instead of sorting per statistic. Memory-mapped arrays,
+    or any array when chunk_size is given, are read in two chunked passes and
+    their percentiles are interpolated from a fine histogram.
+
+    Returns:
+        dict with keys "size", "mean", "var", "min", "max" and the percentiles.
+    """
+    if _use_chunks(arr, chunk_size):
+        return _chunked_array_stats(arr, percentiles, chunk_size)
+
+    flat = np.asarray(arr).ravel()
+    if flat.dtype.kind == "b":
+        flat = flat.astype(np.uint8)
+    size = flat.size
+    mean = flat.mean()
+    centered = flat - mean
+    var = np.vdot(centered, centered).real / size
+
+    positions = [q / 100.0 * (size - 1) for q in percentiles]
+    kth = set([0, size - 1])
+    for pos in positions:
+        kth.update([int(math.floor(pos)), int(math.ceil(pos))])
+    part = np.partition(flat, sorted(kth))
+
+    stats = {"size": size, "mean": mean.item(), "var": var.item()}
+    if flat.dtype.kind in "fc" and np.isnan(part[size - 1]):
+        # nans sort last, match np.amin / np.percentile which propagate them
+        nan = float("nan")
+        stats.update({"min": nan, "max": nan})
+        stats.update({q: nan for q in percentiles})
+        return stats
+
+    stats.update({"min": part[0].item(), "max": part[size - 1].item()})
+    for q, pos in zip(percentiles, positions):
+        lo, hi = part[int(math.floor(pos))], part[int(math.ceil(pos))]
+        if flat.dtype.kind in "iu":
+            # hi - lo can overflow small integer dtypes
+            lo, hi = np.float64(lo), np.float64(hi)
+        stats[q] = (lo + (hi - lo) * (pos - math.floor(pos))).item()
+    return stats
+
+
+def _chunked_array_stats(arr, percentiles, chunk_size):
+    chunk_size = chunk_size or ARRAY_STATS_CHUNK_SIZE
+    size, mean, var, amin, amax = _chunked_moments(arr, chunk_size)
+    stats = {"size": size, "mean": float(mean), "var": float(var)}
+    stats.update({"min": amin.item(), "max": amax.item()})
+    if np.isnan(amin) or np.isnan(amax):
+        nan = float("nan")
+        stats.update({q: nan for q in percentiles})
+        return stats
+
+    edges = _histogram_edges(amin, amax, ARRAY_STATS_PERCENTILE_BINS)
+    cdf = np.cumsum(_chunked_histogram(arr, edges, chunk_size))
+    for q in percentiles:
+        rank = q / 100.0 * (size - 1)
+        ndx = min(int(np.searchsorted(cdf, rank, side="right")), len(cdf) - 1)
+        below = cdf[ndx - 1] if ndx > 0 else 0
+        in_bin = cdf[ndx] - below
+        frac = (rank - below) / in_bin if in_bin else 0.0
+        stats[q] = float(edges[ndx] + (edges[ndx + 1] - edges[ndx]) * frac)
+    return stats
+
+
 def maybe_compress_history(obj):
     if np and isinstance(obj, np.ndarray) and obj.size > 32:
         return wandb.Histogram(obj, num_bins=32).to_json(), True
@@ -481,17 +634,18 @@ def maybe_compress_history(obj):
 
 def maybe_compress_summary(obj, h5_typename):
     if np and isinstance(obj, np.ndarray) and obj.size > 32:
+        stats = array_stats(obj)
         return (
             {
                 "_type": h5_typename,  # may not be ndarray
-                "var": np.var(obj).item(),
-                "mean": np.mean(obj).item(),
-                "min": np.amin(obj).item(),
-                "max": np.amax(obj).item(),
-                "10%": np.percentile(obj, 10),
-                "25%": np.percentile(obj, 25),
-                "75%": np.percentile(obj, 75),
-                "90%": np.percentile(obj, 90),
+                "var": stats["var"],
+                "mean": stats["mean"],
+                "min": stats["min"],
+                "max": stats["max"],
+                "10%": stats[10],
+                "25%": stats[25],
+                "75%": stats[75],
+                "90%": stats[90],
                 "size": obj.size,
             },
             True,
@@ -991,15 +1145,37 @@ def guess_data_type(shape, risky=False):
     return None
 
 
-def download_file_from_url(dest_path, source_url, api_key=None):
-    response = requests.get(source_url, auth=("api", api_key), stream=True, timeout=5)
+def download_file_from_url(
+    dest_path, source_url, api_key=None, resume=False, callback=None
+):
+    """Streams source_url into dest_path. With resume, an existing partial
+    dest_path is completed with a ranged request if the server supports it.
+    callback is called with the number of bytes received. Returns the size of
+    the partial file that was resumed, 0 if the download started over."""
+    headers = {}
+    offset = 0
+    if resume and os.path.isfile(dest_path):
+        offset = os.path.getsize(dest_path)
+        if offset:
+            headers["Range"] = "bytes=%d-" % offset
+    response = requests.get(
+        source_url, auth=("api", api_key), stream=True, timeout=5, headers=headers
+    )
+    if offset and response.status_code == 416:
+        # nothing left to download
+        return offset
     response.raise_for_status()
+    if response.status_code != 206:
+        offset = 0
 
     if os.sep in dest_path:
         mkdir_exists_ok(os.path.dirname(dest_path))
-    with fsync_open(dest_path, "wb") as file:
-        for data in response.iter_content(chunk_size=1024):
+    with fsync_open(dest_path, "ab" if offset else "wb") as file:
+        for data in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
             file.write(data)
+            if callback:
+                callback(len(data))
+    return offset
 
 
 def isatty(ob):